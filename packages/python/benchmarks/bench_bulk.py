@@ -0,0 +1,84 @@
+"""Evaluate many contexts with ``BulkEvaluator`` and compare it with a serial loop.
+
+Contexts are generated on the fly, with ``--plans`` distinct values of the one
+attribute the stand-in server reports flags depend on, so deduplication can be seen
+at work. For each ``--concurrency`` level the script reports contexts per second,
+requests sent and the traced memory peak; the serial baseline sends one request per
+context, as a loop over ``identify()`` would:
+
+    python benchmarks/bench_bulk.py --contexts 20000 --latency 0.005
+    python benchmarks/bench_bulk.py --plans 0   # every context distinct
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+import tracemalloc
+from collections.abc import Iterator
+
+from edgeflags.bulk import BulkEvaluator
+from edgeflags.fetcher import AsyncFetcher
+from edgeflags.testing import StandInServer, generate_flags
+from edgeflags.types import EvaluationContext
+
+
+def _contexts(count: int, plans: int) -> Iterator[EvaluationContext]:
+    for i in range(count):
+        context: EvaluationContext = {"user_id": f"user-{i}", "email": f"user-{i}@example.com"}
+        context["plan"] = f"plan-{i % plans}" if plans else f"plan-{i}"
+        yield context
+
+
+async def _serial(url: str, count: int, plans: int) -> tuple[float, int]:
+    fetcher = AsyncFetcher(url, "bench")
+    start = time.perf_counter()
+    for context in _contexts(count, plans):
+        await fetcher.fetch_all(context)
+    elapsed = time.perf_counter() - start
+    await fetcher.close()
+    return elapsed, count
+
+
+async def _bulk(url: str, count: int, plans: int, concurrency: int) -> tuple[float, int, int]:
+    tracemalloc.start()
+    start = time.perf_counter()
+    async with BulkEvaluator(url, "bench", concurrency=concurrency) as bulk:
+        async for _ in bulk.evaluate(_contexts(count, plans)):
+            pass
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, bulk.requests, peak
+
+
+async def _run(args: argparse.Namespace) -> None:
+    flags = generate_flags(args.flags)
+    dependencies = {key: ["plan"] for key in flags}
+    with StandInServer(flags=flags, latency=args.latency, dependencies=dependencies) as server:
+        serial = min(args.contexts, 500)
+        elapsed, requests = await _serial(server.url, serial, args.plans)
+        print(f"serial       {serial / elapsed:>10.0f} contexts/s  requests={requests}")
+        for concurrency in args.concurrency:
+            elapsed, requests, peak = await _bulk(
+                server.url, args.contexts, args.plans, concurrency
+            )
+            print(
+                f"bulk c={concurrency:<4} {args.contexts / elapsed:>10.0f} contexts/s  "
+                f"requests={requests}  peak={peak / 1e6:.1f}MB"
+            )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--contexts", type=int, default=10_000)
+    parser.add_argument("--plans", type=int, default=50, help="distinct plans; 0 = unique")
+    parser.add_argument("--flags", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.002, help="server latency in s")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    asyncio.run(_run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""Measure hub lag and read latency of ``EdgeFlagsSync`` under gevent.
+
+Thousands of greenlets read flags in a loop while the client polls a local server at a
+short interval, and a ticker greenlet sleeps 1 ms in a loop recording how late it wakes
+up. Compare OS-thread polling with the cooperative runtime, with and without
+monkey-patching:
+
+    python benchmarks/bench_gevent.py --greenlets 2000
+    python benchmarks/bench_gevent.py --greenlets 2000 --patch
+
+Requires gevent (``pip install edgeflags[gevent]``).
+"""
+
+from __future__ import annotations
+
+import sys
+
+if __name__ == "__main__" and "--patch" in sys.argv:
+    from gevent import monkey
+
+    monkey.patch_all()
+
+import argparse
+import time
+from typing import Any
+
+import gevent
+
+from edgeflags import EdgeFlagsSync
+from edgeflags.testing import StandInServer, generate_configs, generate_flags
+
+_TICK = 0.001
+
+
+def _percentile(values: list[float], q: float) -> float:
+    values = sorted(values)
+    return values[max(int(len(values) * q) - 1, 0)]
+
+
+def _measure(
+    server: StandInServer, keys: list[str], args: argparse.Namespace, **options: Any
+) -> None:
+    client: EdgeFlagsSync | None = None
+    if options:
+        client = EdgeFlagsSync("bench", server.url, polling_interval=args.interval, **options)
+        client.init()
+    reads: list[float] = []
+    lags: list[float] = []
+    end = time.perf_counter() + args.duration
+
+    def reader(offset: int) -> None:
+        i = offset
+        while time.perf_counter() < end:
+            start = time.perf_counter()
+            if client is not None:
+                client.flag(keys[i % len(keys)])
+            reads.append(time.perf_counter() - start)
+            i += 1
+            gevent.sleep(0)
+
+    def ticker() -> None:
+        while time.perf_counter() < end:
+            start = time.perf_counter()
+            gevent.sleep(_TICK)
+            lags.append(time.perf_counter() - start - _TICK)
+
+    gevent.joinall(
+        [gevent.spawn(ticker)] + [gevent.spawn(reader, n) for n in range(args.greenlets)]
+    )
+    polls = len(server.requests)
+    server.reset_requests()
+    if client is not None:
+        client.destroy()
+    name = options.get("cooperative", "none")
+    print(
+        f"{'cooperative' if name is True else 'threads' if name is False else name:<12}"
+        f"reads={len(reads):>9}  read p50={_percentile(reads, 0.5) * 1e6:6.1f}us  "
+        f"p99={_percentile(reads, 0.99) * 1e6:7.1f}us  "
+        f"hub lag p99={_percentile(lags, 0.99) * 1000:6.2f}ms  max={max(lags) * 1000:6.2f}ms  "
+        f"polls={polls}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--greenlets", type=int, default=2000)
+    parser.add_argument("--configs", type=int, default=2000)
+    parser.add_argument("--interval", type=float, default=0.05, help="polling interval")
+    parser.add_argument("--duration", type=float, default=3.0, help="seconds per mode")
+    parser.add_argument("--patch", action="store_true", help="monkey-patch with gevent first")
+    args = parser.parse_args()
+
+    print(f"{args.greenlets} greenlets, monkey-patched={args.patch}")
+    flags = generate_flags(args.configs)
+    keys = list(flags)
+    with StandInServer(flags=flags, configs=generate_configs(args.configs)) as server:
+        _measure(server, keys, args)
+        _measure(server, keys, args, cooperative=False)
+        _measure(server, keys, args, cooperative=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""Measure event-loop lag caused by ``EdgeFlags.refresh()`` on large payloads.
+
+A ticker coroutine sleeps 1 ms in a loop and records how late it wakes up while the
+client refreshes against a local server. Compare the inline and offloaded settings:
+
+    python benchmarks/bench_loop_lag.py --configs 5000 --rounds 10
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from typing import Any
+
+from edgeflags import EdgeFlags
+from edgeflags.testing import StandInServer, generate_configs, generate_flags
+
+_TICK = 0.001
+
+
+async def _measure(server: StandInServer, states: list[Any], **options: Any) -> list[float]:
+    server.replace(*states[0])
+    client = EdgeFlags("bench", server.url, polling_interval=3600, **options)
+    await client.init()
+    lags: list[float] = []
+    done = False
+
+    async def ticker() -> None:
+        while not done:
+            start = time.perf_counter()
+            await asyncio.sleep(_TICK)
+            lags.append(time.perf_counter() - start - _TICK)
+
+    task = asyncio.create_task(ticker())
+    for flags, configs in states[1:]:
+        server.replace(flags, configs)
+        await client.refresh()
+    done = True
+    await task
+    await client.aclose()
+    return lags
+
+
+def _report(name: str, lags: list[float]) -> None:
+    lags_ms = sorted(lag * 1000 for lag in lags)
+    p99 = lags_ms[int(len(lags_ms) * 0.99) - 1] if len(lags_ms) > 1 else lags_ms[0]
+    print(
+        f"{name:<10} ticks={len(lags_ms):>6}  mean={statistics.fmean(lags_ms):7.2f}ms  "
+        f"p99={p99:7.2f}ms  max={lags_ms[-1]:7.2f}ms"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--configs", type=int, default=5000)
+    parser.add_argument("--size", type=int, default=512, help="approximate bytes per config")
+    parser.add_argument("--rounds", type=int, default=10)
+    args = parser.parse_args()
+
+    states = [
+        (generate_flags(args.configs, seed=r), generate_configs(args.configs, args.size, seed=r))
+        for r in range(args.rounds + 1)
+    ]
+    payload = len(json.dumps({"flags": states[0][0], "configs": states[0][1]}))
+    print(f"payload ~{payload / 1e6:.1f} MB, {args.rounds} refreshes")
+
+    with StandInServer(deltas=False) as server:
+        _report("inline", asyncio.run(_measure(server, states, offload_threshold=None)))
+        _report("thread", asyncio.run(_measure(server, states, offload_threshold=0)))
+        _report(
+            "process",
+            asyncio.run(_measure(server, states, offload_threshold=0, process_threshold=0)),
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Replay recorded fetch traffic through ``EdgeFlagsSync`` and measure its cost.
+
+Each recorded response is applied with ``refresh()`` as fast as possible while
+``--listeners`` change listeners are subscribed, and the script reports the time per
+refresh (decode, diff and emitter fan-out) and the traced memory peak. Record real
+traffic with :class:`edgeflags.recording.Recorder`, or synthesize a change history
+against a local server:
+
+    python benchmarks/bench_replay.py traffic.jsonl.gz --listeners 100
+    python benchmarks/bench_replay.py --generate 500 --configs 2000
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import statistics
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from edgeflags import EdgeFlagsSync
+from edgeflags.fetcher import SyncFetcher
+from edgeflags.recording import Recorder, ReplayTransport
+from edgeflags.testing import StandInServer, generate_configs, generate_flags
+
+
+def _generate(path: Path, changes: int, count: int) -> None:
+    rng = random.Random(0)
+    flags = generate_flags(count)
+    configs = generate_configs(count)
+    with StandInServer(flags=flags, configs=configs) as server, Recorder(path) as recorder:
+        fetcher = SyncFetcher(server.url, "bench", recorder=recorder)
+        version = fetcher.fetch_all({}).get("version")
+        for _ in range(changes):
+            keys = rng.sample(sorted(configs), k=max(1, count // 100))
+            server.publish(configs={key: {"rev": rng.random(), "on": True} for key in keys})
+            version = fetcher.fetch_all({}, since=version).get("version")
+        fetcher.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("recording", nargs="?", type=Path)
+    parser.add_argument("--generate", type=int, default=200, help="changes to synthesize")
+    parser.add_argument("--configs", type=int, default=2000)
+    parser.add_argument("--listeners", type=int, default=100)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = args.recording
+        if path is None:
+            path = Path(tmp) / "generated.jsonl.gz"
+            _generate(path, args.generate, args.configs)
+        transport = ReplayTransport(path, speed=None)
+        client = EdgeFlagsSync(
+            "bench", "http://replay", polling_interval=3600, http_transport=transport
+        )
+        events = [0]
+        for _ in range(args.listeners):
+            client.on("change", lambda event: events.__setitem__(0, events[0] + 1))
+
+        tracemalloc.start()
+        client.init()
+        durations: list[float] = []
+        while True:
+            start = time.perf_counter()
+            try:
+                client.refresh()
+            except Exception:
+                if transport.exhausted:
+                    break
+                raise
+            durations.append(time.perf_counter() - start)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        client.destroy()
+
+    ms = sorted(d * 1000 for d in durations)
+    p99 = ms[max(int(len(ms) * 0.99) - 1, 0)]
+    print(
+        f"refreshes={len(ms)}  mean={statistics.fmean(ms):.2f}ms  p99={p99:.2f}ms  "
+        f"events={events[0]}  peak={peak / 1e6:.1f}MB"
+    )
+
+
+if __name__ == "__main__":
+    main()
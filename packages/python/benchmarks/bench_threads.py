@@ -0,0 +1,87 @@
+"""Measure ``flag()`` throughput as reader threads are added.
+
+Reader threads call ``flag()`` in a loop for a fixed time while a background poller
+applies a change every ``--update-interval`` seconds. On free-threaded builds
+(``python3.13t``) throughput should grow close to linearly with the thread count up to
+the number of cores; with the GIL it stays flat:
+
+    python3.13t -X gil=0 benchmarks/bench_threads.py --threads 1 2 4 8 16 32
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import threading
+import time
+
+from edgeflags import EdgeFlagsSync
+from edgeflags.testing import StandInServer, generate_flags
+
+
+def _run(client: EdgeFlagsSync, keys: list[str], threads: int, duration: float) -> int:
+    counts = [0] * threads
+    start = threading.Barrier(threads + 1)
+    stop = threading.Event()
+
+    def reader(slot: int) -> None:
+        flag = client.flag
+        n = 0
+        start.wait()
+        while not stop.is_set():
+            for key in keys:
+                flag(key)
+            n += len(keys)
+        counts[slot] = n
+
+    workers = [threading.Thread(target=reader, args=(i,)) for i in range(threads)]
+    for worker in workers:
+        worker.start()
+    start.wait()
+    time.sleep(duration)
+    stop.set()
+    for worker in workers:
+        worker.join()
+    return sum(counts)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32])
+    parser.add_argument("--flags", type=int, default=1000)
+    parser.add_argument("--duration", type=float, default=2.0, help="seconds per run")
+    parser.add_argument("--update-interval", type=float, default=0.1)
+    args = parser.parse_args()
+
+    gil = getattr(sys, "_is_gil_enabled", lambda: True)()
+    print(f"Python {sys.version.split()[0]}, GIL {'enabled' if gil else 'disabled'}")
+    flags = generate_flags(args.flags)
+    keys = list(flags)[:100]
+    with StandInServer(flags=flags) as server:
+        client = EdgeFlagsSync("bench", server.url, polling_interval=args.update_interval)
+        client.init()
+        publishing = threading.Event()
+
+        def publish() -> None:
+            n = 0
+            while not publishing.wait(args.update_interval):
+                n += 1
+                server.publish(flags={keys[n % len(keys)]: n})
+
+        publisher = threading.Thread(target=publish, daemon=True)
+        publisher.start()
+        baseline: float | None = None
+        for threads in args.threads:
+            rate = _run(client, keys, threads, args.duration) / args.duration
+            baseline = baseline or rate / threads
+            print(
+                f"threads={threads:>3}  reads/s={rate / 1e6:7.2f}M  "
+                f"per thread={rate / threads / 1e6:6.2f}M  "
+                f"scaling={rate / baseline:5.1f}x"
+            )
+        publishing.set()
+        client.destroy()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,29 +1,53 @@
+from .cache import Snapshot
 from .client import EdgeFlags, EdgeFlagsSync
-from .errors import EdgeFlagsError
+from .errors import ChangeFeedOverrun, EdgeFlagsError, SnapshotFormatError
+from .frozen import FrozenDict
 from .mock import create_mock_client, create_mock_client_sync
+from .snapshot_file import SnapshotFile, load_snapshot, write_snapshot
 from .types import (
     Bootstrap,
     ChangeEvent,
     ConfigChange,
     EdgeFlagsEvent,
+    EndpointStats,
     EvaluationContext,
     EvaluationResponse,
+    FailoverStats,
     FlagChange,
     FlagValue,
+    InitReport,
+    KeyReadStats,
+    PathChange,
+    ReadReport,
+    SourceTiming,
 )
 
 __all__ = [
     "EdgeFlags",
     "EdgeFlagsSync",
     "EdgeFlagsError",
+    "ChangeFeedOverrun",
+    "SnapshotFormatError",
+    "FrozenDict",
+    "Snapshot",
+    "SnapshotFile",
+    "load_snapshot",
+    "write_snapshot",
     "create_mock_client",
     "create_mock_client_sync",
     "Bootstrap",
     "ChangeEvent",
     "ConfigChange",
     "EdgeFlagsEvent",
+    "EndpointStats",
     "EvaluationContext",
     "EvaluationResponse",
+    "FailoverStats",
     "FlagChange",
     "FlagValue",
+    "InitReport",
+    "KeyReadStats",
+    "PathChange",
+    "ReadReport",
+    "SourceTiming",
 ]
@@ -0,0 +1,231 @@
+"""Evaluate flags for many contexts at once, for batch jobs.
+
+:class:`BulkEvaluator` streams contexts from any iterable (or async iterable) through
+one pooled :class:`AsyncFetcher` and yields a result per context, in input order::
+
+    async with BulkEvaluator("https://flags.example.com", token) as bulk:
+        async for result in bulk.evaluate(read_contexts("users.jsonl")):
+            ...
+
+At most ``concurrency`` contexts are in flight, so memory stays constant however long
+the input is. Each context is first reduced to the attributes the service reports its
+flags depend on (see :func:`minimize_context`); contexts that minimize to the same
+encoding share one request, in flight or from a bounded cache of recent responses.
+Results carry their position in the input, so a job can resume from where it stopped
+with ``start=``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+from collections import OrderedDict, deque
+from collections.abc import AsyncIterable, AsyncIterator, Iterable, Iterator, Sequence
+from itertools import islice
+from types import TracebackType
+from typing import Any, TypedDict, cast
+
+import httpx
+
+from .context import EncodedContext, minimize_context
+from .errors import EdgeFlagsError
+from .fetcher import AsyncFetcher, HTTPMethod
+from .scope import make_scope
+from .snapshot_file import StrPath
+from .types import EvaluationContext, EvaluationResponse, FlagValue
+
+_BACKOFF = 0.5
+_MAX_BACKOFF = 30.0
+
+
+class _BulkResultBase(TypedDict):
+    index: int
+    context: EvaluationContext
+
+
+class BulkResult(_BulkResultBase, total=False):
+    """Evaluation of the context at ``index``; failed ones carry ``error`` instead."""
+
+    version: int
+    flags: dict[str, FlagValue]
+    configs: dict[str, Any]
+    error: str
+
+
+def read_contexts(path: StrPath) -> Iterator[EvaluationContext]:
+    """Yield the contexts of a JSON Lines file, one object per line, reading as it goes.
+
+    Blank lines are skipped and don't count as contexts.
+    """
+    with open(path, encoding="utf-8") as file:
+        for number, line in enumerate(file, 1):
+            if not line.strip():
+                continue
+            context = json.loads(line)
+            if not isinstance(context, dict):
+                raise ValueError(f"{path}:{number}: a context must be a JSON object")
+            yield cast(EvaluationContext, context)
+
+
+def _retryable(exc: Exception) -> bool:
+    if isinstance(exc, httpx.TransportError):
+        return True
+    status = exc.status_code if isinstance(exc, EdgeFlagsError) else None
+    return status is not None and (status == 429 or status >= 500)
+
+
+async def _aiter(
+    contexts: Iterable[EvaluationContext] | AsyncIterable[EvaluationContext], start: int
+) -> AsyncIterator[EvaluationContext]:
+    if isinstance(contexts, AsyncIterable):
+        index = 0
+        async for context in contexts:
+            if index >= start:
+                yield context
+            index += 1
+    else:
+        for context in islice(contexts, start, None):
+            yield context
+
+
+class BulkEvaluator:
+    """Evaluates streams of contexts with bounded concurrency over one fetcher.
+
+    ``keys``/``prefixes`` limit the evaluated keys like a scoped fetch. Failed
+    requests are retried ``retries`` times on transport errors, ``429`` and ``5xx``,
+    waiting for ``Retry-After`` or an exponential backoff; a context that still fails
+    yields a result with ``error`` set rather than ending the stream. ``cache_size``
+    bounds how many responses are kept for contexts that minimize alike.
+
+    When a response reports new dependencies, the cached responses are dropped and
+    contexts that shared a request minimized without the new attributes are evaluated
+    again. ``requests`` counts evaluate requests sent and ``deduplicated`` the
+    contexts answered without one.
+    """
+
+    def __init__(
+        self,
+        base_url: str | Sequence[str],
+        token: str,
+        *,
+        concurrency: int = 16,
+        keys: Iterable[str] | None = None,
+        prefixes: Iterable[str] | None = None,
+        method: HTTPMethod = "POST",
+        cache_size: int = 1024,
+        retries: int = 3,
+        uds: str | None = None,
+        transport: httpx.AsyncBaseTransport | None = None,
+    ) -> None:
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+        self._fetcher = AsyncFetcher(base_url, token, method=method, uds=uds, transport=transport)
+        self._concurrency = concurrency
+        self._scope = make_scope(keys, prefixes)
+        self._cache_size = cache_size
+        self._retries = retries
+        self._responses: OrderedDict[EncodedContext, asyncio.Task[EvaluationResponse]] = (
+            OrderedDict()
+        )
+        self._attributes: frozenset[str] | None = None
+        self.requests = 0
+        self.deduplicated = 0
+
+    async def evaluate(
+        self,
+        contexts: Iterable[EvaluationContext] | AsyncIterable[EvaluationContext],
+        *,
+        start: int = 0,
+    ) -> AsyncIterator[BulkResult]:
+        """Yield a result per context, in input order, skipping the first ``start``."""
+        window: deque[asyncio.Task[BulkResult]] = deque()
+        index = start
+        try:
+            async for context in _aiter(contexts, start):
+                if len(window) >= self._concurrency:
+                    yield await window.popleft()
+                window.append(asyncio.ensure_future(self._evaluate(index, context)))
+                index += 1
+            while window:
+                yield await window.popleft()
+        finally:
+            for task in window:
+                task.cancel()
+            await asyncio.gather(*window, return_exceptions=True)
+
+    async def _evaluate(self, index: int, context: EvaluationContext) -> BulkResult:
+        responses = self._responses
+        while True:
+            attributes = self._fetcher.context_attributes
+            if attributes != self._attributes:
+                # Responses cached under the previous dependency map were shared by
+                # contexts minimized without the attributes added since.
+                self._attributes = attributes
+                responses.clear()
+            encoded = EncodedContext(minimize_context(context, attributes))
+            task = responses.get(encoded)
+            if task is None:
+                task = asyncio.ensure_future(self._fetch(encoded))
+                responses[encoded] = task
+                if len(responses) > self._cache_size:
+                    responses.popitem(last=False)
+            else:
+                responses.move_to_end(encoded)
+                self.deduplicated += 1
+            try:
+                data = await asyncio.shield(task)
+            except Exception as exc:
+                if responses.get(encoded) is task:
+                    del responses[encoded]
+                return BulkResult(index=index, context=context, error=str(exc) or repr(exc))
+            # A response may report attributes this context was minimized without;
+            # evaluate it again if the request left out any it has.
+            latest = self._fetcher.context_attributes
+            if latest == attributes or EncodedContext(
+                minimize_context(context, latest)
+            ) == EncodedContext(minimize_context(encoded.context, latest)):
+                break
+        result = BulkResult(
+            index=index, context=context, flags=data["flags"], configs=data["configs"]
+        )
+        if "version" in data:
+            result["version"] = data["version"]
+        return result
+
+    async def _fetch(self, encoded: EncodedContext) -> EvaluationResponse:
+        attempt = 0
+        while True:
+            self.requests += 1
+            try:
+                data = await self._fetcher.fetch_all(encoded, scope=self._scope)
+            except (EdgeFlagsError, httpx.TransportError) as exc:
+                if attempt >= self._retries or not _retryable(exc):
+                    raise
+                hint = exc.retry_after if isinstance(exc, EdgeFlagsError) else None
+                await asyncio.sleep(
+                    min(_BACKOFF * 2**attempt, _MAX_BACKOFF) if hint is None else hint
+                )
+                attempt += 1
+                continue
+            # Cached for deduplication: keep only what results carry.
+            kept = EvaluationResponse(flags=data["flags"], configs=data["configs"])
+            if "version" in data:
+                kept["version"] = data["version"]
+            return kept
+
+    async def close(self) -> None:
+        for task in self._responses.values():
+            task.cancel()
+        self._responses.clear()
+        await self._fetcher.close()
+
+    async def __aenter__(self) -> BulkEvaluator:
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        await self.close()
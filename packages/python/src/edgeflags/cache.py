@@ -1,9 +1,26 @@
 from __future__ import annotations
 
+import sys
 import threading
+from bisect import bisect_left
+from collections.abc import Callable, Iterable, Iterator, Mapping
+from contextlib import AbstractContextManager
+from contextvars import ContextVar, Token
+from heapq import merge as merge_sorted
+from types import MappingProxyType
 from typing import Any
 
-from .types import ChangeEvent, ConfigChange, FlagChange, FlagValue
+from .frozen import FrozenDict, freeze
+from .paths import escape
+from .scope import Scope
+from .types import (
+    ChangeEvent,
+    ConfigChange,
+    EvaluationResponse,
+    FlagChange,
+    FlagValue,
+    PathChange,
+)
 
 
 def _deep_equal(a: object, b: object) -> bool:
@@ -11,78 +28,641 @@ def _deep_equal(a: object, b: object) -> bool:
         return True
     if a is None or b is None:
         return a is b
-    if type(a) is not type(b):
-        return False
     if isinstance(a, dict) and isinstance(b, dict):
         if len(a) != len(b):
             return False
         return all(key in b and _deep_equal(a[key], b[key]) for key in a)
-    if isinstance(a, list) and isinstance(b, list):
+    if isinstance(a, (list, tuple)) and isinstance(b, (list, tuple)):
         if len(a) != len(b):
             return False
         return all(_deep_equal(x, y) for x, y in zip(a, b, strict=True))
+    if type(a) is not type(b):
+        return False
     return a == b
 
 
+_ABSENT: Any = object()
+
+# (key, previous, current, path changes or None)
+_Change = tuple[str, Any, Any, "list[PathChange] | None"]
+
+
+class VersionGap(Exception):
+    """Raised when a delta does not apply to the cached snapshot version."""
+
+
+class Snapshot:
+    """Immutable point-in-time view of the cached flags and configs.
+
+    The underlying dicts are never mutated once a snapshot is published, so the
+    read-only views can be handed out without copying. ``tags`` maps config keys to
+    the tags the service assigned them.
+    """
+
+    __slots__ = ("flags", "configs", "version", "tags", "_keys", "_tagged")
+
+    def __init__(
+        self,
+        flags: Mapping[str, FlagValue],
+        configs: Mapping[str, Any],
+        version: int | None = None,
+        tags: Mapping[str, tuple[str, ...]] | None = None,
+    ) -> None:
+        self.flags = flags if isinstance(flags, MappingProxyType) else MappingProxyType(flags)
+        self.configs = (
+            configs if isinstance(configs, MappingProxyType) else MappingProxyType(configs)
+        )
+        self.version = version
+        self.tags: Mapping[str, tuple[str, ...]] = _NO_TAGS if tags is None else tags
+        # Sorted config keys and config keys by tag, built on first use and carried
+        # over to later snapshots by the updates that derive them.
+        self._keys: tuple[str, ...] | None = None
+        self._tagged: dict[str, tuple[str, ...]] | None = None
+
+    def configs_with_prefix(self, prefix: str) -> Mapping[str, Any]:
+        """Read-only view of the configs whose keys start with ``prefix``."""
+        keys = self._keys
+        if keys is None:
+            keys = self._keys = tuple(sorted(self.configs))
+        lo = bisect_left(keys, prefix)
+        end = _prefix_end(prefix)
+        hi = len(keys) if end is None else bisect_left(keys, end, lo)
+        return _KeyRange(self.configs, keys, lo, hi)
+
+    def configs_with_tag(self, tag: str) -> Mapping[str, Any]:
+        """Read-only view of the configs tagged ``tag``."""
+        tagged = self._tagged
+        if tagged is None:
+            tagged = self._tagged = _tag_index(self.tags, self.configs)
+        keys = tagged.get(tag, ())
+        return _KeyRange(self.configs, keys, 0, len(keys))
+
+    def _derive(
+        self,
+        flags: Mapping[str, FlagValue],
+        configs: Mapping[str, Any],
+        version: int | None,
+        tags: Mapping[str, tuple[str, ...]],
+        keys: tuple[str, ...] | None,
+    ) -> Snapshot:
+        snapshot = Snapshot(flags, configs, version, tags)
+        snapshot._keys = keys
+        if keys is self._keys and tags is self.tags:
+            snapshot._tagged = self._tagged
+        return snapshot
+
+
+_NO_TAGS: Mapping[str, tuple[str, ...]] = MappingProxyType({})
+
+
+def _prefix_end(prefix: str) -> str | None:
+    # The smallest string sorting after every string that starts with ``prefix``.
+    prefix = prefix.rstrip("\U0010ffff")
+    return prefix[:-1] + chr(ord(prefix[-1]) + 1) if prefix else None
+
+
+def _tag_index(
+    tags: Mapping[str, tuple[str, ...]], configs: Mapping[str, Any]
+) -> dict[str, tuple[str, ...]]:
+    index: dict[str, list[str]] = {}
+    for key in sorted(tags):
+        if key in configs:
+            for tag in tags[key]:
+                index.setdefault(tag, []).append(key)
+    return {tag: tuple(keys) for tag, keys in index.items()}
+
+
+class _KeyRange(Mapping[str, Any]):
+    """Read-only view of the configs named by the sorted run ``keys[lo:hi]``."""
+
+    __slots__ = ("_values", "_keys", "_lo", "_hi")
+
+    def __init__(self, values: Mapping[str, Any], keys: tuple[str, ...], lo: int, hi: int) -> None:
+        self._values = values
+        self._keys = keys
+        self._lo = lo
+        self._hi = hi
+
+    def __getitem__(self, key: str) -> Any:
+        i = bisect_left(self._keys, key, self._lo, self._hi)
+        if i < self._hi and self._keys[i] == key:
+            return self._values[key]
+        raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._keys[self._lo : self._hi])
+
+    def __len__(self) -> int:
+        return self._hi - self._lo
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({dict(self.items())!r})"
+
+
+_EMPTY = Snapshot({}, {})
+
+
+def _share(old: Any, new: Any, pointer: str, paths: list[PathChange] | None) -> Any:
+    """Freeze ``new``, reusing the subtrees of the frozen ``old`` value it leaves unchanged.
+
+    Returns ``old`` itself when nothing changed. With ``paths`` given, every changed
+    leaf is appended to it, addressed by a JSON pointer below ``pointer``.
+    """
+    if isinstance(old, dict) and isinstance(new, dict):
+        fields: dict[str, Any] = {}
+        same = len(old) == len(new)
+        for key, value in new.items():
+            child = pointer if paths is None else f"{pointer}/{escape(key)}"
+            previous = old.get(key, _ABSENT)
+            if previous is _ABSENT:
+                shared = freeze(value)
+                if paths is not None:
+                    paths.append(PathChange(path=child, previous=None, current=shared))
+                same = False
+            else:
+                shared = _share(previous, value, child, paths)
+                same = same and shared is previous
+            fields[sys.intern(key)] = shared
+        if same:
+            return old
+        if paths is not None:
+            for key, previous in old.items():
+                if key not in new:
+                    paths.append(
+                        PathChange(
+                            path=f"{pointer}/{escape(key)}", previous=previous, current=None
+                        )
+                    )
+        return FrozenDict(fields)
+
+    if isinstance(old, tuple) and isinstance(new, (list, tuple)):
+        items: list[Any] = []
+        same = len(old) == len(new)
+        for i, value in enumerate(new):
+            child = pointer if paths is None else f"{pointer}/{i}"
+            if i < len(old):
+                shared = _share(old[i], value, child, paths)
+                same = same and shared is old[i]
+            else:
+                shared = freeze(value)
+                if paths is not None:
+                    paths.append(PathChange(path=child, previous=None, current=shared))
+            items.append(shared)
+        if same:
+            return old
+        if paths is not None:
+            for i in range(len(new), len(old)):
+                paths.append(PathChange(path=f"{pointer}/{i}", previous=old[i], current=None))
+        return tuple(items)
+
+    if _deep_equal(old, new):
+        return old
+    frozen = freeze(new)
+    if paths is not None:
+        paths.append(PathChange(path=pointer, previous=old, current=frozen))
+    return frozen
+
+
+def _diff(
+    previous: Mapping[str, Any],
+    upserts: Mapping[str, Any],
+    deleted: Iterable[str],
+    paths: bool = False,
+) -> list[_Change]:
+    changes: list[_Change] = []
+    for key, value in upserts.items():
+        old = previous.get(key)
+        pointer = f"/{escape(key)}" if paths else ""
+        if old is None:
+            if value is None:
+                continue
+            current = freeze(value)
+            added = [PathChange(path=pointer, previous=None, current=current)] if paths else None
+            changes.append((sys.intern(key), None, current, added))
+            continue
+        changed: list[PathChange] | None = [] if paths else None
+        current = _share(old, value, pointer, changed)
+        if current is not old:
+            changes.append((sys.intern(key), old, current, changed))
+    for key in deleted:
+        old = previous.get(key)
+        if old is not None and key not in upserts:
+            removed = (
+                [PathChange(path=f"/{escape(key)}", previous=old, current=None)] if paths else None
+            )
+            changes.append((key, old, None, removed))
+    return changes
+
+
+def _patch(previous: Mapping[str, Any], changes: list[_Change]) -> dict[str, Any]:
+    patched = dict(previous)
+    for key, _, current, _ in changes:
+        if current is None:
+            patched.pop(key, None)
+        else:
+            patched[key] = current
+    return patched
+
+
+class PendingUpdate:
+    """Diff of an update against the ``base`` snapshot, ready to be published."""
+
+    __slots__ = ("base", "data", "snapshot", "flag_changes", "config_changes")
+
+    def __init__(
+        self,
+        base: Snapshot,
+        data: EvaluationResponse | None,
+        snapshot: Snapshot,
+        flag_changes: list[_Change],
+        config_changes: list[_Change],
+    ) -> None:
+        self.base = base
+        self.data = data
+        self.snapshot = snapshot
+        self.flag_changes = flag_changes
+        self.config_changes = config_changes
+
+
+def _reindex(keys: tuple[str, ...] | None, changes: list[_Change]) -> tuple[str, ...] | None:
+    """Sorted config keys after ``changes``, merged from the sorted ``keys`` before them."""
+    if keys is None:
+        return None
+    added = sorted(key for key, previous, _, _ in changes if previous is None)
+    removed = {key for key, _, current, _ in changes if current is None}
+    if not added and not removed:
+        return keys
+    kept = [key for key in keys if key not in removed] if removed else keys
+    return tuple(merge_sorted(kept, added))
+
+
+def _retag(
+    current: Mapping[str, tuple[str, ...]],
+    changes: list[_Change],
+    tags: Mapping[str, Iterable[str]] | None,
+    replace: bool,
+) -> Mapping[str, tuple[str, ...]]:
+    """Tags after an update; entries in ``tags`` replace a key's tags, deletions drop them."""
+    removed = [key for key, _, value, _ in changes if value is None and key in current]
+    if not tags and not removed and not (replace and current):
+        return current
+    patched = {} if replace else dict(current)
+    for key in removed:
+        patched.pop(key, None)
+    for key, names in (tags or {}).items():
+        if names:
+            patched[sys.intern(key)] = tuple(sorted(set(names)))
+        else:
+            patched.pop(key, None)
+    return current if patched == current else MappingProxyType(patched)
+
+
+def _prepare(
+    current: Snapshot,
+    flags: Mapping[str, FlagValue],
+    configs: Mapping[str, Any],
+    deleted_flags: Iterable[str],
+    deleted_configs: Iterable[str],
+    version: int | None,
+    data: EvaluationResponse | None = None,
+    paths: bool = False,
+    tags: Mapping[str, Iterable[str]] | None = None,
+    replace_tags: bool = False,
+) -> PendingUpdate:
+    flag_changes = _diff(current.flags, flags, deleted_flags)
+    config_changes = _diff(current.configs, configs, deleted_configs, paths)
+    next_tags = _retag(current.tags, config_changes, tags, replace_tags)
+    if not flag_changes and not config_changes and next_tags is current.tags:
+        snapshot = (
+            current
+            if version == current.version
+            else current._derive(current.flags, current.configs, version, next_tags, current._keys)
+        )
+    else:
+        snapshot = current._derive(
+            _patch(current.flags, flag_changes) if flag_changes else current.flags,
+            _patch(current.configs, config_changes) if config_changes else current.configs,
+            version,
+            next_tags,
+            _reindex(current._keys, config_changes),
+        )
+    return PendingUpdate(current, data, snapshot, flag_changes, config_changes)
+
+
+def _prepare_response(
+    current: Snapshot, data: EvaluationResponse, paths: bool = False
+) -> PendingUpdate:
+    flags = data["flags"]
+    configs = data["configs"]
+    if "base_version" in data:
+        if data["base_version"] != current.version:
+            raise VersionGap(f"delta base {data['base_version']} != cached {current.version}")
+        return _prepare(
+            current,
+            flags,
+            configs,
+            data.get("deleted_flags", ()),
+            data.get("deleted_configs", ()),
+            data.get("version", current.version),
+            data,
+            paths,
+            data.get("tags"),
+        )
+    return _prepare(
+        current,
+        flags,
+        configs,
+        [key for key in current.flags if key not in flags],
+        [key for key in current.configs if key not in configs],
+        data.get("version"),
+        data,
+        paths,
+        data.get("tags"),
+        replace_tags=True,
+    )
+
+
+class _Decoded:
+    """Memoized decode of one config value; ``source`` is the raw value it came from."""
+
+    __slots__ = ("value", "source")
+
+    def __init__(self, value: Any, source: Any) -> None:
+        self.value = value
+        self.source = source
+
+
 class Cache:
-    def __init__(self) -> None:
-        self._flags: dict[str, FlagValue] = {}
-        self._configs: dict[str, Any] = {}
-        self._lock = threading.Lock()
+    """Copy-on-write store of flag and config values.
+
+    Readers load the current :class:`Snapshot` without locking; writers build a
+    new snapshot under ``lock`` (a :class:`threading.Lock` by default) and swap it in.
+    Flag and config reads store nothing shared, so on free-threaded builds they scale
+    across cores; until something is pinned they skip the context variable lookup as
+    well.
+
+    Two read paths fill caches on first use: a snapshot's sorted key and tag indexes
+    (:meth:`Snapshot.configs_with_prefix`, :meth:`Snapshot.configs_with_tag`) and the
+    decoded values of :meth:`decode_config`. These fills race benignly. Each value is
+    computed from immutable inputs, either the snapshot itself or the raw config it is
+    stored against, and published with a single attribute or dict store. Concurrent
+    readers at worst compute it twice, and whichever store lands is correct.
+    """
+
+    def __init__(
+        self, *, path_changes: bool = False, lock: AbstractContextManager[Any] | None = None
+    ) -> None:
+        self._snapshot = _EMPTY
+        self._path_changes = path_changes
+        self._pinned: ContextVar[Snapshot | None] = ContextVar(
+            f"edgeflags_pinned_{id(self)}", default=None
+        )
+        self._pinning = False
+        self._decoded: dict[str, dict[object, _Decoded]] = {}
+        self._lock = lock if lock is not None else threading.Lock()
+
+    def snapshot(self) -> Snapshot:
+        """Return the snapshot pinned in the current context, or the latest one."""
+        if self._pinning:
+            return self._pinned.get() or self._snapshot
+        return self._snapshot
+
+    def pin(self) -> Token[Snapshot | None]:
+        """Pin the latest snapshot for reads in the current context."""
+        self._pinning = True
+        return self._pinned.set(self._snapshot)
+
+    def unpin(self, token: Token[Snapshot | None]) -> None:
+        self._pinned.reset(token)
+
+    @property
+    def version(self) -> int | None:
+        return self._snapshot.version
 
     def get_flag(self, key: str) -> FlagValue | None:
-        with self._lock:
-            return self._flags.get(key)
+        if self._pinning:
+            return (self._pinned.get() or self._snapshot).flags.get(key)
+        return self._snapshot.flags.get(key)
 
     def get_config(self, key: str) -> Any | None:
-        with self._lock:
-            return self._configs.get(key)
+        if self._pinning:
+            return (self._pinned.get() or self._snapshot).configs.get(key)
+        return self._snapshot.configs.get(key)
 
-    def all_flags(self) -> dict[str, FlagValue]:
-        with self._lock:
-            return dict(self._flags)
+    def all_flags(self) -> Mapping[str, FlagValue]:
+        return self.snapshot().flags
 
-    def all_configs(self) -> dict[str, Any]:
-        with self._lock:
-            return dict(self._configs)
+    def all_configs(self) -> Mapping[str, Any]:
+        return self.snapshot().configs
+
+    def decode_config(
+        self,
+        key: str,
+        target: object,
+        decode: Callable[[Any], Any],
+        on_error: Callable[[Exception], None],
+    ) -> Any | None:
+        """Return config ``key`` decoded with ``decode``, memoized per ``target``.
+
+        The decoded value is reused until an update changes ``key``. When decoding a
+        changed value fails, ``on_error`` is called and the last good value is kept.
+        """
+        raw = self.get_config(key)
+        if raw is None:
+            return None
+        entries = self._decoded.get(key)
+        if entries is None:
+            entries = self._decoded.setdefault(key, {})
+        entry = entries.get(target)
+        if entry is not None and entry.source is raw:
+            return entry.value
+
+        try:
+            value = decode(raw)
+        except Exception as exc:
+            on_error(exc)
+            if entry is None:
+                return None
+            # Keep serving the last good value until the key changes again.
+            entry.source = raw
+            return entry.value
+        entries[target] = _Decoded(value, raw)
+        return value
 
     def update(
         self,
-        flags: dict[str, FlagValue],
-        configs: dict[str, Any],
+        flags: Mapping[str, FlagValue],
+        configs: Mapping[str, Any],
+        *,
+        deleted_flags: Iterable[str] = (),
+        deleted_configs: Iterable[str] = (),
+        base_version: int | None = None,
+        version: int | None = None,
+        tags: Mapping[str, Iterable[str]] | None = None,
     ) -> ChangeEvent | None:
+        """Merge upserted and deleted keys into the cache.
+
+        With ``base_version`` set the update is a delta and raises :class:`VersionGap`
+        unless the cache currently holds exactly that version. ``tags`` replaces the
+        tags of the config keys it lists. The sorted key and tag indexes behind
+        :meth:`Snapshot.configs_with_prefix` and :meth:`Snapshot.configs_with_tag` are
+        carried over and patched with just the added and deleted keys.
+        """
         with self._lock:
-            flag_changes: list[FlagChange] = []
-            config_changes: list[ConfigChange] = []
-
-            for key, current in flags.items():
-                previous = self._flags.get(key)
-                if not _deep_equal(previous, current):
-                    flag_changes.append(FlagChange(key=key, previous=previous, current=current))
-                self._flags[key] = current
-
-            for key, current in configs.items():
-                previous = self._configs.get(key)
-                if not _deep_equal(previous, current):
-                    config_changes.append(
-                        ConfigChange(key=key, previous=previous, current=current)
-                    )
-                self._configs[key] = current
+            current = self._snapshot
+            if base_version is not None and base_version != current.version:
+                raise VersionGap(f"delta base {base_version} != cached {current.version}")
+            return self._publish(
+                _prepare(
+                    current,
+                    flags,
+                    configs,
+                    deleted_flags,
+                    deleted_configs,
+                    current.version if version is None else version,
+                    paths=self._path_changes,
+                    tags=tags,
+                )
+            )
 
-            if not flag_changes and not config_changes:
-                return None
-            return ChangeEvent(flags=flag_changes, configs=config_changes)
+    def replace(
+        self,
+        flags: Mapping[str, FlagValue],
+        configs: Mapping[str, Any],
+        *,
+        version: int | None = None,
+        tags: Mapping[str, Iterable[str]] | None = None,
+    ) -> ChangeEvent | None:
+        """Replace the cache with a full snapshot, deleting keys absent from it."""
+        with self._lock:
+            current = self._snapshot
+            return self._publish(
+                _prepare(
+                    current,
+                    flags,
+                    configs,
+                    [key for key in current.flags if key not in flags],
+                    [key for key in current.configs if key not in configs],
+                    version,
+                    paths=self._path_changes,
+                    tags=tags,
+                    replace_tags=True,
+                )
+            )
+
+    def merge(self, data: EvaluationResponse, scope: Scope) -> ChangeEvent | None:
+        """Apply a full response covering only the keys in ``scope``.
+
+        Keys in scope missing from the response are deleted, keys outside it are kept,
+        and the cached version is left alone since the rest of the snapshot was not
+        refreshed.
+        """
+        flags = data["flags"]
+        configs = data["configs"]
+        with self._lock:
+            current = self._snapshot
+            return self._publish(
+                _prepare(
+                    current,
+                    flags,
+                    configs,
+                    [key for key in current.flags if key in scope and key not in flags],
+                    [key for key in current.configs if key in scope and key not in configs],
+                    current.version,
+                    paths=self._path_changes,
+                    tags=data.get("tags"),
+                )
+            )
+
+    def apply(self, data: EvaluationResponse) -> ChangeEvent | None:
+        """Apply an evaluation response, as a delta if it carries ``base_version``."""
+        with self._lock:
+            return self._publish(_prepare_response(self._snapshot, data, self._path_changes))
+
+    def prepare(self, data: EvaluationResponse) -> PendingUpdate:
+        """Diff ``data`` against the latest snapshot without publishing anything.
+
+        This does the expensive freezing and diffing outside the lock, so it can run
+        in a worker thread; hand the result to :meth:`commit` to publish it.
+        """
+        return _prepare_response(self._snapshot, data, self._path_changes)
+
+    def commit(self, pending: PendingUpdate) -> ChangeEvent | None:
+        """Publish a prepared update, re-diffing if the cache moved on meanwhile."""
+        with self._lock:
+            if pending.base is not self._snapshot:
+                assert pending.data is not None
+                pending = _prepare_response(self._snapshot, pending.data, self._path_changes)
+            return self._publish(pending)
+
+    def _publish(self, pending: PendingUpdate) -> ChangeEvent | None:
+        self._snapshot = pending.snapshot
+        if not pending.flag_changes and not pending.config_changes:
+            return None
+
+        configs: list[ConfigChange] = []
+        for key, previous, current, paths in pending.config_changes:
+            for entry in self._decoded.get(key, {}).values():
+                entry.source = None
+            change = ConfigChange(key=key, previous=previous, current=current)
+            if paths is not None:
+                change["paths"] = paths
+            configs.append(change)
+
+        return ChangeEvent(
+            flags=[
+                FlagChange(key=k, previous=p, current=c) for k, p, c, _ in pending.flag_changes
+            ],
+            configs=configs,
+        )
 
     def seed(
         self,
-        flags: dict[str, FlagValue],
-        configs: dict[str, Any],
+        flags: Mapping[str, FlagValue],
+        configs: Mapping[str, Any],
+        *,
+        version: int | None = None,
+        tags: Mapping[str, Iterable[str]] | None = None,
     ) -> None:
         with self._lock:
-            self._flags.update(flags)
-            self._configs.update(configs)
+            current = self._snapshot
+            next_flags = dict(current.flags)
+            next_flags.update((sys.intern(key), freeze(value)) for key, value in flags.items())
+            next_configs = dict(current.configs)
+            next_configs.update((sys.intern(key), freeze(value)) for key, value in configs.items())
+            self._snapshot = Snapshot(
+                next_flags,
+                next_configs,
+                current.version if version is None else version,
+                _retag(current.tags, [], tags, False),
+            )
+
+    def adopt(
+        self,
+        flags: Mapping[str, FlagValue],
+        configs: Mapping[str, Any],
+        *,
+        version: int | None = None,
+    ) -> None:
+        """Publish ``flags``/``configs`` as the snapshot without copying or freezing them.
+
+        The mappings must never change and must yield frozen values, like the lazily
+        decoded mappings of a loaded snapshot file. ``version`` is the version they
+        were fetched at, so the next refresh can ask for a delta against it; without
+        one it fetches a full snapshot.
+        """
+        with self._lock:
+            self._snapshot = Snapshot(flags, configs, version)
+
+    def forget_version(self) -> None:
+        """Drop the cached version so the next refresh fetches a full snapshot."""
+        with self._lock:
+            current = self._snapshot
+            self._snapshot = current._derive(
+                current.flags, current.configs, None, current.tags, current._keys
+            )
 
     def clear(self) -> None:
         with self._lock:
-            self._flags.clear()
-            self._configs.clear()
+            self._snapshot = _EMPTY
+            self._decoded.clear()
@@ -0,0 +1,339 @@
+"""``python -m edgeflags`` command line.
+
+Fetch snapshots into files at build time and look inside them::
+
+    python -m edgeflags fetch --url https://flags.example.com -o flags.efsnap
+    python -m edgeflags inspect flags.efsnap
+    python -m edgeflags dump flags.efsnap --key checkout
+    python -m edgeflags diff old.efsnap flags.efsnap
+
+Evaluate flags for a JSON Lines file of contexts, resuming an interrupted run::
+
+    python -m edgeflags evaluate --url https://flags.example.com -i users.jsonl -o out.jsonl
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+from collections import deque
+from collections.abc import Iterator, Mapping, Sequence
+from typing import Any, TextIO
+
+from .bulk import BulkEvaluator, read_contexts
+from .errors import EdgeFlagsError
+from .fetcher import SyncFetcher
+from .relay import Relay
+from .scope import make_scope
+from .snapshot_file import is_snapshot_file, load_snapshot, write_snapshot
+from .types import EvaluationContext
+
+_Loaded = tuple[int | None, Mapping[str, Any], Mapping[str, Any]]
+
+# Results written between flushes of the output file during ``evaluate``.
+_FLUSH_EVERY = 1000
+
+
+def _load(path: str) -> _Loaded:
+    """Read a binary snapshot file, or a JSON file with ``flags``/``configs``."""
+    if is_snapshot_file(path):
+        snapshot = load_snapshot(path, verify=True)
+        return snapshot.version, snapshot.flags, snapshot.configs
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    return data.get("version"), data.get("flags", {}), data.get("configs", {})
+
+
+def _fetch(args: argparse.Namespace, out: TextIO) -> int:
+    token = args.token or os.environ.get("EDGEFLAGS_TOKEN")
+    if not token:
+        raise EdgeFlagsError("No token: pass --token or set EDGEFLAGS_TOKEN")
+    context = json.loads(args.context)
+    keys, prefixes = args.key or None, args.prefix or None
+    fetcher = SyncFetcher(args.url, token)
+    try:
+        data = fetcher.fetch_all(context, scope=make_scope(keys, prefixes))
+    finally:
+        fetcher.close()
+
+    version = data.get("version")
+    if args.json:
+        payload = {"version": version, "flags": data["flags"], "configs": data["configs"]}
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(payload, f, separators=(",", ":"))
+        size = os.path.getsize(args.output)
+    else:
+        size = write_snapshot(
+            args.output,
+            data["flags"],
+            data["configs"],
+            version=version,
+            context=context,
+            keys=keys,
+            prefixes=prefixes,
+        )
+    print(
+        f"Wrote {len(data['flags'])} flags and {len(data['configs'])} configs "
+        f"({size} bytes) to {args.output}",
+        file=out,
+    )
+    return 0
+
+
+def _dump(args: argparse.Namespace, out: TextIO) -> int:
+    version, flags, configs = _load(args.file)
+    if args.key is not None:
+        if args.key in flags:
+            value = flags[args.key]
+        elif args.key in configs:
+            value = configs[args.key]
+        else:
+            raise EdgeFlagsError(f"No flag or config named {args.key!r}")
+        json.dump(value, out, indent=2)
+    else:
+        payload = {"version": version, "flags": dict(flags), "configs": dict(configs)}
+        json.dump(payload, out, indent=2)
+    out.write("\n")
+    return 0
+
+
+def _inspect(args: argparse.Namespace, out: TextIO) -> int:
+    if not is_snapshot_file(args.file):
+        version, flags, configs = _load(args.file)
+        print("format:         json", file=out)
+    else:
+        snapshot = load_snapshot(args.file, verify=True)
+        version, flags, configs = snapshot.version, snapshot.flags, snapshot.configs
+        print(f"format:         binary v{snapshot.format_version} (checksum ok)", file=out)
+        if snapshot.context is not None:
+            print(f"context:        {snapshot.context}", file=out)
+            print(f"scope:          {json.dumps(snapshot.scope)}", file=out)
+    print(f"size:           {os.path.getsize(args.file)} bytes", file=out)
+    print(f"version:        {'-' if version is None else version}", file=out)
+    print(f"flags:          {len(flags)}", file=out)
+    print(f"configs:        {len(configs)}", file=out)
+
+    sizes = sorted(
+        ((len(json.dumps(configs[key], separators=(",", ":"))), key) for key in configs),
+        reverse=True,
+    )
+    if sizes:
+        print("largest configs:", file=out)
+        for size, key in sizes[: args.top]:
+            print(f"  {size:>10}  {key}", file=out)
+    return 0
+
+
+def _diff_values(kind: str, old: Mapping[str, Any], new: Mapping[str, Any], out: TextIO) -> int:
+    changes = 0
+    for key in sorted(old.keys() | new.keys()):
+        if key not in new:
+            print(f"- {kind} {key}", file=out)
+        elif key not in old:
+            print(f"+ {kind} {key} = {json.dumps(new[key])}", file=out)
+        elif old[key] != new[key]:
+            print(f"~ {kind} {key}: {json.dumps(old[key])} -> {json.dumps(new[key])}", file=out)
+        else:
+            continue
+        changes += 1
+    return changes
+
+
+def _diff(args: argparse.Namespace, out: TextIO) -> int:
+    old_version, old_flags, old_configs = _load(args.old)
+    new_version, new_flags, new_configs = _load(args.new)
+    if old_version != new_version:
+        print(f"version {old_version} -> {new_version}", file=out)
+    changes = _diff_values("flag", old_flags, new_flags, out)
+    changes += _diff_values("config", old_configs, new_configs, out)
+    # Like diff(1): exit status 1 when the snapshots differ.
+    return 1 if changes else 0
+
+
+def _progress(path: str) -> tuple[int, set[int]]:
+    """Find where to resume from the results already in ``path``.
+
+    Returns the index after the last context with a result and the indexes of the
+    contexts that failed. Failed results and a partly written last line are removed
+    from the file, so those contexts are evaluated again.
+    """
+    resume_at = end = 0
+    failed: set[int] = set()
+    with open(path, "rb") as f:
+        for line in f:
+            if not line.endswith(b"\n"):
+                break
+            result = json.loads(line)
+            resume_at = max(resume_at, result["index"] + 1)
+            if "error" in result:
+                failed.add(result["index"])
+            end += len(line)
+    if not failed:
+        with open(path, "rb+") as f:
+            f.truncate(end)
+        return resume_at, failed
+    kept = f"{path}.tmp"
+    with open(path, "rb") as f, open(kept, "wb") as out:
+        for line in f:
+            if not line.endswith(b"\n"):
+                break
+            if "error" not in json.loads(line):
+                out.write(line)
+    os.replace(kept, path)
+    return resume_at, failed
+
+
+def _pending(
+    path: str, resume_at: int, failed: set[int], indexes: deque[int]
+) -> Iterator[EvaluationContext]:
+    # Contexts still to evaluate; their input positions go to ``indexes`` in order.
+    for index, context in enumerate(read_contexts(path)):
+        if index >= resume_at or index in failed:
+            indexes.append(index)
+            yield context
+
+
+async def _evaluate_all(
+    args: argparse.Namespace, token: str, output: TextIO, resume_at: int, failed: set[int]
+) -> tuple[int, int, int, int]:
+    written = errors = 0
+    indexes: deque[int] = deque()
+    async with BulkEvaluator(
+        args.url,
+        token,
+        concurrency=args.concurrency,
+        keys=args.key or None,
+        prefixes=args.prefix or None,
+    ) as bulk:
+        contexts = _pending(args.input, resume_at, failed, indexes)
+        async for result in bulk.evaluate(contexts):
+            line: dict[str, Any] = {"index": indexes.popleft()}
+            if "user_id" in result["context"]:
+                line["user_id"] = result["context"]["user_id"]
+            if "error" in result:
+                line["error"] = result["error"]
+                errors += 1
+            else:
+                line["version"] = result.get("version")
+                line["flags"] = result["flags"]
+                line["configs"] = result["configs"]
+            output.write(json.dumps(line, separators=(",", ":"), ensure_ascii=False))
+            output.write("\n")
+            written += 1
+            if written % _FLUSH_EVERY == 0:
+                output.flush()
+        requests, deduplicated = bulk.requests, bulk.deduplicated
+    return written, errors, requests, deduplicated
+
+
+def _evaluate(args: argparse.Namespace, out: TextIO) -> int:
+    token = args.token or os.environ.get("EDGEFLAGS_TOKEN")
+    if not token:
+        raise EdgeFlagsError("No token: pass --token or set EDGEFLAGS_TOKEN")
+    resume_at, failed = 0, set[int]()
+    if args.resume and os.path.exists(args.output):
+        resume_at, failed = _progress(args.output)
+    with open(args.output, "a" if args.resume else "w", encoding="utf-8") as output:
+        written, errors, requests, deduplicated = asyncio.run(
+            _evaluate_all(args, token, output, resume_at, failed)
+        )
+    resumed = f" (resumed at {resume_at}" if resume_at else ""
+    if failed:
+        resumed += f", retrying {len(failed)} failed"
+    resumed += ")" if resume_at else ""
+    print(
+        f"Evaluated {written} contexts{resumed} with {requests} requests "
+        f"({deduplicated} deduplicated, {errors} failed) to {args.output}",
+        file=out,
+    )
+    return 1 if errors else 0
+
+
+def _relay(args: argparse.Namespace, out: TextIO) -> int:
+    token = args.token or os.environ.get("EDGEFLAGS_TOKEN")
+    if not token:
+        raise EdgeFlagsError("No token: pass --token or set EDGEFLAGS_TOKEN")
+    relay = Relay(
+        args.url,
+        token,
+        polling_interval=args.interval,
+        host=args.host,
+        port=args.port,
+        uds=args.uds,
+        debug=args.debug,
+    )
+    where = args.uds if args.uds is not None else relay.url
+    print(f"Relaying {args.url} on {where}", file=out, flush=True)
+    relay.serve_forever()
+    return 0
+
+
+def _parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m edgeflags", description="Fetch and inspect EdgeFlags snapshots."
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    fetch = commands.add_parser("fetch", help="fetch a snapshot from the service")
+    fetch.add_argument("--url", required=True, help="EdgeFlags service URL")
+    fetch.add_argument("--token", help="API token (default: $EDGEFLAGS_TOKEN)")
+    fetch.add_argument("--context", default="{}", help="evaluation context as JSON")
+    fetch.add_argument("--key", action="append", help="only fetch this key (repeatable)")
+    fetch.add_argument("--prefix", action="append", help="only fetch keys with this prefix")
+    fetch.add_argument("-o", "--output", required=True, help="file to write")
+    fetch.add_argument("--json", action="store_true", help="write JSON instead of binary")
+    fetch.set_defaults(run=_fetch)
+
+    dump = commands.add_parser("dump", help="print a snapshot as JSON")
+    dump.add_argument("file")
+    dump.add_argument("--key", help="print only this flag or config")
+    dump.set_defaults(run=_dump)
+
+    inspect = commands.add_parser("inspect", help="summarize a snapshot file")
+    inspect.add_argument("file")
+    inspect.add_argument("--top", type=int, default=5, help="number of largest configs to list")
+    inspect.set_defaults(run=_inspect)
+
+    diff = commands.add_parser("diff", help="compare two snapshots")
+    diff.add_argument("old")
+    diff.add_argument("new")
+    diff.set_defaults(run=_diff)
+
+    evaluate = commands.add_parser("evaluate", help="evaluate flags for many contexts")
+    evaluate.add_argument("--url", required=True, help="EdgeFlags service URL")
+    evaluate.add_argument("--token", help="API token (default: $EDGEFLAGS_TOKEN)")
+    evaluate.add_argument("-i", "--input", required=True, help="JSON Lines file of contexts")
+    evaluate.add_argument("-o", "--output", required=True, help="JSON Lines file to write")
+    evaluate.add_argument("--key", action="append", help="only evaluate this key (repeatable)")
+    evaluate.add_argument("--prefix", action="append", help="only evaluate keys with this prefix")
+    evaluate.add_argument("--concurrency", type=int, default=16, help="requests in flight")
+    evaluate.add_argument(
+        "--resume",
+        action="store_true",
+        help="keep the results already in --output and evaluate the rest, retrying failures",
+    )
+    evaluate.set_defaults(run=_evaluate)
+
+    relay = commands.add_parser("relay", help="serve local SDKs from one upstream poll")
+    relay.add_argument("--url", required=True, help="EdgeFlags service URL")
+    relay.add_argument("--token", help="API token (default: $EDGEFLAGS_TOKEN)")
+    relay.add_argument("--host", default="127.0.0.1", help="address to listen on")
+    relay.add_argument("--port", type=int, default=8787, help="port to listen on")
+    relay.add_argument("--uds", help="listen on this Unix domain socket instead")
+    relay.add_argument("--interval", type=float, default=30.0, help="upstream poll interval")
+    relay.add_argument("--debug", action="store_true", help="log upstream errors")
+    relay.set_defaults(run=_relay)
+    return parser
+
+
+def main(argv: Sequence[str] | None = None, out: TextIO | None = None) -> int:
+    args = _parser().parse_args(argv)
+    try:
+        status: int = args.run(args, out or sys.stdout)
+    except (EdgeFlagsError, OSError, ValueError) as exc:
+        print(f"edgeflags: error: {exc}", file=sys.stderr)
+        return 2
+    return status
@@ -1,151 +1,678 @@
 from __future__ import annotations
 
-from collections.abc import Callable
-from typing import Any, overload
-
-from .cache import Cache
+import asyncio
+import os
+import time
+from abc import ABC, abstractmethod
+from collections.abc import AsyncIterator, Callable, Iterable, Iterator, Mapping, Sequence
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from typing import Any, TypeVar, cast, overload
+
+import httpx
+
+from .cache import Cache, Snapshot, VersionGap
+from .context import EncodedContext, minimize_context
+from .cooperative import Cooperative, Runtime, select_runtime
 from .emitter import Emitter
-from .fetcher import AsyncFetcher, SyncFetcher
+from .errors import EdgeFlagsError
+from .feed import ChangeFeed
+from .fetcher import AsyncFetcher, HTTPMethod, SyncFetcher
 from .logger import Logger
-from .poller import AsyncPoller, SyncPoller
+from .paths import matches as path_matches
+from .poller import AsyncPoller, IdleTracker, Pace, SyncPoller
+from .recording import Recorder
+from .scope import Scope, make_scope
+from .snapshot_file import SnapshotFile, StrPath, read_bootstrap
+from .stats import ReadStats
+from .typed import decoder_for
 from .types import (
     Bootstrap,
+    ChangeEvent,
     EdgeFlagsEvent,
     EvaluationContext,
+    EvaluationResponse,
+    FailoverStats,
     FlagValue,
+    InitReport,
+    PathChange,
+    ReadReport,
+    SourceTiming,
 )
 
 _DEFAULT_POLL_INTERVAL = 60.0
+_DEFAULT_PRIORITY_INTERVAL = 5.0
+_DEFAULT_OFFLOAD_THRESHOLD = 256 * 1024
+_DEFAULT_CHANGE_HISTORY = 256
+SNAPSHOT_ENV = "EDGEFLAGS_SNAPSHOT"
+
+_T = TypeVar("_T")
+
+
+class _BaseClient(ABC):
+    """Read path and event API shared by the async and sync clients."""
+
+    _attributes: frozenset[str] | None
+    _cache: Cache
+    _context: EvaluationContext
+    _emitter: Emitter
+    _encoded: EncodedContext
+    _feed: ChangeFeed
+    _fetcher: AsyncFetcher | SyncFetcher | None
+    _idle: IdleTracker | None
+    _init_report: InitReport | None
+    _init_started: float
+    _logger: Logger
+    _next_poll: Pace
+    _path_changes: bool
+    _ready: bool
+    _scope: Scope | None
+    _stats: ReadStats | None
+
+    def _emit_change(self, changes: ChangeEvent) -> None:
+        self._logger.debug("Changes detected")
+        self._feed.append(changes)
+        self._emitter.emit("change", changes)
+
+    def _on_poll_error(self, exc: Exception) -> None:
+        self._logger.error("Polling error", exc)
+        self._emitter.emit("error", exc)
+
+    def report_error(self, exc: Exception) -> None:
+        """Log ``exc`` and emit it as an ``error`` event.
+
+        For work done on the client's behalf outside its pollers, such as refreshes
+        triggered by a webhook push.
+        """
+        self._logger.error("Refresh error", exc)
+        self._emitter.emit("error", exc)
+
+    def _on_init_error(self, exc: Exception) -> None:
+        self._logger.error("Init failed", exc)
+        self._emitter.emit("error", exc)
+
+    def _start_init(self) -> None:
+        self._init_started = time.monotonic()
+        self._init_report = InitReport(source=None, ready_after=None, sources=[])
+
+    def _source_answered(self, source: str, ok: bool) -> None:
+        assert self._init_report is not None
+        elapsed = time.monotonic() - self._init_started
+        self._init_report["sources"].append(SourceTiming(source=source, ok=ok, elapsed=elapsed))
+
+    def _become_ready(self, source: str) -> None:
+        assert self._init_report is not None
+        elapsed = time.monotonic() - self._init_started
+        self._init_report["source"] = source
+        self._init_report["ready_after"] = elapsed
+        self._ready = True
+        self._logger.debug(f"Ready from {source} after {elapsed:.3f}s")
+        self._emitter.emit("ready")
+
+    def _poll_hint(self) -> Pace:
+        # Captured right after the full refresh's own response, not a fast-lane one.
+        return self._next_poll
+
+    def _keys_scope(self, keys: Iterable[str] | None) -> Scope | None:
+        if keys is None:
+            return None
+        scope = self._scope
+        return Scope(keys=[key for key in keys if scope is None or key in scope])
+
+    def _touch(self) -> None:
+        idle = self._idle
+        assert idle is not None
+        # Only the first read per poll tick writes; later ones leave the shared flag alone.
+        if not idle.read:
+            idle.read = True
+        if idle.parked and idle.unpark():
+            self._logger.debug("Read after idle window, resuming polling")
+            self._wake()
+
+    @abstractmethod
+    def _wake(self) -> None:
+        """Resume polling parked by the idle tracker."""
+
+    def _idle_check(self) -> Callable[[], bool] | None:
+        return None if self._idle is None else self._idle.idle
+
+    def _parked_check(self) -> Callable[[], bool] | None:
+        idle = self._idle
+        # The fast lane parks along with the main poller rather than tracking reads itself.
+        return None if idle is None else lambda: idle.parked
+
+    def _switch_context(self, context: EvaluationContext) -> bool:
+        """Adopt ``context``; ``False`` when no key depends on what changed."""
+        self._context = context
+        encoded = EncodedContext(minimize_context(context, self._attributes))
+        if encoded == self._encoded:
+            self._logger.debug("Context updated, no dependent attribute changed")
+            return False
+        self._encoded = encoded
+        self._cache.forget_version()
+        self._logger.debug("Context updated")
+        return True
+
+    def _minimize(self) -> bool:
+        """Re-minimize the context after the service's dependency map changed.
+
+        Returns ``True`` when the last request lacked an attribute that is now
+        needed: its response must be refetched, and the cached version is forgotten.
+        """
+        assert self._fetcher is not None
+        attributes = self._fetcher.context_attributes
+        if attributes == self._attributes:
+            return False
+        self._attributes = attributes
+        encoded = EncodedContext(minimize_context(self._context, attributes))
+        if encoded == self._encoded:
+            return False
+        sent = self._encoded.context
+        self._encoded = encoded
+        if EncodedContext(minimize_context(sent, attributes)) == encoded:
+            return False
+        self._logger.debug("Flags depend on new context attributes, refetching")
+        self._cache.forget_version()
+        return True
+
+    def _has_data(self) -> bool:
+        snapshot = self._cache.snapshot()
+        return bool(snapshot.flags) or bool(snapshot.configs)
+
+    def _load_local(self, source: SnapshotFile | Bootstrap) -> bool:
+        self._load_bootstrap(source)
+        return self._has_data()
+
+    @overload
+    def flag(self, key: str) -> FlagValue | None: ...
+    @overload
+    def flag(self, key: str, default: FlagValue) -> FlagValue: ...
+
+    def flag(self, key: str, default: FlagValue | None = None) -> FlagValue | None:
+        if self._idle is not None:
+            self._touch()
+        value = self._cache.get_flag(key)
+        if self._stats is not None:
+            self._stats.record_flag(key, value is not None)
+        return default if value is None else value
+
+    @overload
+    def config(self, key: str) -> Any | None: ...
+    @overload
+    def config(self, key: str, default: Any) -> Any: ...
+
+    def config(self, key: str, default: Any = None) -> Any:
+        if self._idle is not None:
+            self._touch()
+        value = self._cache.get_config(key)
+        if self._stats is not None:
+            self._stats.record_config(key, value is not None)
+        return default if value is None else value
+
+    def flags(
+        self, keys: Iterable[str], default: FlagValue | None = None
+    ) -> dict[str, FlagValue | None]:
+        """Read several flags from one consistent snapshot."""
+        if self._idle is not None:
+            self._touch()
+        values = self._cache.snapshot().flags
+        stats = self._stats
+        result: dict[str, FlagValue | None] = {}
+        for key in keys:
+            value = values.get(key)
+            if stats is not None:
+                stats.record_flag(key, value is not None)
+            result[key] = default if value is None else value
+        return result
+
+    def all_flags(self) -> Mapping[str, FlagValue]:
+        if self._idle is not None:
+            self._touch()
+        return self._cache.all_flags()
+
+    def all_configs(self) -> Mapping[str, Any]:
+        if self._idle is not None:
+            self._touch()
+        return self._cache.all_configs()
+
+    def configs_with_prefix(self, prefix: str) -> Mapping[str, Any]:
+        """Read-only view of the configs whose keys start with ``prefix``.
+
+        Backed by a sorted key index that updates maintain, so the view is built in
+        logarithmic time and costs only as much as the matches it yields.
+        """
+        if self._idle is not None:
+            self._touch()
+        return self._cache.snapshot().configs_with_prefix(prefix)
+
+    def configs_with_tag(self, tag: str) -> Mapping[str, Any]:
+        """Read-only view of the configs the service tagged ``tag``."""
+        if self._idle is not None:
+            self._touch()
+        return self._cache.snapshot().configs_with_tag(tag)
+
+    @overload
+    def typed_config(
+        self, key: str, type_: type[_T], *, decoder: Callable[[Any], _T] | None = ...
+    ) -> _T | None: ...
+    @overload
+    def typed_config(
+        self, key: str, type_: type[_T], default: _T, *, decoder: Callable[[Any], _T] | None = ...
+    ) -> _T: ...
+
+    def typed_config(
+        self,
+        key: str,
+        type_: type[_T],
+        default: _T | None = None,
+        *,
+        decoder: Callable[[Any], _T] | None = None,
+    ) -> _T | None:
+        """Return config ``key`` decoded into ``type_``, memoized until the key changes.
+
+        Pydantic models, dataclasses and plain callables are supported; pass ``decoder``
+        to customize. If a changed value fails to decode, the error is emitted and the
+        last good decoded value keeps being returned.
+        """
+        if self._idle is not None:
+            self._touch()
+        decode = decoder or decoder_for(type_)
+        value = self._cache.decode_config(key, decoder or type_, decode, self._on_decode_error)
+        if self._stats is not None:
+            self._stats.record_config(key, value is not None)
+        return default if value is None else value
+
+    def endpoint_stats(self) -> FailoverStats:
+        """Latency, failures and ejections per base URL, plus the failover count."""
+        if self._fetcher is None:
+            raise EdgeFlagsError("Endpoint stats are not available without a connection")
+        return self._fetcher.endpoint_stats
+
+    def read_stats(self) -> ReadReport:
+        """Report per-key read and default-hit counts, and cached keys never read.
+
+        Requires ``track_reads=True``.
+        """
+        if self._stats is None:
+            raise EdgeFlagsError("Read tracking is disabled; pass track_reads=True")
+        snapshot = self._cache.snapshot()
+        return self._stats.report(snapshot.flags, snapshot.configs)
+
+    @contextmanager
+    def pin(self) -> Iterator[Snapshot]:
+        """Pin the current snapshot so reads in this context see a consistent view.
+
+        The pin is stored in a ``ContextVar``, so it follows the current thread or
+        asyncio task and is undone when the block exits.
+        """
+        token = self._cache.pin()
+        try:
+            yield self._cache.snapshot()
+        finally:
+            self._cache.unpin(token)
+
+    def _load_bootstrap(self, bootstrap: Bootstrap | SnapshotFile | StrPath) -> None:
+        if isinstance(bootstrap, (str, os.PathLike)):
+            bootstrap = read_bootstrap(bootstrap)
+        scope = self._scope
+        if isinstance(bootstrap, SnapshotFile):
+            # Values stay in the mapped file and are decoded on first read.
+            flags, configs = bootstrap.flags, bootstrap.configs
+            if scope is not None:
+                flags = flags.subset(scope.__contains__)
+                configs = configs.subset(scope.__contains__)
+            version = bootstrap.version
+            origin_scope = {} if scope is None else scope.to_body()
+            if bootstrap.context != self._encoded.digest or bootstrap.scope != origin_scope:
+                # Fetched for another context or scope: a delta against its version
+                # would leave out what the file lacks, so the first poll fetches in full.
+                version = None
+            self._cache.adopt(flags, configs, version=version)
+        elif scope is not None:
+            self._cache.seed(
+                scope.filter(bootstrap.get("flags", {})),
+                scope.filter(bootstrap.get("configs", {})),
+            )
+        else:
+            self._cache.seed(bootstrap.get("flags", {}), bootstrap.get("configs", {}))
+        self._logger.debug("Bootstrap data loaded")
+
+    def _on_decode_error(self, exc: Exception) -> None:
+        self._logger.error("Config decode failed", exc)
+        self._emitter.emit("error", exc)
+
+    def on(self, event: EdgeFlagsEvent, fn: Callable[..., Any]) -> Callable[[], None]:
+        return self._emitter.on(event, fn)
 
+    def on_path(self, pointer: str, fn: Callable[[list[PathChange]], Any]) -> Callable[[], None]:
+        """Call ``fn`` with the config changes at, below or above a JSON pointer.
+
+        ``pointer`` starts with the config key, e.g. ``/checkout/limits``. Requires
+        ``path_changes=True``. Returns an unsubscribe function.
+        """
+        if not self._path_changes:
+            raise EdgeFlagsError("Path subscriptions need path_changes=True")
+
+        def listener(event: ChangeEvent) -> None:
+            changed = [
+                path
+                for change in event["configs"]
+                for path in change.get("paths", ())
+                if path_matches(path["path"], pointer)
+            ]
+            if changed:
+                fn(changed)
+
+        return self._emitter.on("change", listener)
+
+    @property
+    def is_ready(self) -> bool:
+        return self._ready
+
+    @property
+    def version(self) -> int | None:
+        """Service version of the cached values; ``None`` until one is known."""
+        return self._cache.version
+
+    @property
+    def init_report(self) -> InitReport | None:
+        """Which source made the last ``init()`` ready, and when each source answered."""
+        return self._init_report
 
-class EdgeFlags:
+
+class EdgeFlags(_BaseClient):
     """Async EdgeFlags client. Call ``await init()`` after construction."""
 
     def __init__(
         self,
         token: str,
-        base_url: str,
+        base_url: str | Sequence[str],
         *,
         context: EvaluationContext | None = None,
         polling_interval: float = _DEFAULT_POLL_INTERVAL,
         transport: str = "polling",
-        bootstrap: Bootstrap | None = None,
+        bootstrap: Bootstrap | SnapshotFile | StrPath | None = None,
+        keys: Iterable[str] | None = None,
+        prefixes: Iterable[str] | None = None,
+        change_history: int = _DEFAULT_CHANGE_HISTORY,
+        track_reads: bool = False,
+        path_changes: bool = False,
+        priority_keys: Iterable[str] | None = None,
+        priority_interval: float = _DEFAULT_PRIORITY_INTERVAL,
+        uds: str | None = None,
+        http_method: HTTPMethod = "POST",
+        idle_timeout: float | None = None,
+        offload_threshold: int | None = _DEFAULT_OFFLOAD_THRESHOLD,
+        process_threshold: int | None = None,
+        recorder: Recorder | None = None,
+        http_transport: httpx.AsyncBaseTransport | None = None,
         debug: bool = False,
         _mock: dict[str, Any] | None = None,
     ) -> None:
-        self._cache = Cache()
+        self._cache = Cache(path_changes=path_changes)
+        self._path_changes = path_changes
         self._emitter = Emitter()
+        self._feed = ChangeFeed(change_history)
+        self._stats = ReadStats() if track_reads else None
         self._logger = Logger(debug)
         self._context: EvaluationContext = context or {}
+        self._encoded = EncodedContext(self._context)
+        self._attributes: frozenset[str] | None = None
         self._polling_interval = polling_interval
         self._transport = transport
+        self._scope = make_scope(keys, prefixes)
+        self._priority = self._keys_scope(priority_keys)
+        self._priority_interval = priority_interval
+        self._next_poll: Pace = (None, None)
+        self._idle = None if idle_timeout is None else IdleTracker(idle_timeout)
         self._ready = False
+        self._init_report = None
         self._mock = _mock
         self._fetcher: AsyncFetcher | None = None
         self._poller: AsyncPoller | None = None
+        self._priority_poller: AsyncPoller | None = None
+        self._refresh_lock = asyncio.Lock()
+        self._upgrade: asyncio.Future[None] | None = None
 
         if _mock is not None:
             self._cache.seed(_mock.get("flags", {}), _mock.get("configs", {}))
             self._ready = True
             self._logger.debug("Mock client created")
         else:
-            self._fetcher = AsyncFetcher(base_url, token)
+            self._fetcher = AsyncFetcher(
+                base_url,
+                token,
+                method=http_method,
+                uds=uds,
+                offload_threshold=offload_threshold,
+                process_threshold=process_threshold,
+                recorder=recorder,
+                transport=http_transport,
+            )
             if bootstrap:
-                self._cache.seed(bootstrap.get("flags", {}), bootstrap.get("configs", {}))
-                self._logger.debug("Bootstrap data loaded")
+                self._load_bootstrap(bootstrap)
+
+    async def init(self, *, deadline: float | None = None) -> None:
+        """Fetch initial data and start polling.
 
-    async def init(self) -> None:
+        With ``deadline`` (seconds), the network fetch races the local sources, i.e.
+        ``bootstrap`` and the snapshot file named by ``$EDGEFLAGS_SNAPSHOT``. The client
+        becomes ready with whichever valid source answers first and upgrades to the
+        network data when it arrives. Raises if no source is ready by the deadline.
+        """
         if self._mock is not None:
             self._emitter.emit("ready")
             return
 
         assert self._fetcher is not None
-        try:
-            data = await self._fetcher.fetch_all(self._context)
-            self._cache.seed(data["flags"], data["configs"])
-            self._ready = True
-            self._logger.debug("Initialized")
-            self._emitter.emit("ready")
+        self._start_init()
+        if deadline is not None:
+            await self._race(deadline)
+            return
 
-            self._poller = AsyncPoller(
-                self._polling_interval,
-                self.refresh,
-                self._on_poll_error,
-            )
-            self._poller.start()
-            self._logger.debug(f"Polling started ({self._polling_interval}s)")
+        try:
+            data, offloaded = await self._fetcher.fetch(self._encoded, scope=self._scope)
         except Exception as exc:
-            error = exc if isinstance(exc, Exception) else Exception(str(exc))
-            self._logger.error("Init failed", error)
-            self._emitter.emit("error", error)
-
-            if self._cache.all_flags():
-                self._ready = True
+            self._source_answered("network", False)
+            self._on_init_error(exc)
+            if self._has_data():
                 self._logger.warn("Using bootstrap data after init failure")
-                self._emitter.emit("ready")
+                self._become_ready("bootstrap")
             else:
                 raise
+            return
 
-    def _on_poll_error(self, exc: Exception) -> None:
-        self._logger.error("Polling error", exc)
-        self._emitter.emit("error", exc)
-
-    @overload
-    def flag(self, key: str) -> FlagValue | None: ...
-    @overload
-    def flag(self, key: str, default: FlagValue) -> FlagValue: ...
-
-    def flag(self, key: str, default: FlagValue | None = None) -> FlagValue | None:
-        value = self._cache.get_flag(key)
-        return default if value is None else value
-
-    @overload
-    def config(self, key: str) -> Any | None: ...
-    @overload
-    def config(self, key: str, default: Any) -> Any: ...
+        self._source_answered("network", True)
+        self._minimize()
+        # A full response replaces the bootstrap data, dropping keys it no longer has.
+        await self._apply(data, offloaded)
+        self._become_ready("network")
+        self._start_polling()
 
-    def config(self, key: str, default: Any = None) -> Any:
-        value = self._cache.get_config(key)
-        return default if value is None else value
+    async def _race(self, deadline: float) -> None:
+        assert self._fetcher is not None
+        network = asyncio.ensure_future(self._fetcher.fetch(self._encoded, scope=self._scope))
+        if self._has_data():
+            self._source_answered("bootstrap", True)
+            self._become_ready("bootstrap")
+            self._upgrade = asyncio.ensure_future(self._upgrade_from(network))
+            return
 
-    def all_flags(self) -> dict[str, FlagValue]:
-        return self._cache.all_flags()
+        pending: set[asyncio.Future[Any]] = {network}
+        path = os.environ.get(SNAPSHOT_ENV)
+        if path:
+            pending.add(asyncio.ensure_future(asyncio.to_thread(read_bootstrap, path)))
+        loop = asyncio.get_running_loop()
+        end = loop.time() + deadline
+        error: Exception | None = None
+        while pending:
+            done, pending = await asyncio.wait(
+                pending, timeout=max(0.0, end - loop.time()), return_when=asyncio.FIRST_COMPLETED
+            )
+            if not done:
+                break
+            # Prefer the network when it finished together with a local source.
+            for task in sorted(done, key=lambda task: task is not network):
+                if task is network:
+                    if task.exception() is None:
+                        self._source_answered("network", True)
+                        self._minimize()
+                        await self._apply(*task.result())
+                        self._become_ready("network")
+                        self._start_polling()
+                        self._cancel(pending)
+                        return
+                    error = cast(Exception, task.exception())
+                    self._source_answered("network", False)
+                    self._on_init_error(error)
+                elif task.exception() is None and self._load_local(task.result()):
+                    self._source_answered("environment", True)
+                    self._become_ready("environment")
+                    if error is None:
+                        self._upgrade = asyncio.ensure_future(self._upgrade_from(network))
+                    else:
+                        # The network failure is already reported; polling retries it.
+                        self._start_polling()
+                    return
+                else:
+                    self._source_answered("environment", False)
+                    self._logger.warn("Unusable snapshot in $" + SNAPSHOT_ENV)
+
+        self._cancel(pending)
+        if error is not None:
+            raise error
+        raise EdgeFlagsError(f"No flag source was ready within {deadline}s")
+
+    async def _upgrade_from(
+        self, network: asyncio.Future[tuple[EvaluationResponse, bool]]
+    ) -> None:
+        try:
+            data, offloaded = await network
+        except Exception as exc:
+            self._source_answered("network", False)
+            self._on_init_error(exc)
+        else:
+            self._source_answered("network", True)
+            self._logger.debug("Upgrading to network data")
+            self._minimize()
+            changes = await self._apply(data, offloaded)
+            if changes:
+                self._emit_change(changes)
+        self._start_polling()
+
+    @staticmethod
+    def _cancel(tasks: Iterable[asyncio.Future[Any]]) -> None:
+        for task in tasks:
+            task.cancel()
+
+    def _start_polling(self) -> None:
+        if self._fetcher is not None:
+            self._next_poll = self._fetcher.poll_hint
+        self._poller = AsyncPoller(
+            self._polling_interval,
+            self.refresh,
+            self._on_poll_error,
+            self._poll_hint,
+            self._idle_check(),
+        )
+        self._poller.start()
+        self._logger.debug(f"Polling started ({self._polling_interval}s)")
+        if self._priority is not None:
+            self._priority_poller = AsyncPoller(
+                self._priority_interval,
+                self._refresh_priority,
+                self._on_poll_error,
+                idle=self._parked_check(),
+            )
+            self._priority_poller.start()
+            self._logger.debug(f"Priority polling started ({self._priority_interval}s)")
 
-    def all_configs(self) -> dict[str, Any]:
-        return self._cache.all_configs()
+    def _wake(self) -> None:
+        # Reads can't block on the loop, so the revalidation always runs in the background.
+        for poller in (self._poller, self._priority_poller):
+            if poller is not None:
+                poller.resume()
 
     async def identify(self, context: EvaluationContext) -> None:
-        self._context = context
-        self._logger.debug("Context updated")
-        if self._ready and self._fetcher:
+        """Switch the evaluation context, refetching unless no key depends on the change."""
+        if self._switch_context(context) and self._ready and self._fetcher:
             await self.refresh()
 
-    async def refresh(self) -> None:
+    async def refresh(self, keys: Iterable[str] | None = None) -> None:
+        """Fetch the latest evaluations; with ``keys``, only refetch those keys."""
+        if keys is not None:
+            await self._refresh_scoped(self._keys_scope(keys))
+            return
         if not self._fetcher:
             return
-        self._logger.debug("Fetching evaluations")
-        data = await self._fetcher.fetch_all(self._context)
-        changes = self._cache.update(data["flags"], data["configs"])
+        # Refreshes never interleave, so an older response can't overwrite a newer one.
+        async with self._refresh_lock:
+            self._logger.debug("Fetching evaluations")
+            data, offloaded = await self._fetcher.fetch(
+                self._encoded, since=self._cache.version, scope=self._scope
+            )
+            if self._minimize():
+                data, offloaded = await self._fetcher.fetch(self._encoded, scope=self._scope)
+            try:
+                changes = await self._apply(data, offloaded)
+            except VersionGap:
+                self._logger.debug("Delta version gap, resyncing")
+                data, offloaded = await self._fetcher.fetch(self._encoded, scope=self._scope)
+                changes = await self._apply(data, offloaded)
+            self._next_poll = self._fetcher.poll_hint
         if changes:
-            self._logger.debug("Changes detected")
-            self._emitter.emit("change", changes)
+            self._emit_change(changes)
+        if self._stats is not None:
+            self._stats.compact()
 
-    def on(self, event: EdgeFlagsEvent, fn: Callable[..., Any]) -> Callable[[], None]:
-        return self._emitter.on(event, fn)
+    async def _refresh_priority(self) -> None:
+        await self._refresh_scoped(self._priority)
 
-    @property
-    def is_ready(self) -> bool:
-        return self._ready
+    async def _refresh_scoped(self, scope: Scope | None) -> None:
+        if not self._fetcher or scope is None or not (scope.keys or scope.prefixes):
+            return
+        async with self._refresh_lock:
+            data = await self._fetcher.fetch_all(self._encoded, scope=scope)
+            if self._minimize():
+                data = await self._fetcher.fetch_all(self._encoded, scope=scope)
+            changes = self._cache.merge(data, scope)
+        if changes:
+            self._emit_change(changes)
+
+    async def _apply(self, data: EvaluationResponse, offloaded: bool) -> ChangeEvent | None:
+        if not offloaded:
+            return self._cache.apply(data)
+        # Diff large payloads in a worker thread; only the snapshot swap runs on the loop.
+        pending = await asyncio.to_thread(self._cache.prepare, data)
+        return self._cache.commit(pending)
 
     def destroy(self) -> None:
+        if self._upgrade:
+            self._upgrade.cancel()
+            self._upgrade = None
         if self._poller:
             self._poller.stop()
             self._poller = None
+        if self._priority_poller:
+            self._priority_poller.stop()
+            self._priority_poller = None
         self._cache.clear()
+        self._feed.close()
         self._emitter.remove_all()
         self._ready = False
         self._logger.debug("Destroyed")
 
+    def changes(
+        self, since: int | None = None, keys: Iterable[str] | None = None
+    ) -> AsyncIterator[ChangeEvent]:
+        """Iterate change events after ``since`` (default: from now on).
+
+        ``async for change in ef.changes(since=seq, keys=[...])`` consumes the bounded
+        change history at its own pace; falling too far behind raises
+        :class:`ChangeFeedOverrun`. Iteration ends when the client is destroyed.
+        """
+        return self._feed.aiter(since, keys)
+
     async def aclose(self) -> None:
         self.destroy()
         if self._fetcher:
@@ -153,133 +680,316 @@ class EdgeFlags:
             self._fetcher = None
 
 
-class EdgeFlagsSync:
+class EdgeFlagsSync(_BaseClient):
     """Synchronous EdgeFlags client. Call ``init()`` after construction."""
 
     def __init__(
         self,
         token: str,
-        base_url: str,
+        base_url: str | Sequence[str],
         *,
         context: EvaluationContext | None = None,
         polling_interval: float = _DEFAULT_POLL_INTERVAL,
         transport: str = "polling",
-        bootstrap: Bootstrap | None = None,
+        bootstrap: Bootstrap | SnapshotFile | StrPath | None = None,
+        keys: Iterable[str] | None = None,
+        prefixes: Iterable[str] | None = None,
+        change_history: int = _DEFAULT_CHANGE_HISTORY,
+        track_reads: bool = False,
+        path_changes: bool = False,
+        priority_keys: Iterable[str] | None = None,
+        priority_interval: float = _DEFAULT_PRIORITY_INTERVAL,
+        uds: str | None = None,
+        http_method: HTTPMethod = "POST",
+        idle_timeout: float | None = None,
+        max_staleness: float | None = None,
+        cooperative: Cooperative = None,
+        recorder: Recorder | None = None,
+        http_transport: httpx.BaseTransport | None = None,
         debug: bool = False,
         _mock: dict[str, Any] | None = None,
     ) -> None:
-        self._cache = Cache()
+        self._runtime = select_runtime(cooperative)
+        self._cache = Cache(path_changes=path_changes, lock=self._runtime.lock())
+        self._path_changes = path_changes
         self._emitter = Emitter()
+        self._feed = ChangeFeed(change_history, condition=self._runtime.condition())
+        self._stats = ReadStats() if track_reads else None
         self._logger = Logger(debug)
         self._context: EvaluationContext = context or {}
+        self._encoded = EncodedContext(self._context)
+        self._attributes: frozenset[str] | None = None
         self._polling_interval = polling_interval
         self._transport = transport
+        self._scope = make_scope(keys, prefixes)
+        self._priority = self._keys_scope(priority_keys)
+        self._priority_interval = priority_interval
+        self._next_poll: Pace = (None, None)
+        self._idle = None if idle_timeout is None else IdleTracker(idle_timeout)
+        self._max_staleness = max_staleness
+        self._refreshed_at = 0.0
         self._ready = False
+        self._init_report = None
         self._mock = _mock
         self._fetcher: SyncFetcher | None = None
         self._poller: SyncPoller | None = None
+        self._priority_poller: SyncPoller | None = None
+        self._refresh_lock = self._runtime.lock()
 
         if _mock is not None:
             self._cache.seed(_mock.get("flags", {}), _mock.get("configs", {}))
             self._ready = True
             self._logger.debug("Mock client created")
         else:
-            self._fetcher = SyncFetcher(base_url, token)
+            self._fetcher = SyncFetcher(
+                base_url,
+                token,
+                method=http_method,
+                uds=uds,
+                recorder=recorder,
+                transport=http_transport,
+            )
             if bootstrap:
-                self._cache.seed(bootstrap.get("flags", {}), bootstrap.get("configs", {}))
-                self._logger.debug("Bootstrap data loaded")
+                self._load_bootstrap(bootstrap)
 
-    def init(self) -> None:
+    @property
+    def runtime(self) -> Runtime:
+        """Threads or cooperative runtime the client schedules its work on."""
+        return self._runtime
+
+    def init(self, *, deadline: float | None = None) -> None:
+        """Fetch initial data and start polling.
+
+        With ``deadline`` (seconds), the network fetch races the local sources, i.e.
+        ``bootstrap`` and the snapshot file named by ``$EDGEFLAGS_SNAPSHOT``. The client
+        becomes ready with whichever valid source answers first and upgrades to the
+        network data when it arrives. Raises if no source is ready by the deadline.
+        """
         if self._mock is not None:
             self._emitter.emit("ready")
             return
 
         assert self._fetcher is not None
-        try:
-            data = self._fetcher.fetch_all(self._context)
-            self._cache.seed(data["flags"], data["configs"])
-            self._ready = True
-            self._logger.debug("Initialized")
-            self._emitter.emit("ready")
+        self._start_init()
+        if deadline is not None:
+            self._race(deadline)
+            return
 
-            self._poller = SyncPoller(
-                self._polling_interval,
-                self.refresh,
-                self._on_poll_error,
+        try:
+            data = self._runtime.blocking(
+                self._fetcher.fetch_all, self._encoded, scope=self._scope
             )
-            self._poller.start()
-            self._logger.debug(f"Polling started ({self._polling_interval}s)")
         except Exception as exc:
-            error = exc if isinstance(exc, Exception) else Exception(str(exc))
-            self._logger.error("Init failed", error)
-            self._emitter.emit("error", error)
-
-            if self._cache.all_flags():
-                self._ready = True
+            self._source_answered("network", False)
+            self._on_init_error(exc)
+            if self._has_data():
                 self._logger.warn("Using bootstrap data after init failure")
-                self._emitter.emit("ready")
+                self._become_ready("bootstrap")
             else:
                 raise
+            return
 
-    def _on_poll_error(self, exc: Exception) -> None:
-        self._logger.error("Polling error", exc)
-        self._emitter.emit("error", exc)
-
-    @overload
-    def flag(self, key: str) -> FlagValue | None: ...
-    @overload
-    def flag(self, key: str, default: FlagValue) -> FlagValue: ...
-
-    def flag(self, key: str, default: FlagValue | None = None) -> FlagValue | None:
-        value = self._cache.get_flag(key)
-        return default if value is None else value
-
-    @overload
-    def config(self, key: str) -> Any | None: ...
-    @overload
-    def config(self, key: str, default: Any) -> Any: ...
-
-    def config(self, key: str, default: Any = None) -> Any:
-        value = self._cache.get_config(key)
-        return default if value is None else value
-
-    def all_flags(self) -> dict[str, FlagValue]:
-        return self._cache.all_flags()
-
-    def all_configs(self) -> dict[str, Any]:
-        return self._cache.all_configs()
+        self._source_answered("network", True)
+        self._minimize()
+        # A full response replaces the bootstrap data, dropping keys it no longer has.
+        self._cache.apply(data)
+        self._refreshed_at = time.monotonic()
+        self._become_ready("network")
+        self._start_polling()
+
+    def _race(self, deadline: float) -> None:
+        fetcher = self._fetcher
+        assert fetcher is not None
+        executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="edgeflags-init")
+        try:
+            network = executor.submit(fetcher.fetch_all, self._encoded, scope=self._scope)
+            if self._has_data():
+                self._source_answered("bootstrap", True)
+                self._become_ready("bootstrap")
+                network.add_done_callback(self._upgrade_from)
+                return
+
+            pending: set[Future[Any]] = {network}
+            path = os.environ.get(SNAPSHOT_ENV)
+            if path:
+                pending.add(executor.submit(read_bootstrap, path))
+            end = time.monotonic() + deadline
+            error: BaseException | None = None
+            while pending:
+                done, pending = self._runtime.blocking(
+                    wait,
+                    pending,
+                    timeout=max(0.0, end - time.monotonic()),
+                    return_when=FIRST_COMPLETED,
+                )
+                if not done:
+                    break
+                # Prefer the network when it finished together with a local source.
+                for future in sorted(done, key=lambda future: future is not network):
+                    if future is network:
+                        error = future.exception()
+                        if error is None:
+                            self._source_answered("network", True)
+                            self._minimize()
+                            self._cache.apply(future.result())
+                            self._refreshed_at = time.monotonic()
+                            self._become_ready("network")
+                            self._start_polling()
+                            return
+                        self._source_answered("network", False)
+                        self._on_init_error(cast(Exception, error))
+                    elif future.exception() is None and self._load_local(future.result()):
+                        self._source_answered("environment", True)
+                        self._become_ready("environment")
+                        if error is None:
+                            network.add_done_callback(self._upgrade_from)
+                        else:
+                            # The network failure is already reported; polling retries it.
+                            self._start_polling()
+                        return
+                    else:
+                        self._source_answered("environment", False)
+                        self._logger.warn("Unusable snapshot in $" + SNAPSHOT_ENV)
+
+            if error is not None:
+                raise error
+            # A late network answer is dropped: the caller gets an error and may retry.
+            network.cancel()
+            raise EdgeFlagsError(f"No flag source was ready within {deadline}s")
+        finally:
+            executor.shutdown(wait=False)
+
+    def _upgrade_from(self, network: Future[EvaluationResponse]) -> None:
+        # Runs on the init worker thread once the network fetch completes.
+        if self._fetcher is None:  # destroyed meanwhile
+            return
+        error = network.exception()
+        if error is not None:
+            self._source_answered("network", False)
+            self._on_init_error(cast(Exception, error))
+        else:
+            self._source_answered("network", True)
+            self._logger.debug("Upgrading to network data")
+            self._minimize()
+            changes = self._cache.apply(network.result())
+            self._refreshed_at = time.monotonic()
+            if changes:
+                self._emit_change(changes)
+        self._start_polling()
+
+    def _start_polling(self) -> None:
+        if self._fetcher is not None:
+            self._next_poll = self._fetcher.poll_hint
+        self._poller = SyncPoller(
+            self._polling_interval,
+            self.refresh,
+            self._on_poll_error,
+            self._poll_hint,
+            self._idle_check(),
+            self._runtime,
+        )
+        self._poller.start()
+        self._logger.debug(f"Polling started ({self._polling_interval}s)")
+        if self._priority is not None:
+            self._priority_poller = SyncPoller(
+                self._priority_interval,
+                self._refresh_priority,
+                self._on_poll_error,
+                idle=self._parked_check(),
+                runtime=self._runtime,
+            )
+            self._priority_poller.start()
+            self._logger.debug(f"Priority polling started ({self._priority_interval}s)")
+
+    def _wake(self) -> None:
+        # Data older than max_staleness is refreshed before the waking read returns.
+        stale = (
+            self._max_staleness is not None
+            and time.monotonic() - self._refreshed_at > self._max_staleness
+        )
+        if stale:
+            try:
+                self.refresh()
+            except Exception as exc:
+                self._on_poll_error(exc)
+        for poller in (self._poller, self._priority_poller):
+            if poller is not None:
+                poller.resume(run_now=not stale)
 
     def identify(self, context: EvaluationContext) -> None:
-        self._context = context
-        self._logger.debug("Context updated")
-        if self._ready and self._fetcher:
+        """Switch the evaluation context, refetching unless no key depends on the change."""
+        if self._switch_context(context) and self._ready and self._fetcher:
             self.refresh()
 
-    def refresh(self) -> None:
-        if not self._fetcher:
+    def refresh(self, keys: Iterable[str] | None = None) -> None:
+        """Fetch the latest evaluations; with ``keys``, only refetch those keys."""
+        if keys is not None:
+            self._refresh_scoped(self._keys_scope(keys))
+            return
+        fetcher = self._fetcher
+        if not fetcher:
             return
-        self._logger.debug("Fetching evaluations")
-        data = self._fetcher.fetch_all(self._context)
-        changes = self._cache.update(data["flags"], data["configs"])
+        # Refreshes never interleave, so an older response can't overwrite a newer one.
+        with self._refresh_lock:
+            self._logger.debug("Fetching evaluations")
+            data = self._runtime.blocking(
+                fetcher.fetch_all, self._encoded, since=self._cache.version, scope=self._scope
+            )
+            if self._minimize():
+                data = self._runtime.blocking(fetcher.fetch_all, self._encoded, scope=self._scope)
+            try:
+                changes = self._cache.apply(data)
+            except VersionGap:
+                self._logger.debug("Delta version gap, resyncing")
+                data = self._runtime.blocking(fetcher.fetch_all, self._encoded, scope=self._scope)
+                changes = self._cache.apply(data)
+            self._next_poll = fetcher.poll_hint
+            self._refreshed_at = time.monotonic()
         if changes:
-            self._logger.debug("Changes detected")
-            self._emitter.emit("change", changes)
+            self._emit_change(changes)
+        if self._stats is not None:
+            self._stats.compact()
 
-    def on(self, event: EdgeFlagsEvent, fn: Callable[..., Any]) -> Callable[[], None]:
-        return self._emitter.on(event, fn)
+    def _refresh_priority(self) -> None:
+        self._refresh_scoped(self._priority)
 
-    @property
-    def is_ready(self) -> bool:
-        return self._ready
+    def _refresh_scoped(self, scope: Scope | None) -> None:
+        fetcher = self._fetcher
+        if not fetcher or scope is None or not (scope.keys or scope.prefixes):
+            return
+        with self._refresh_lock:
+            data = self._runtime.blocking(fetcher.fetch_all, self._encoded, scope=scope)
+            if self._minimize():
+                data = self._runtime.blocking(fetcher.fetch_all, self._encoded, scope=scope)
+            changes = self._cache.merge(data, scope)
+        if changes:
+            self._emit_change(changes)
+
+    def changes(
+        self,
+        since: int | None = None,
+        keys: Iterable[str] | None = None,
+        timeout: float | None = None,
+    ) -> Iterator[ChangeEvent]:
+        """Iterate change events after ``since`` (default: from now on), blocking for new ones.
+
+        Falling too far behind raises :class:`ChangeFeedOverrun`. Iteration ends when the
+        client is destroyed, or after ``timeout`` seconds without a change.
+        """
+        return self._feed.iter(since, keys, timeout)
 
     def destroy(self) -> None:
         if self._poller:
             self._poller.stop()
             self._poller = None
+        if self._priority_poller:
+            self._priority_poller.stop()
+            self._priority_poller = None
         if self._fetcher:
             self._fetcher.close()
             self._fetcher = None
         self._cache.clear()
+        self._feed.close()
         self._emitter.remove_all()
         self._ready = False
         self._logger.debug("Destroyed")
@@ -0,0 +1,128 @@
+"""Canonical encoding and minimization of evaluation contexts.
+
+Equal contexts encode to the same bytes regardless of key order or the order of their
+``segments``, so the encoding doubles as a cache key: a GET request carrying it hits
+the same shared HTTP cache entry from every client evaluating that context.
+:func:`minimize_context` drops the attributes no flag or config depends on, so users
+that differ only in those share one encoding.
+"""
+
+from __future__ import annotations
+
+import base64
+import hashlib
+import json
+from collections.abc import Collection, Mapping
+from typing import Any, cast
+from urllib.parse import parse_qs
+
+from .types import EvaluationContext
+
+CONTEXT_PARAM = "context"
+
+
+def _normalize(context: Mapping[str, Any]) -> dict[str, Any]:
+    normalized = dict(context)
+    segments = normalized.get("segments")
+    if isinstance(segments, list | tuple):
+        normalized["segments"] = sorted(set(segments))
+    return normalized
+
+
+def minimize_context(
+    context: EvaluationContext, attributes: Collection[str] | None
+) -> EvaluationContext:
+    """Keep only the parts of ``context`` named by ``attributes``.
+
+    Attributes are top-level context keys, ``custom.<name>`` for a single custom
+    attribute and ``segments.<name>`` for membership in a single segment; plain
+    ``custom`` and ``segments`` keep the whole dict or list. ``None`` means the
+    dependencies are unknown and keeps everything.
+    """
+    if attributes is None:
+        return context
+    minimized: dict[str, Any] = {}
+    custom: set[str] | None = set()
+    segments: set[str] | None = set()
+    for attribute in attributes:
+        name, dot, sub = attribute.partition(".")
+        if name == "custom":
+            if not dot:
+                custom = None
+            elif custom is not None:
+                custom.add(sub)
+        elif name == "segments":
+            if not dot:
+                segments = None
+            elif segments is not None:
+                segments.add(sub)
+        elif not dot and name in context:
+            minimized[name] = context[name]  # type: ignore[literal-required]
+    if "custom" in context:
+        kept = (
+            context["custom"]
+            if custom is None
+            else {key: value for key, value in context["custom"].items() if key in custom}
+        )
+        if kept:
+            minimized["custom"] = kept
+    if "segments" in context:
+        members = (
+            context["segments"]
+            if segments is None
+            else [segment for segment in context["segments"] if segment in segments]
+        )
+        if members:
+            minimized["segments"] = members
+    return cast(EvaluationContext, minimized)
+
+
+class EncodedContext:
+    """Evaluation context with its canonical encodings, computed once.
+
+    ``json`` holds the canonical JSON (sorted keys, sorted unique ``segments``, compact
+    separators), ``digest`` a stable hash of it and ``query`` the URL query parameter
+    carrying it in GET requests.
+    """
+
+    __slots__ = ("context", "json", "digest", "query")
+
+    def __init__(self, context: EvaluationContext) -> None:
+        self.context = context
+        self.json = json.dumps(
+            _normalize(context), sort_keys=True, separators=(",", ":"), ensure_ascii=False
+        ).encode()
+        self.digest = hashlib.blake2b(self.json, digest_size=16).hexdigest()
+        encoded = base64.urlsafe_b64encode(self.json).rstrip(b"=").decode("ascii")
+        self.query = f"{CONTEXT_PARAM}={encoded}"
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, EncodedContext) and other.json == self.json
+
+    def __hash__(self) -> int:
+        return hash(self.json)
+
+
+def encode_context(context: EvaluationContext | EncodedContext) -> EncodedContext:
+    """Return ``context`` encoded, reusing an existing encoding."""
+    if isinstance(context, EncodedContext):
+        return context
+    return EncodedContext(context)
+
+
+def decode_query(query: str) -> dict[str, Any]:
+    """Turn a GET evaluate query string back into the equivalent POST body."""
+    params = parse_qs(query, keep_blank_values=True)
+    body: dict[str, Any] = {}
+    encoded = params.get(CONTEXT_PARAM, [""])[0]
+    if encoded:
+        padded = encoded + "=" * (-len(encoded) % 4)
+        body["context"] = json.loads(base64.urlsafe_b64decode(padded))
+    else:
+        body["context"] = {}
+    if "since" in params:
+        body["since"] = int(params["since"][0])
+    for name in ("keys", "prefixes"):
+        if name in params:
+            body[name] = params[name]
+    return body
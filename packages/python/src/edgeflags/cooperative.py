@@ -0,0 +1,227 @@
+"""Scheduling primitives for OS threads or cooperative runtimes (gevent, eventlet).
+
+:class:`EdgeFlagsSync` polls on timers, serializes refreshes with a lock and waits for
+change events on a condition. Under gevent or eventlet those must be greenlets and
+greenlet-aware locks, or they either misbehave once monkey-patched or block the hub
+when they aren't. A :class:`Runtime` provides them, and runs blocking network calls
+in the runtime's native thread pool when sockets are not patched, so a fetch never
+stalls other greenlets.
+
+gevent and eventlet are imported only when selected or already in use.
+"""
+
+from __future__ import annotations
+
+import sys
+import threading
+from collections.abc import Callable
+from contextlib import AbstractContextManager, suppress
+from types import TracebackType
+from typing import Any, Literal, Protocol, TypeVar
+
+from .errors import EdgeFlagsError
+
+_T = TypeVar("_T")
+
+Cooperative = bool | Literal["gevent", "eventlet"] | None
+
+
+class Handle(Protocol):
+    def cancel(self) -> None: ...
+
+
+class Condition(Protocol):
+    """The part of :class:`threading.Condition` the change feed uses."""
+
+    def __enter__(self) -> Any: ...
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> Any: ...
+    def wait(self, timeout: float | None = None) -> bool: ...
+    def notify_all(self) -> None: ...
+
+
+class _Condition:
+    """Condition variable over a cooperative runtime's lock and semaphores."""
+
+    __slots__ = ("_lock", "_semaphore", "_waiters")
+
+    def __init__(self, lock: Any, semaphore: Callable[[int], Any]) -> None:
+        self._lock = lock
+        self._semaphore = semaphore
+        self._waiters: list[Any] = []
+
+    def __enter__(self) -> Any:
+        return self._lock.__enter__()
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> Any:
+        return self._lock.__exit__(exc_type, exc, tb)
+
+    def wait(self, timeout: float | None = None) -> bool:
+        # Called with the lock held, which is released while waiting.
+        waiter = self._semaphore(0)
+        self._waiters.append(waiter)
+        self._lock.release()
+        try:
+            notified: bool = waiter.acquire(timeout=timeout)
+        finally:
+            self._lock.acquire()
+        if not notified:
+            with suppress(ValueError):  # notified after the timeout
+                self._waiters.remove(waiter)
+        return notified
+
+    def notify_all(self) -> None:
+        waiters, self._waiters = self._waiters, []
+        for waiter in waiters:
+            waiter.release()
+
+
+class Runtime:
+    """OS-thread primitives; the base for cooperative runtimes."""
+
+    name = "threads"
+
+    def lock(self) -> AbstractContextManager[Any]:
+        return threading.Lock()
+
+    def condition(self) -> Condition:
+        return threading.Condition()
+
+    def spawn(self, fn: Callable[[], object], name: str) -> None:
+        """Run ``fn`` concurrently; ``name`` names the thread."""
+        threading.Thread(target=fn, name=name, daemon=True).start()
+
+    def call_later(self, delay: float, fn: Callable[[], object]) -> Handle:
+        timer = threading.Timer(delay, fn)
+        timer.daemon = True
+        timer.start()
+        return timer
+
+    def blocking(self, fn: Callable[..., _T], *args: Any, **kwargs: Any) -> _T:
+        """Run a call that blocks on I/O without blocking other tasks of the runtime."""
+        return fn(*args, **kwargs)
+
+
+class _GreenletHandle:
+    __slots__ = ("_greenlet",)
+
+    def __init__(self, greenlet: Any) -> None:
+        self._greenlet = greenlet
+
+    def cancel(self) -> None:
+        self._greenlet.kill(block=False)
+
+
+class GeventRuntime(Runtime):
+    name = "gevent"
+
+    def __init__(self) -> None:
+        import gevent
+        import gevent.lock
+        import gevent.monkey
+
+        self._gevent = gevent
+        self._semaphore = gevent.lock.BoundedSemaphore
+        self._signal = gevent.lock.Semaphore
+        self._offload = not gevent.monkey.is_module_patched("socket")
+
+    def lock(self) -> AbstractContextManager[Any]:
+        lock: AbstractContextManager[Any] = self._semaphore(1)
+        return lock
+
+    def condition(self) -> Condition:
+        return _Condition(self._semaphore(1), self._signal)
+
+    def spawn(self, fn: Callable[[], object], name: str) -> None:
+        self._gevent.spawn(fn)
+
+    def call_later(self, delay: float, fn: Callable[[], object]) -> Handle:
+        return _GreenletHandle(self._gevent.spawn_later(delay, fn))
+
+    def blocking(self, fn: Callable[..., _T], *args: Any, **kwargs: Any) -> _T:
+        if not self._offload:
+            return fn(*args, **kwargs)
+        result: _T = self._gevent.get_hub().threadpool.apply(fn, args, kwargs)
+        return result
+
+
+class EventletRuntime(Runtime):
+    name = "eventlet"
+
+    def __init__(self) -> None:
+        import eventlet
+        import eventlet.patcher
+        import eventlet.semaphore
+        import eventlet.tpool
+
+        self._eventlet = eventlet
+        self._semaphore = eventlet.semaphore.BoundedSemaphore
+        self._signal = eventlet.semaphore.Semaphore
+        self._tpool = eventlet.tpool
+        self._offload = not eventlet.patcher.is_monkey_patched("socket")
+
+    def lock(self) -> AbstractContextManager[Any]:
+        lock: AbstractContextManager[Any] = self._semaphore(1)
+        return lock
+
+    def condition(self) -> Condition:
+        return _Condition(self._semaphore(1), self._signal)
+
+    def spawn(self, fn: Callable[[], object], name: str) -> None:
+        self._eventlet.spawn(fn)
+
+    def call_later(self, delay: float, fn: Callable[[], object]) -> Handle:
+        handle: Handle = self._eventlet.spawn_after(delay, fn)
+        return handle
+
+    def blocking(self, fn: Callable[..., _T], *args: Any, **kwargs: Any) -> _T:
+        if not self._offload:
+            return fn(*args, **kwargs)
+        result: _T = self._tpool.execute(fn, *args, **kwargs)
+        return result
+
+
+THREADS = Runtime()
+
+
+def detect() -> str | None:
+    """Name of the monkey-patching cooperative runtime in use, if any.
+
+    Only looks at modules that are already imported, so it never imports gevent or
+    eventlet itself.
+    """
+    monkey = sys.modules.get("gevent.monkey")
+    if monkey is not None and monkey.is_anything_patched():
+        return "gevent"
+    patcher = sys.modules.get("eventlet.patcher")
+    if patcher is not None and patcher.is_monkey_patched("thread"):
+        return "eventlet"
+    return None
+
+
+def select_runtime(cooperative: Cooperative) -> Runtime:
+    """Pick the runtime for ``cooperative``.
+
+    ``None`` detects a monkey-patched runtime, ``True`` requires one (gevent unless
+    eventlet is detected), ``False`` forces OS threads, and a name selects that runtime.
+    """
+    if cooperative is False:
+        return THREADS
+    name = detect() if cooperative is None or cooperative is True else cooperative
+    if name is None:
+        if cooperative is None:
+            return THREADS
+        name = "gevent"
+    try:
+        return GeventRuntime() if name == "gevent" else EventletRuntime()
+    except ImportError as exc:
+        raise EdgeFlagsError(f"cooperative={cooperative!r} needs {name} installed") from exc
@@ -6,28 +6,31 @@ from typing import Any
 
 
 class Emitter:
+    """Event listener registry.
+
+    Listener lists are immutable tuples replaced on every change, so :meth:`emit`
+    reads them without locking; only subscribing and unsubscribing serialize.
+    """
+
     def __init__(self) -> None:
-        self._listeners: dict[str, list[Callable[..., Any]]] = {}
+        self._listeners: dict[str, tuple[Callable[..., Any], ...]] = {}
         self._lock = threading.Lock()
 
     def on(self, event: str, fn: Callable[..., Any]) -> Callable[[], None]:
         with self._lock:
-            if event not in self._listeners:
-                self._listeners[event] = []
-            self._listeners[event].append(fn)
+            self._listeners[event] = (*self._listeners.get(event, ()), fn)
 
         def unsubscribe() -> None:
             with self._lock:
-                listeners = self._listeners.get(event)
-                if listeners and fn in listeners:
-                    listeners.remove(fn)
+                listeners = self._listeners.get(event, ())
+                if fn in listeners:
+                    i = listeners.index(fn)
+                    self._listeners[event] = listeners[:i] + listeners[i + 1 :]
 
         return unsubscribe
 
     def emit(self, event: str, payload: Any = None) -> None:
-        with self._lock:
-            listeners = list(self._listeners.get(event, []))
-        for fn in listeners:
+        for fn in self._listeners.get(event, ()):
             if payload is None:
                 fn()
             else:
@@ -35,4 +38,4 @@ class Emitter:
 
     def remove_all(self) -> None:
         with self._lock:
-            self._listeners.clear()
+            self._listeners = {}
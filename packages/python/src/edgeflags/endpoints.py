@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections.abc import Callable, Sequence
+
+from .types import EndpointStats, FailoverStats
+
+_ALPHA = 0.3
+_MAX_FAILURES = 2
+_EJECTION_TIME = 30.0
+_MAX_EJECTION_TIME = 600.0
+_PROBE_INTERVAL = 300.0
+
+
+def _latency(endpoint: Endpoint) -> float:
+    # Unmeasured endpoints sort first so each one gets measured.
+    return 0.0 if endpoint.latency is None else endpoint.latency
+
+
+class Endpoint:
+    __slots__ = (
+        "url",
+        "latency",
+        "requests",
+        "failures",
+        "consecutive_failures",
+        "ejections",
+        "streak",
+        "ejected_until",
+        "checked",
+    )
+
+    def __init__(self, url: str, now: float) -> None:
+        self.url = url.rstrip("/")
+        self.latency: float | None = None
+        self.requests = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.ejections = 0
+        # Ejections in a row without a successful probe in between.
+        self.streak = 0
+        self.ejected_until: float | None = None
+        self.checked = now
+
+
+class EndpointPool:
+    """Latency-aware routing over several base URLs of the same service.
+
+    Each response time feeds an EWMA per endpoint (weight ``alpha`` for the newest
+    sample), and requests go to the healthy endpoint with the lowest one. After
+    ``max_failures`` consecutive failures an endpoint is ejected for ``ejection_time``
+    seconds, doubling with every ejection in a row up to ``max_ejection_time``. Once
+    that window ends the next request probes it first, and the endpoint is readmitted
+    if the probe succeeds. Healthy endpoints that are not the fastest are re-measured
+    every ``probe_interval`` seconds so a recovered one can win traffic back.
+
+    :meth:`order` lists every endpoint, best first, with ejected ones last, so callers
+    fail over through the whole list before giving up.
+    """
+
+    def __init__(
+        self,
+        urls: Sequence[str],
+        *,
+        alpha: float = _ALPHA,
+        max_failures: int = _MAX_FAILURES,
+        ejection_time: float = _EJECTION_TIME,
+        max_ejection_time: float = _MAX_EJECTION_TIME,
+        probe_interval: float = _PROBE_INTERVAL,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if not urls:
+            raise ValueError("At least one base URL is required")
+        now = clock()
+        self.endpoints = [Endpoint(url, now) for url in urls]
+        self.failovers = 0
+        self._alpha = alpha
+        self._max_failures = max_failures
+        self._ejection_time = ejection_time
+        self._max_ejection_time = max_ejection_time
+        self._probe_interval = probe_interval
+        self._clock = clock
+        self._lock = threading.Lock()
+
+    def order(self) -> list[Endpoint]:
+        """Endpoints in the order a request should try them."""
+        now = self._clock()
+        with self._lock:
+            if len(self.endpoints) == 1:
+                return list(self.endpoints)
+            probe: Endpoint | None = None
+            for endpoint in self.endpoints:
+                until = endpoint.ejected_until
+                if until is not None and now >= until:
+                    # Keep it ejected while the probe is in flight, so only one request
+                    # probes; success readmits it.
+                    endpoint.ejected_until = now + self._ejection(endpoint.streak)
+                    probe = endpoint
+                    break
+            healthy = sorted(
+                (e for e in self.endpoints if e.ejected_until is None),
+                key=_latency,
+            )
+            if probe is None:
+                for endpoint in healthy[1:]:
+                    if now - endpoint.checked >= self._probe_interval:
+                        endpoint.checked = now
+                        probe = endpoint
+                        healthy.remove(endpoint)
+                        break
+            ejected = sorted(
+                (e for e in self.endpoints if e.ejected_until is not None and e is not probe),
+                key=lambda e: e.ejected_until or 0.0,
+            )
+            return ([probe] if probe is not None else []) + healthy + ejected
+
+    def success(self, endpoint: Endpoint, elapsed: float, *, attempt: int = 0) -> None:
+        """Record a response; ``attempt`` is the endpoint's position in :meth:`order`."""
+        with self._lock:
+            endpoint.requests += 1
+            endpoint.checked = self._clock()
+            endpoint.consecutive_failures = 0
+            endpoint.ejected_until = None
+            endpoint.streak = 0
+            previous = endpoint.latency
+            endpoint.latency = (
+                elapsed
+                if previous is None
+                else self._alpha * elapsed + (1 - self._alpha) * previous
+            )
+            if attempt > 0:
+                self.failovers += 1
+
+    def failure(self, endpoint: Endpoint) -> None:
+        """Record a failed request, ejecting the endpoint once it fails too often."""
+        now = self._clock()
+        with self._lock:
+            endpoint.requests += 1
+            endpoint.failures += 1
+            endpoint.checked = now
+            endpoint.consecutive_failures += 1
+            if len(self.endpoints) == 1:
+                return
+            probing = endpoint.ejected_until is not None
+            if probing or endpoint.consecutive_failures >= self._max_failures:
+                endpoint.ejected_until = now + self._ejection(endpoint.streak)
+                endpoint.ejections += 1
+                endpoint.streak += 1
+
+    def stats(self) -> FailoverStats:
+        with self._lock:
+            healthy = [e for e in self.endpoints if e.ejected_until is None]
+            return FailoverStats(
+                active=min(healthy or self.endpoints, key=_latency).url,
+                failovers=self.failovers,
+                endpoints=[
+                    EndpointStats(
+                        url=e.url,
+                        latency=e.latency,
+                        requests=e.requests,
+                        failures=e.failures,
+                        ejected=e.ejected_until is not None,
+                        ejections=e.ejections,
+                    )
+                    for e in self.endpoints
+                ],
+            )
+
+    def _ejection(self, streak: int) -> float:
+        return min(self._ejection_time * 2.0 ** min(streak, 16), self._max_ejection_time)
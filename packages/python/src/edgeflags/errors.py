@@ -2,6 +2,26 @@ from __future__ import annotations
 
 
 class EdgeFlagsError(Exception):
-    def __init__(self, message: str, status_code: int | None = None) -> None:
+    def __init__(
+        self, message: str, status_code: int | None = None, retry_after: float | None = None
+    ) -> None:
         super().__init__(message)
         self.status_code = status_code
+        # Seconds the server asked clients to wait before retrying (``Retry-After``).
+        self.retry_after = retry_after
+
+
+class ChangeFeedOverrun(EdgeFlagsError):
+    """Raised when a change feed consumer fell behind the retained history."""
+
+    def __init__(self, requested: int, oldest: int) -> None:
+        super().__init__(
+            f"Change feed overrun: events after {requested} were dropped "
+            f"(oldest retained is {oldest})"
+        )
+        self.requested = requested
+        self.oldest = oldest
+
+
+class SnapshotFormatError(EdgeFlagsError):
+    """Raised when a snapshot file is not in the expected binary format."""
@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from collections import deque
+from collections.abc import AsyncIterator, Collection, Iterable, Iterator
+from contextlib import suppress
+
+from .cooperative import Condition
+from .errors import ChangeFeedOverrun
+from .types import ChangeEvent
+
+
+def _filter(event: ChangeEvent, keys: Collection[str] | None) -> ChangeEvent | None:
+    if keys is None:
+        return event
+    flags = [change for change in event["flags"] if change["key"] in keys]
+    configs = [change for change in event["configs"] if change["key"] in keys]
+    if not flags and not configs:
+        return None
+    return ChangeEvent(flags=flags, configs=configs, sequence=event["sequence"])
+
+
+class ChangeFeed:
+    """Bounded, sequenced history of change events.
+
+    Each appended event gets the next ``sequence`` number. Consumers read events after
+    a sequence at their own pace; once they fall further behind than ``capacity``
+    events, reading raises :class:`ChangeFeedOverrun`. Blocking reads wait on
+    ``condition``; a cooperative runtime's keeps them from blocking its hub.
+    """
+
+    def __init__(self, capacity: int = 256, *, condition: Condition | None = None) -> None:
+        self._events: deque[ChangeEvent] = deque(maxlen=capacity)
+        self._sequence = 0
+        self._closed = False
+        self._cond = condition if condition is not None else threading.Condition()
+        self._waiters: list[tuple[asyncio.AbstractEventLoop, asyncio.Future[None]]] = []
+
+    @property
+    def sequence(self) -> int:
+        """Sequence number of the latest event, or 0 before the first one."""
+        return self._sequence
+
+    def append(self, event: ChangeEvent) -> int:
+        with self._cond:
+            self._sequence += 1
+            event["sequence"] = self._sequence
+            self._events.append(event)
+            self._wake()
+            return self._sequence
+
+    def since(self, sequence: int) -> list[ChangeEvent]:
+        """Return retained events after ``sequence``."""
+        with self._cond:
+            return self._since(sequence)
+
+    def close(self) -> None:
+        """Stop all iterators once they have drained the retained events."""
+        with self._cond:
+            self._closed = True
+            self._wake()
+
+    def iter(
+        self,
+        since: int | None = None,
+        keys: Iterable[str] | None = None,
+        timeout: float | None = None,
+    ) -> Iterator[ChangeEvent]:
+        """Yield events after ``since`` (default: from now on), blocking for new ones.
+
+        Stops when the feed is closed, or after ``timeout`` seconds without an event.
+        """
+        start = self._sequence if since is None else since
+        return self._iter(start, None if keys is None else frozenset(keys), timeout)
+
+    def aiter(
+        self,
+        since: int | None = None,
+        keys: Iterable[str] | None = None,
+    ) -> AsyncIterator[ChangeEvent]:
+        """Async equivalent of :meth:`iter`, without a timeout."""
+        start = self._sequence if since is None else since
+        return self._aiter(start, None if keys is None else frozenset(keys))
+
+    def _iter(
+        self, last: int, wanted: frozenset[str] | None, timeout: float | None
+    ) -> Iterator[ChangeEvent]:
+        while True:
+            with self._cond:
+                deadline = None if timeout is None else time.monotonic() + timeout
+                while self._sequence <= last and not self._closed:
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        return
+                    self._cond.wait(remaining)
+                events = self._since(last)
+                if not events and self._closed:
+                    return
+            for event in events:
+                last = event["sequence"]
+                filtered = _filter(event, wanted)
+                if filtered is not None:
+                    yield filtered
+
+    async def _aiter(self, last: int, wanted: frozenset[str] | None) -> AsyncIterator[ChangeEvent]:
+        loop = asyncio.get_running_loop()
+        while True:
+            waiter: asyncio.Future[None] | None = None
+            with self._cond:
+                events = self._since(last)
+                if not events:
+                    if self._closed:
+                        return
+                    waiter = loop.create_future()
+                    self._waiters.append((loop, waiter))
+            if waiter is not None:
+                await waiter
+                continue
+            for event in events:
+                last = event["sequence"]
+                filtered = _filter(event, wanted)
+                if filtered is not None:
+                    yield filtered
+
+    def _since(self, sequence: int) -> list[ChangeEvent]:
+        if sequence >= self._sequence:
+            return []
+        oldest = self._sequence - len(self._events) + 1
+        if sequence < oldest - 1:
+            raise ChangeFeedOverrun(sequence, oldest)
+        return list(self._events)[sequence - oldest + 1 :]
+
+    def _wake(self) -> None:
+        self._cond.notify_all()
+        waiters, self._waiters = self._waiters, []
+        for loop, waiter in waiters:
+            with suppress(RuntimeError):  # loop already closed
+                loop.call_soon_threadsafe(_resolve, waiter)
+
+
+def _resolve(waiter: asyncio.Future[None]) -> None:
+    if not waiter.done():
+        waiter.set_result(None)
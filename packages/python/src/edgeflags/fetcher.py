@@ -1,66 +1,593 @@
 from __future__ import annotations
 
-from typing import Any
+import asyncio
+import json
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Sequence
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Literal
+from urllib.parse import urlencode
 
 import httpx
 
+from .context import EncodedContext, encode_context
+from .endpoints import EndpointPool
 from .errors import EdgeFlagsError
-from .types import EvaluationContext, EvaluationResponse
+from .poller import Pace
+from .recording import Recorder
+from .scope import Scope
+from .types import EvaluationContext, EvaluationResponse, FailoverStats
 
 _TIMEOUT = 30.0
+_EVALUATE_PATH = "/api/v1/evaluate"
+_RESPONSE_CACHE_SIZE = 64
+_ETAG_CACHE_SIZE = 64
+POLL_INTERVAL_HEADER = "X-EdgeFlags-Poll-Interval"
+
+HTTPMethod = Literal["POST", "GET"]
+
+
+class _Request:
+    """One evaluate request, encoded for ``method``.
+
+    ``key`` identifies the context and scope, ``cache_key`` also the ``since`` version.
+    POST bodies splice in the context's pre-encoded JSON; GET requests carry everything
+    in the query string so shared HTTP caches can answer them.
+    """
+
+    __slots__ = ("method", "path", "content", "key", "cache_key")
+
+    def __init__(
+        self,
+        method: HTTPMethod,
+        context: EncodedContext,
+        since: int | None,
+        scope: Scope | None,
+    ) -> None:
+        scope_body = {} if scope is None else scope.to_body()
+        self.method = method
+        self.key = f"{context.digest}|{json.dumps(scope_body, sort_keys=True)}"
+        self.cache_key = f"{self.key}|{since}"
+        extra: dict[str, Any] = {} if since is None else {"since": since}
+        extra.update(scope_body)
+        if method == "GET":
+            query = context.query
+            if extra:
+                query += "&" + urlencode(extra, doseq=True)
+            self.path = f"{_EVALUATE_PATH}?{query}"
+            self.content: bytes | None = None
+        else:
+            self.path = _EVALUATE_PATH
+            rest = json.dumps(extra, separators=(",", ":")).encode()
+            self.content = b'{"context":' + context.json + (b"," + rest[1:] if extra else b"}")
+
+
+def _endpoint_pool(base_url: str | Sequence[str]) -> EndpointPool:
+    return EndpointPool([base_url] if isinstance(base_url, str) else base_url)
+
+
+def _not_modified(since: int) -> EvaluationResponse:
+    # A 304 to a conditional poll is an empty delta against the cached version.
+    return EvaluationResponse(
+        flags={},
+        configs={},
+        version=since,
+        base_version=since,
+        deleted_flags=[],
+        deleted_configs=[],
+    )
+
+
+class _Revalidation:
+    """ETags of recent responses, sent back as ``If-None-Match`` on repeat polls.
+
+    Only polls carrying ``since`` are conditional, and only with the ETag of the last
+    response for the same context and scope. ETags are kept per request key, so scoped
+    fetches don't displace the full poll's; the least recently used ones beyond
+    ``capacity`` are dropped.
+    """
+
+    __slots__ = ("_etags", "_capacity", "_lock")
+
+    def __init__(self, capacity: int = _ETAG_CACHE_SIZE) -> None:
+        self._etags: OrderedDict[str, str] = OrderedDict()
+        self._capacity = capacity
+        # A relay fetches for many contexts from concurrent threads.
+        self._lock = threading.Lock()
+
+    def headers(self, key: str, since: int | None) -> dict[str, str]:
+        if since is None:
+            return {}
+        with self._lock:
+            etag = self._etags.get(key)
+            if etag is None:
+                return {}
+            self._etags.move_to_end(key)
+        return {"If-None-Match": etag}
+
+    def store(self, key: str, response: httpx.Response) -> None:
+        etag = response.headers.get("ETag")
+        with self._lock:
+            if etag is None:
+                self._etags.pop(key, None)
+                return
+            self._etags[key] = etag
+            self._etags.move_to_end(key)
+            while len(self._etags) > self._capacity:
+                self._etags.popitem(last=False)
+
+
+def _seconds(value: str | None) -> float | None:
+    if value is None:
+        return None
+    try:
+        seconds = float(value)
+    except ValueError:
+        return None
+    return seconds if seconds >= 0 else None
+
+
+def _retry_after(response: httpx.Response) -> float | None:
+    value = response.headers.get("Retry-After")
+    if value is None:
+        return None
+    seconds = _seconds(value)
+    if seconds is not None:
+        return seconds
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+def _directives(cache_control: str | None) -> dict[str, str]:
+    if cache_control is None:
+        return {}
+    directives: dict[str, str] = {}
+    for directive in cache_control.split(","):
+        name, _, value = directive.strip().partition("=")
+        directives[name.lower()] = value.strip('"')
+    return directives
+
+
+def _max_age(cache_control: str | None) -> float | None:
+    return _seconds(_directives(cache_control).get("max-age"))
+
+
+def _freshness(response: httpx.Response) -> float | None:
+    """Seconds ``response`` stays fresh for a private cache (RFC 9111, section 4.2)."""
+    directives = _directives(response.headers.get("Cache-Control"))
+    if "no-store" in directives or "no-cache" in directives:
+        return None
+    lifetime = _seconds(directives.get("max-age"))
+    if lifetime is None:
+        expires = response.headers.get("Expires")
+        date = response.headers.get("Date")
+        if expires is None or date is None:
+            return None
+        try:
+            lifetime = (
+                parsedate_to_datetime(expires) - parsedate_to_datetime(date)
+            ).total_seconds()
+        except (TypeError, ValueError):
+            return 0.0  # an invalid Expires means already expired
+    age = _seconds(response.headers.get("Age")) or 0.0
+    return lifetime - age
+
+
+class _ResponseCache:
+    """Fresh evaluate responses by request, served without contacting the service.
+
+    Only successful responses with a positive freshness lifetime are kept. Lifetimes
+    count from when the request was sent, so an entry never outlives what the server
+    allowed. The least recently used entries beyond ``capacity`` are dropped.
+    """
+
+    __slots__ = ("_entries", "_capacity", "_clock", "hits")
+
+    def __init__(
+        self, capacity: int = _RESPONSE_CACHE_SIZE, clock: Callable[[], float] = time.monotonic
+    ) -> None:
+        self._entries: OrderedDict[str, tuple[float, bytes]] = OrderedDict()
+        self._capacity = capacity
+        self._clock = clock
+        self.hits = 0
+
+    def get(self, key: str) -> bytes | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires, content = entry
+        if self._clock() >= expires:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return content
+
+    def store(self, key: str, response: httpx.Response, sent: float) -> None:
+        fresh = _freshness(response)
+        if fresh is None or fresh <= 0:
+            self._entries.pop(key, None)
+            return
+        self._entries[key] = (sent + fresh, response.content)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._capacity:
+            self._entries.popitem(last=False)
+
+
+class _Pacing:
+    """Server hints for when to poll next.
+
+    ``X-EdgeFlags-Poll-Interval`` sets a new interval that holds until the server sends
+    another; ``Cache-Control: max-age`` only delays the poll after its response. Values
+    are kept as sent; the poller clamps them.
+    """
+
+    __slots__ = ("interval", "max_age")
+
+    def __init__(self) -> None:
+        self.interval: float | None = None
+        self.max_age: float | None = None
+
+    def observe(self, response: httpx.Response) -> None:
+        interval = _seconds(response.headers.get(POLL_INTERVAL_HEADER))
+        if interval is not None:
+            self.interval = interval
+        self.max_age = _max_age(response.headers.get("Cache-Control"))
+
+    @property
+    def next_delay(self) -> Pace:
+        return self.interval, self.max_age
+
+
+class _Dependencies:
+    """The service's map of which context attributes each key's evaluation reads.
+
+    Full responses replace the map (or drop it when they carry none); deltas and
+    scoped responses update the listed keys. ``attributes`` is the union over all keys,
+    or ``None`` while the map is unknown.
+    """
+
+    __slots__ = ("keys", "attributes")
+
+    def __init__(self) -> None:
+        self.keys: dict[str, frozenset[str]] | None = None
+        self.attributes: frozenset[str] | None = None
+
+    def observe(self, data: EvaluationResponse, scoped: bool) -> None:
+        dependencies = data.get("dependencies")
+        if not scoped and "base_version" not in data:
+            self.keys = None if dependencies is None else {}
+        keys = self.keys
+        if keys is None:
+            self.attributes = None
+            return
+        deleted = (*data.get("deleted_flags", ()), *data.get("deleted_configs", ()))
+        if not dependencies and not deleted and self.attributes is not None:
+            return
+        for key in deleted:
+            keys.pop(key, None)
+        for key, attributes in (dependencies or {}).items():
+            keys[key] = frozenset(attributes)
+        self.attributes = frozenset().union(*keys.values())
+
+
+def _check_status(response: httpx.Response) -> None:
+    if response.status_code != 200:
+        raise EdgeFlagsError(
+            f"Evaluation request failed: {response.status_code} {response.reason_phrase}",
+            response.status_code,
+            _retry_after(response),
+        )
+
+
+def _parse_response(response: httpx.Response, scope: Scope | None) -> EvaluationResponse:
+    _check_status(response)
+    return _decode(response.content, scope)
+
+
+def _decode(content: bytes, scope: Scope | None) -> EvaluationResponse:
+    data = json.loads(content)
+    result = EvaluationResponse(flags=data["flags"], configs=data["configs"])
+    if "version" in data:
+        result["version"] = data["version"]
+    if "base_version" in data:
+        result["base_version"] = data["base_version"]
+        result["deleted_flags"] = data.get("deleted_flags", [])
+        result["deleted_configs"] = data.get("deleted_configs", [])
+    if "dependencies" in data:
+        result["dependencies"] = data["dependencies"]
+    if "tags" in data:
+        result["tags"] = data["tags"]
+    if scope is not None:
+        # Servers that ignore the scope still must not widen what the cache holds.
+        result["flags"] = scope.filter(result["flags"])
+        result["configs"] = scope.filter(result["configs"])
+        if "tags" in result:
+            result["tags"] = scope.filter(result["tags"])
+        if "base_version" in result:
+            result["deleted_flags"] = [k for k in result["deleted_flags"] if k in scope]
+            result["deleted_configs"] = [k for k in result["deleted_configs"] if k in scope]
+    return result
 
 
 class AsyncFetcher:
-    def __init__(self, base_url: str, token: str) -> None:
-        self._base_url = base_url.rstrip("/")
+    """Async evaluation fetcher.
+
+    ``base_url`` may list several endpoints of the service; each request goes to the
+    fastest healthy one and fails over to the others (see :class:`EndpointPool`).
+
+    With ``method="GET"`` the canonical context travels in the query string, so shared
+    HTTP caches can answer identical contexts, and fresh responses are also reused from
+    a local cache per ``Cache-Control``/``Expires``.
+
+    Responses of at least ``offload_threshold`` bytes are decoded in a worker thread,
+    and of at least ``process_threshold`` bytes in a worker process, so large payloads
+    don't stall the event loop. ``None`` disables either.
+
+    ETags are remembered for the last ``etag_cache_size`` contexts and scopes fetched,
+    so their polls can be answered with ``304 Not Modified``.
+
+    A ``recorder`` captures every response received (see :mod:`edgeflags.recording`),
+    and ``transport`` replaces the ``httpx`` transport, e.g. to replay a recording.
+    """
+
+    def __init__(
+        self,
+        base_url: str | Sequence[str],
+        token: str,
+        *,
+        method: HTTPMethod = "POST",
+        uds: str | None = None,
+        offload_threshold: int | None = None,
+        process_threshold: int | None = None,
+        recorder: Recorder | None = None,
+        transport: httpx.AsyncBaseTransport | None = None,
+        etag_cache_size: int = _ETAG_CACHE_SIZE,
+    ) -> None:
+        self._endpoints = _endpoint_pool(base_url)
         self._token = token
+        self._method = method
+        self._revalidation = _Revalidation(etag_cache_size)
+        self._responses = _ResponseCache() if method == "GET" else None
+        self._pacing = _Pacing()
+        self._dependencies = _Dependencies()
+        self._offload_threshold = offload_threshold
+        self._process_threshold = process_threshold
+        self._process_pool: ProcessPoolExecutor | None = None
+        self._recorder = recorder
+        if transport is None and uds is not None:
+            transport = httpx.AsyncHTTPTransport(uds=uds)
         self._client = httpx.AsyncClient(
-            base_url=self._base_url,
-            headers={
-                "Authorization": f"Bearer {self._token}",
-                "Content-Type": "application/json",
-            },
+            headers={"Authorization": f"Bearer {self._token}"},
             timeout=_TIMEOUT,
+            transport=transport,
         )
 
-    async def fetch_all(self, context: EvaluationContext) -> EvaluationResponse:
-        body: dict[str, Any] = {"context": dict(context)}
-        response = await self._client.post("/api/v1/evaluate", json=body)
-        if response.status_code != 200:
-            raise EdgeFlagsError(
-                f"Evaluation request failed: {response.status_code} {response.reason_phrase}",
-                response.status_code,
-            )
-        data = response.json()
-        return EvaluationResponse(flags=data["flags"], configs=data["configs"])
+    async def fetch_all(
+        self,
+        context: EvaluationContext | EncodedContext,
+        *,
+        since: int | None = None,
+        scope: Scope | None = None,
+    ) -> EvaluationResponse:
+        """Fetch evaluations, asking for a delta against ``since`` when given.
+
+        With ``scope`` set only the keys in scope are requested and returned. Pass an
+        :class:`EncodedContext` to avoid re-encoding the same context on every call.
+        """
+        data, _ = await self.fetch(context, since=since, scope=scope)
+        return data
+
+    async def fetch(
+        self,
+        context: EvaluationContext | EncodedContext,
+        *,
+        since: int | None = None,
+        scope: Scope | None = None,
+    ) -> tuple[EvaluationResponse, bool]:
+        """Like :meth:`fetch_all`, also returning whether decoding was offloaded.
+
+        Callers can then process large responses off the event loop as well. The flag
+        comes with each result because fetches may overlap.
+        """
+        request = _Request(self._method, encode_context(context), since, scope)
+        responses = self._responses
+        content = None if responses is None else responses.get(request.cache_key)
+        if content is None:
+            sent = time.monotonic()
+            response = await self._send(request, self._revalidation.headers(request.key, since))
+            if self._recorder is not None:
+                self._recorder.record(request.method, since, response, time.monotonic() - sent)
+            self._pacing.observe(response)
+            if response.status_code == 304 and since is not None:
+                return _not_modified(since), False
+            _check_status(response)
+            self._revalidation.store(request.key, response)
+            if responses is not None:
+                responses.store(request.cache_key, response, sent)
+            content = response.content
+        size = len(content)
+
+        if self._process_threshold is not None and size >= self._process_threshold:
+            if self._process_pool is None:
+                self._process_pool = ProcessPoolExecutor(max_workers=1)
+            offloaded = True
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(self._process_pool, _decode, content, scope)
+        elif self._offload_threshold is not None and size >= self._offload_threshold:
+            offloaded = True
+            result = await asyncio.to_thread(_decode, content, scope)
+        else:
+            offloaded = False
+            result = _decode(content, scope)
+        self._dependencies.observe(result, scope is not None)
+        return result, offloaded
+
+    async def _send(self, request: _Request, headers: dict[str, str]) -> httpx.Response:
+        # Fail over through the endpoints, best first; 5xx and transport errors count
+        # against an endpoint, while other statuses are answers from a healthy one.
+        if request.content is not None:
+            headers = {**headers, "Content-Type": "application/json"}
+        error: httpx.TransportError | None = None
+        failed: httpx.Response | None = None
+        for attempt, endpoint in enumerate(self._endpoints.order()):
+            started = time.monotonic()
+            try:
+                response = await self._client.request(
+                    request.method,
+                    endpoint.url + request.path,
+                    content=request.content,
+                    headers=headers,
+                )
+            except httpx.TransportError as exc:
+                self._endpoints.failure(endpoint)
+                error = exc
+                continue
+            if response.status_code >= 500:
+                self._endpoints.failure(endpoint)
+                failed = response
+                continue
+            self._endpoints.success(endpoint, time.monotonic() - started, attempt=attempt)
+            return response
+        if failed is not None:
+            return failed
+        assert error is not None
+        raise error
+
+    @property
+    def poll_hint(self) -> Pace:
+        """Server interval and minimum delay for the next poll, from the last response."""
+        return self._pacing.next_delay
+
+    @property
+    def context_attributes(self) -> frozenset[str] | None:
+        """Context attributes any evaluated key depends on; ``None`` if not reported."""
+        return self._dependencies.attributes
+
+    @property
+    def endpoint_stats(self) -> FailoverStats:
+        return self._endpoints.stats()
 
     async def close(self) -> None:
         await self._client.aclose()
+        if self._process_pool is not None:
+            self._process_pool.shutdown(wait=False)
+            self._process_pool = None
 
 
 class SyncFetcher:
-    def __init__(self, base_url: str, token: str) -> None:
-        self._base_url = base_url.rstrip("/")
+    def __init__(
+        self,
+        base_url: str | Sequence[str],
+        token: str,
+        *,
+        method: HTTPMethod = "POST",
+        uds: str | None = None,
+        recorder: Recorder | None = None,
+        transport: httpx.BaseTransport | None = None,
+        etag_cache_size: int = _ETAG_CACHE_SIZE,
+    ) -> None:
+        self._endpoints = _endpoint_pool(base_url)
         self._token = token
+        self._method = method
+        self._revalidation = _Revalidation(etag_cache_size)
+        self._responses = _ResponseCache() if method == "GET" else None
+        self._pacing = _Pacing()
+        self._dependencies = _Dependencies()
+        self._recorder = recorder
+        if transport is None and uds is not None:
+            transport = httpx.HTTPTransport(uds=uds)
         self._client = httpx.Client(
-            base_url=self._base_url,
-            headers={
-                "Authorization": f"Bearer {self._token}",
-                "Content-Type": "application/json",
-            },
+            headers={"Authorization": f"Bearer {self._token}"},
             timeout=_TIMEOUT,
+            transport=transport,
         )
 
-    def fetch_all(self, context: EvaluationContext) -> EvaluationResponse:
-        body: dict[str, Any] = {"context": dict(context)}
-        response = self._client.post("/api/v1/evaluate", json=body)
-        if response.status_code != 200:
-            raise EdgeFlagsError(
-                f"Evaluation request failed: {response.status_code} {response.reason_phrase}",
-                response.status_code,
-            )
-        data = response.json()
-        return EvaluationResponse(flags=data["flags"], configs=data["configs"])
+    def fetch_all(
+        self,
+        context: EvaluationContext | EncodedContext,
+        *,
+        since: int | None = None,
+        scope: Scope | None = None,
+    ) -> EvaluationResponse:
+        """Fetch evaluations, asking for a delta against ``since`` when given.
+
+        With ``scope`` set only the keys in scope are requested and returned. Pass an
+        :class:`EncodedContext` to avoid re-encoding the same context on every call.
+        """
+        request = _Request(self._method, encode_context(context), since, scope)
+        responses = self._responses
+        content = None if responses is None else responses.get(request.cache_key)
+        if content is not None:
+            result = _decode(content, scope)
+            self._dependencies.observe(result, scope is not None)
+            return result
+        sent = time.monotonic()
+        response = self._send(request, self._revalidation.headers(request.key, since))
+        if self._recorder is not None:
+            self._recorder.record(request.method, since, response, time.monotonic() - sent)
+        self._pacing.observe(response)
+        if response.status_code == 304 and since is not None:
+            return _not_modified(since)
+        result = _parse_response(response, scope)
+        self._revalidation.store(request.key, response)
+        if responses is not None:
+            responses.store(request.cache_key, response, sent)
+        self._dependencies.observe(result, scope is not None)
+        return result
+
+    def _send(self, request: _Request, headers: dict[str, str]) -> httpx.Response:
+        # Same failover as AsyncFetcher._send.
+        if request.content is not None:
+            headers = {**headers, "Content-Type": "application/json"}
+        error: httpx.TransportError | None = None
+        failed: httpx.Response | None = None
+        for attempt, endpoint in enumerate(self._endpoints.order()):
+            started = time.monotonic()
+            try:
+                response = self._client.request(
+                    request.method,
+                    endpoint.url + request.path,
+                    content=request.content,
+                    headers=headers,
+                )
+            except httpx.TransportError as exc:
+                self._endpoints.failure(endpoint)
+                error = exc
+                continue
+            if response.status_code >= 500:
+                self._endpoints.failure(endpoint)
+                failed = response
+                continue
+            self._endpoints.success(endpoint, time.monotonic() - started, attempt=attempt)
+            return response
+        if failed is not None:
+            return failed
+        assert error is not None
+        raise error
+
+    @property
+    def poll_hint(self) -> Pace:
+        """Server interval and minimum delay for the next poll, from the last response."""
+        return self._pacing.next_delay
+
+    @property
+    def context_attributes(self) -> frozenset[str] | None:
+        """Context attributes any evaluated key depends on; ``None`` if not reported."""
+        return self._dependencies.attributes
+
+    @property
+    def endpoint_stats(self) -> FailoverStats:
+        return self._endpoints.stats()
 
     def close(self) -> None:
         self._client.close()
@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import sys
+from typing import Any, NoReturn
+
+
+def _read_only() -> NoReturn:
+    raise TypeError("EdgeFlags values are read-only")
+
+
+class FrozenDict(dict[str, Any]):
+    """Read-only ``dict`` holding a flag or config value from the cache.
+
+    Subclassing ``dict`` keeps values JSON-serializable and equal to plain dicts,
+    while making accidental mutation of shared cache state an error.
+    """
+
+    __slots__ = ()
+
+    def __setitem__(self, key: str, value: Any) -> NoReturn:
+        _read_only()
+
+    def __delitem__(self, key: str) -> NoReturn:
+        _read_only()
+
+    def __ior__(self, other: Any) -> NoReturn:  # type: ignore[misc]
+        _read_only()
+
+    def clear(self) -> NoReturn:
+        _read_only()
+
+    def pop(self, key: str, *default: Any) -> NoReturn:
+        _read_only()
+
+    def popitem(self) -> NoReturn:
+        _read_only()
+
+    def setdefault(self, key: str, default: Any = None) -> NoReturn:
+        _read_only()
+
+    def update(self, *args: Any, **kwargs: Any) -> NoReturn:
+        _read_only()
+
+    def __reduce__(self) -> tuple[type[FrozenDict], tuple[dict[str, Any]]]:
+        return (FrozenDict, (dict(self),))
+
+    def __repr__(self) -> str:
+        return f"FrozenDict({dict.__repr__(self)})"
+
+
+def freeze(value: Any) -> Any:
+    """Return a deeply immutable copy of a decoded JSON value.
+
+    Dicts become :class:`FrozenDict` with interned keys and lists become tuples.
+    Scalars and already-frozen dicts are returned unchanged.
+    """
+    if isinstance(value, dict):
+        if type(value) is FrozenDict:
+            return value
+        return FrozenDict(
+            {
+                sys.intern(key) if type(key) is str else key: freeze(item)
+                for key, item in value.items()
+            }
+        )
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(item) for item in value)
+    return value
@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+from collections.abc import Awaitable, Callable, Iterable, Iterator, MutableMapping
+from contextlib import ExitStack, suppress
+from typing import Any
+
+from .client import EdgeFlags, EdgeFlagsSync
+
+_Scope = MutableMapping[str, Any]
+_Receive = Callable[[], Awaitable[MutableMapping[str, Any]]]
+_Send = Callable[[MutableMapping[str, Any]], Awaitable[None]]
+_ASGIApp = Callable[[_Scope, _Receive, _Send], Awaitable[None]]
+_StartResponse = Callable[..., Any]
+_WSGIApp = Callable[[dict[str, Any], _StartResponse], Iterable[bytes]]
+
+
+class EdgeFlagsASGIMiddleware:
+    """ASGI middleware pinning one flag snapshot for the duration of each request.
+
+    Every ``flag()``/``config()`` read made while handling a request sees the same
+    snapshot, even if a poll lands mid-request.
+    """
+
+    def __init__(self, app: _ASGIApp, client: EdgeFlags | EdgeFlagsSync) -> None:
+        self._app = app
+        self._client = client
+
+    async def __call__(self, scope: _Scope, receive: _Receive, send: _Send) -> None:
+        if scope["type"] not in ("http", "websocket"):
+            await self._app(scope, receive, send)
+            return
+        with self._client.pin():
+            await self._app(scope, receive, send)
+
+
+class EdgeFlagsWSGIMiddleware:
+    """WSGI middleware pinning one flag snapshot for the duration of each request.
+
+    The pin is held until the response body has been iterated and closed.
+    """
+
+    def __init__(self, app: _WSGIApp, client: EdgeFlags | EdgeFlagsSync) -> None:
+        self._app = app
+        self._client = client
+
+    def __call__(self, environ: dict[str, Any], start_response: _StartResponse) -> Iterable[bytes]:
+        stack = ExitStack()
+        stack.enter_context(self._client.pin())
+        try:
+            body = self._app(environ, start_response)
+        except BaseException:
+            stack.close()
+            raise
+        return _pinned_body(body, stack)
+
+
+def _pinned_body(body: Iterable[bytes], stack: ExitStack) -> Iterator[bytes]:
+    try:
+        yield from body
+    finally:
+        close = getattr(body, "close", None)
+        if close is not None:
+            close()
+        # A body closed from another context (e.g. garbage collected) can't reset
+        # the pin's token; that context never saw the pin, so there is nothing to undo.
+        with suppress(ValueError):
+            stack.close()
@@ -0,0 +1,23 @@
+"""JSON pointer (RFC 6901) helpers for path-level config changes."""
+
+from __future__ import annotations
+
+
+def escape(segment: str) -> str:
+    """Escape one reference token of a JSON pointer."""
+    return segment.replace("~", "~0").replace("/", "~1")
+
+
+def matches(path: str, prefix: str) -> bool:
+    """Whether a change at ``path`` affects the subtree at ``prefix``.
+
+    That is the case when ``path`` is ``prefix`` itself, inside it, or one of its
+    ancestors (replacing a parent replaces everything below it).
+    """
+    if path == prefix or not prefix:
+        return True
+    if path.startswith(prefix):
+        return path[len(prefix)] == "/"
+    if prefix.startswith(path):
+        return prefix[len(path)] == "/"
+    return False
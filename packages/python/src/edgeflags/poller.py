@@ -2,85 +2,232 @@ from __future__ import annotations
 
 import asyncio
 import threading
+import time
 from collections.abc import Callable
+from contextlib import suppress
+
+from .cooperative import THREADS, Handle, Runtime
+from .errors import EdgeFlagsError
+
+# Floor for server-supplied delays, so a bad header can't make clients spin.
+_MIN_SERVER_DELAY = 1.0
+
+# Server pacing hints: an interval replacing the configured one, and a minimum delay
+# for the next run only.
+Pace = tuple[float | None, float | None]
+
+
+def _delay_after(interval: float, exc: Exception | None, pace: Callable[[], Pace] | None) -> float:
+    if exc is not None:
+        hint = exc.retry_after if isinstance(exc, EdgeFlagsError) else None
+        return interval if hint is None else max(hint, _MIN_SERVER_DELAY)
+    if pace is None:
+        return interval
+    suggested, minimum = pace()
+    if suggested is not None:
+        interval = max(suggested, _MIN_SERVER_DELAY)
+    if minimum is not None:
+        interval = max(interval, minimum)
+    return interval
+
+
+class IdleTracker:
+    """Notices when a client's values stop being read.
+
+    A read only sets :attr:`read`; pollers call :meth:`idle` once per tick, which
+    reports the client idle, and marks it parked, after ``timeout`` seconds without
+    reads. :meth:`unpark` is how the first read after that claims the wake-up.
+    """
+
+    __slots__ = ("timeout", "read", "active", "parked", "_lock")
+
+    def __init__(self, timeout: float) -> None:
+        self.timeout = timeout
+        self.read = False
+        self.active = time.monotonic()
+        self.parked = False
+        self._lock = threading.Lock()
+
+    def idle(self) -> bool:
+        now = time.monotonic()
+        if self.read:
+            self.read = False
+            self.active = now
+            return False
+        if now - self.active < self.timeout:
+            return False
+        self.parked = True
+        return True
+
+    def unpark(self) -> bool:
+        """Leave the parked state; only the first of concurrent callers gets ``True``."""
+        with self._lock:
+            if not self.parked:
+                return False
+            self.parked = False
+            self.active = time.monotonic()
+            return True
 
 
 class AsyncPoller:
+    """Runs ``task`` every ``interval_seconds``.
+
+    ``pace`` may return server hints for the next run after a successful task (see
+    :data:`Pace`); a failed task raising :class:`EdgeFlagsError` with ``retry_after``
+    set delays the next run by that much instead. Server-supplied delays are never
+    shorter than a second. When ``idle`` returns true before a run,
+    the poller parks until :meth:`resume` is called.
+    """
+
     def __init__(
         self,
         interval_seconds: float,
         task: Callable[[], object],
         on_error: Callable[[Exception], None],
+        pace: Callable[[], Pace] | None = None,
+        idle: Callable[[], bool] | None = None,
     ) -> None:
         self._interval = interval_seconds
         self._task = task
         self._on_error = on_error
+        self._pace = pace
+        self._idle = idle
         self._async_task: asyncio.Task[None] | None = None
+        self._event_loop: asyncio.AbstractEventLoop | None = None
+        self._wake: asyncio.Event | None = None
+        self._run_now = True
 
     async def _loop(self) -> None:
+        delay = _delay_after(self._interval, None, self._pace)
         while True:
-            await asyncio.sleep(self._interval)
+            await asyncio.sleep(delay)
+            if self._idle is not None and self._idle():
+                self._wake = asyncio.Event()
+                await self._wake.wait()
+                self._wake = None
+                if not self._run_now:
+                    delay = _delay_after(self._interval, None, self._pace)
+                    continue
             try:
                 result = self._task()
                 if asyncio.iscoroutine(result):
                     await result
             except Exception as exc:
                 self._on_error(exc)
+                delay = _delay_after(self._interval, exc, self._pace)
+            else:
+                delay = _delay_after(self._interval, None, self._pace)
 
     def start(self) -> None:
         if self._async_task is not None:
             return
-        self._async_task = asyncio.get_event_loop().create_task(self._loop())
+        self._event_loop = asyncio.get_event_loop()
+        self._async_task = self._event_loop.create_task(self._loop())
 
     def stop(self) -> None:
         if self._async_task is not None:
             self._async_task.cancel()
             self._async_task = None
 
+    def resume(self, run_now: bool = True) -> None:
+        """Leave the parked state, running the task right away unless ``run_now`` is false.
+
+        Safe to call from any thread.
+        """
+        if self._event_loop is not None:
+            with suppress(RuntimeError):  # loop already closed
+                self._event_loop.call_soon_threadsafe(self._resume, run_now)
+
+    def _resume(self, run_now: bool) -> None:
+        if self._wake is not None:
+            self._run_now = run_now
+            self._wake.set()
+
     @property
     def running(self) -> bool:
         return self._async_task is not None and not self._async_task.done()
 
+    @property
+    def parked(self) -> bool:
+        return self._wake is not None
+
 
 class SyncPoller:
+    """Timer-based equivalent of :class:`AsyncPoller`.
+
+    Timers and the lock come from ``runtime``: OS threads by default, or greenlets
+    under gevent/eventlet.
+    """
+
     def __init__(
         self,
         interval_seconds: float,
         task: Callable[[], object],
         on_error: Callable[[Exception], None],
+        pace: Callable[[], Pace] | None = None,
+        idle: Callable[[], bool] | None = None,
+        runtime: Runtime = THREADS,
     ) -> None:
         self._interval = interval_seconds
         self._task = task
         self._on_error = on_error
-        self._timer: threading.Timer | None = None
+        self._pace = pace
+        self._idle = idle
+        self._runtime = runtime
+        self._timer: Handle | None = None
         self._running = False
+        self._parked = False
+        self._lock = runtime.lock()
 
     def _tick(self) -> None:
-        if not self._running:
-            return
+        with self._lock:
+            if not self._running:
+                return
+            if self._idle is not None and self._idle():
+                self._parked = True
+                return
         try:
             self._task()
         except Exception as exc:
             self._on_error(exc)
-        if self._running:
-            self._timer = threading.Timer(self._interval, self._tick)
-            self._timer.daemon = True
-            self._timer.start()
+            delay = _delay_after(self._interval, exc, self._pace)
+        else:
+            delay = _delay_after(self._interval, None, self._pace)
+        with self._lock:
+            if self._running:
+                self._schedule(delay)
+
+    def _schedule(self, delay: float) -> None:
+        self._timer = self._runtime.call_later(delay, self._tick)
 
     def start(self) -> None:
-        if self._running:
-            return
-        self._running = True
-        self._timer = threading.Timer(self._interval, self._tick)
-        self._timer.daemon = True
-        self._timer.start()
+        with self._lock:
+            if self._running:
+                return
+            self._running = True
+            self._schedule(_delay_after(self._interval, None, self._pace))
 
     def stop(self) -> None:
-        self._running = False
-        if self._timer is not None:
-            self._timer.cancel()
-            self._timer = None
+        # Under the lock, so a tick finishing concurrently can't reschedule after this.
+        with self._lock:
+            self._running = False
+            self._parked = False
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+
+    def resume(self, run_now: bool = True) -> None:
+        """Leave the parked state, running the task right away unless ``run_now`` is false."""
+        with self._lock:
+            if not self._parked or not self._running:
+                return
+            self._parked = False
+            self._schedule(0.0 if run_now else _delay_after(self._interval, None, self._pace))
 
     @property
     def running(self) -> bool:
         return self._running
+
+    @property
+    def parked(self) -> bool:
+        return self._parked
@@ -0,0 +1,228 @@
+"""Record evaluate traffic and replay it offline.
+
+A :class:`Recorder` passed to a fetcher (or client) appends every response it receives
+to a gzip-compressed JSON Lines file: when it arrived, how long it took, its status,
+the headers the SDK acts on and the decoded body. Request contexts and credentials
+are never written, and by default every string in flag and config values is replaced
+by a stable placeholder of the same length, so payload sizes, shapes and change
+sequences survive while the values don't::
+
+    with Recorder("traffic.jsonl.gz") as recorder:
+        ef = EdgeFlagsSync(token="...", base_url="...", recorder=recorder)
+        ...
+
+:class:`ReplayTransport` plays a recording back through ``httpx``, answering requests
+in recorded order at the recorded pace, ``speed`` times faster, or as fast as possible::
+
+    ef = EdgeFlagsSync("replay", "http://replay", http_transport=ReplayTransport(path))
+
+The file's first line is a header; each following line is one response.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import gzip
+import hashlib
+import json
+import threading
+import time
+from collections.abc import Callable, Iterator
+from types import TracebackType
+from typing import IO, Any, TypedDict
+
+import httpx
+
+from .snapshot_file import StrPath
+
+FORMAT = "edgeflags-recording"
+FORMAT_VERSION = 1
+
+# Response headers that change what the SDK does, so a replay reproduces pacing,
+# revalidation and caching too.
+_HEADERS = (
+    "ETag",
+    "Cache-Control",
+    "Age",
+    "Date",
+    "Expires",
+    "Retry-After",
+    "X-EdgeFlags-Poll-Interval",
+)
+
+
+class RecordedResponse(TypedDict):
+    t: float
+    elapsed: float
+    method: str
+    since: int | None
+    status: int
+    headers: dict[str, str]
+    body: Any
+
+
+def scrub(value: Any) -> Any:
+    """Replace every string in ``value`` by a same-length placeholder.
+
+    Placeholders derive from a hash of the string, so equal strings stay equal and a
+    changed string still reads as a change. Keys, numbers, booleans and nesting are
+    kept.
+    """
+    if isinstance(value, str):
+        if not value:
+            return value
+        digest = hashlib.blake2b(value.encode(), digest_size=16).hexdigest()
+        return (digest * (len(value) // len(digest) + 1))[: len(value)]
+    if isinstance(value, dict):
+        return {key: scrub(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [scrub(item) for item in value]
+    return value
+
+
+class Recorder:
+    """Appends responses to a recording file; thread-safe.
+
+    ``redact`` is applied to every flag and config value before it is written: ``True``
+    uses :func:`scrub`, ``False`` keeps values as they are, and a callable replaces
+    them with its result. Close the recorder, or use it as a context manager, to flush
+    the file; clients don't close it for you.
+    """
+
+    def __init__(
+        self,
+        path: StrPath,
+        *,
+        redact: bool | Callable[[Any], Any] = True,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if redact is True:
+            self._redact: Callable[[Any], Any] | None = scrub
+        elif redact is False:
+            self._redact = None
+        else:
+            self._redact = redact
+        self._clock = clock
+        self._start: float | None = None
+        self._lock = threading.Lock()
+        self._file: IO[str] = gzip.open(path, "wt", encoding="utf-8")  # noqa: SIM115
+        self._write({"format": FORMAT, "version": FORMAT_VERSION, "redacted": bool(redact)})
+        self.count = 0
+
+    def record(
+        self, method: str, since: int | None, response: httpx.Response, elapsed: float
+    ) -> None:
+        """Append ``response`` to a ``method`` request for a delta against ``since``."""
+        body: Any = None
+        if response.status_code == 200:
+            body = json.loads(response.content)
+            if self._redact is not None:
+                for section in ("flags", "configs"):
+                    values = body.get(section)
+                    if isinstance(values, dict):
+                        body[section] = {k: self._redact(v) for k, v in values.items()}
+        headers = {name: response.headers[name] for name in _HEADERS if name in response.headers}
+        now = self._clock() - elapsed
+        with self._lock:
+            if self._start is None:
+                self._start = now
+            self._write(
+                RecordedResponse(
+                    t=round(now - self._start, 6),
+                    elapsed=round(elapsed, 6),
+                    method=method,
+                    since=since,
+                    status=response.status_code,
+                    headers=headers,
+                    body=body,
+                )
+            )
+            self.count += 1
+
+    def _write(self, entry: Any) -> None:
+        self._file.write(json.dumps(entry, separators=(",", ":"), ensure_ascii=False))
+        self._file.write("\n")
+
+    def close(self) -> None:
+        with self._lock:
+            self._file.close()
+
+    def __enter__(self) -> Recorder:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        self.close()
+
+
+def read_recording(path: StrPath) -> Iterator[RecordedResponse]:
+    """Yield the responses of a recording in order, reading the file as it goes."""
+    with gzip.open(path, "rt", encoding="utf-8") as file:
+        header = json.loads(file.readline() or "null")
+        if not isinstance(header, dict) or header.get("format") != FORMAT:
+            raise ValueError(f"{path} is not an EdgeFlags recording")
+        if header.get("version") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported recording version {header.get('version')}")
+        for line in file:
+            entry: RecordedResponse = json.loads(line)
+            yield entry
+
+
+class ReplayTransport(httpx.BaseTransport, httpx.AsyncBaseTransport):
+    """``httpx`` transport answering requests from a recording, in recorded order.
+
+    Each response is held back until its recorded arrival time, divided by ``speed``,
+    has passed since the first request of the replay; ``speed=None`` answers at once.
+    Requests themselves are not matched against the recording, so replays are
+    deterministic as long as the client polls the same way it did while recording.
+    Once the recording is used up, requests fail with :class:`httpx.ConnectError`
+    and :attr:`exhausted` is set. Works with both sync and async ``httpx`` clients.
+    """
+
+    def __init__(self, path: StrPath, *, speed: float | None = 1.0) -> None:
+        if speed is not None and speed <= 0:
+            raise ValueError("speed must be positive")
+        self._entries = read_recording(path)
+        self._speed = speed
+        self._start: float | None = None
+        self._lock = threading.Lock()
+        self.exhausted = False
+        self.served = 0
+
+    def _next(self, request: httpx.Request) -> tuple[float, httpx.Response]:
+        with self._lock:
+            entry = next(self._entries, None)
+            if entry is None:
+                self.exhausted = True
+                raise httpx.ConnectError("Recording exhausted", request=request)
+            now = time.monotonic()
+            if self._start is None:
+                self._start = now
+            self.served += 1
+        delay = 0.0
+        if self._speed is not None:
+            due = self._start + (entry["t"] + entry["elapsed"]) / self._speed
+            delay = max(0.0, due - now)
+        content = b"" if entry["body"] is None else json.dumps(entry["body"]).encode()
+        headers = dict(entry["headers"])
+        if content:
+            headers["Content-Type"] = "application/json"
+        return delay, httpx.Response(
+            entry["status"], headers=headers, content=content, request=request
+        )
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        delay, response = self._next(request)
+        if delay:
+            time.sleep(delay)
+        return response
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        delay, response = self._next(request)
+        if delay:
+            await asyncio.sleep(delay)
+        return response
@@ -0,0 +1,314 @@
+"""Local relay serving many SDK instances from one upstream connection.
+
+Run one relay per node and point the SDKs at it::
+
+    python -m edgeflags relay --url https://edgeflags.net --uds /run/edgeflags.sock
+
+    ef = EdgeFlags(token="unused", base_url="http://relay", uds="/run/edgeflags.sock")
+
+The relay keeps an evaluation per distinct context, refreshes all of them from
+upstream on one polling loop, and answers ``/api/v1/evaluate`` from memory. Responses
+carry an ``ETag``; SDK polls revalidate with ``If-None-Match`` and get ``304 Not
+Modified`` while nothing changed.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import socketserver
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, cast
+
+from .cache import Cache, Snapshot, VersionGap
+from .context import EncodedContext, decode_query
+from .errors import EdgeFlagsError
+from .fetcher import SyncFetcher
+from .logger import Logger
+from .scope import make_scope
+from .types import EvaluationContext, EvaluationResponse
+
+_DEFAULT_POLL_INTERVAL = 30.0
+_DEFAULT_CONTEXT_TTL = 600.0
+_DEFAULT_MAX_CONTEXTS = 1024
+
+
+def context_key(context: EvaluationContext) -> str:
+    """Canonical JSON of a context, equal for equal contexts regardless of key order."""
+    return EncodedContext(context).json.decode()
+
+
+class _Entry:
+    """Cached evaluation of one context, with encoded responses per scope.
+
+    ``refresh_lock`` serializes upstream fetches; ``lock`` only guards the encoded
+    responses, so requests keep being answered from the current snapshot while a
+    fetch is in flight.
+    """
+
+    __slots__ = (
+        "context",
+        "cache",
+        "fetched",
+        "last_used",
+        "refresh_lock",
+        "lock",
+        "encoded",
+        "encoded_for",
+    )
+
+    def __init__(self, context: EvaluationContext) -> None:
+        self.context = context
+        self.cache = Cache()
+        self.fetched = False
+        self.last_used = time.monotonic()
+        self.refresh_lock = threading.Lock()
+        self.lock = threading.Lock()
+        self.encoded: dict[str, tuple[str, bytes]] = {}
+        self.encoded_for: Snapshot | None = None
+
+
+class _ThreadingUnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class _ThreadingTCPHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+
+class Relay:
+    """Caching proxy for the EdgeFlags evaluate endpoint.
+
+    Serves over TCP on ``host``/``port``, or over the Unix domain socket ``uds``. A
+    context seen for the first time is fetched from upstream while its requester waits;
+    concurrent requests for the same context share that fetch. Contexts not requested
+    for ``context_ttl`` seconds are dropped, as are the least recently used ones beyond
+    ``max_contexts``. Requests are answered from the last evaluation while a refresh is
+    in flight, and upstream failures keep it in service.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        token: str,
+        *,
+        polling_interval: float = _DEFAULT_POLL_INTERVAL,
+        context_ttl: float = _DEFAULT_CONTEXT_TTL,
+        max_contexts: int = _DEFAULT_MAX_CONTEXTS,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        uds: str | None = None,
+        debug: bool = False,
+    ) -> None:
+        # One ETag per cached context, so each context's polls can be revalidated.
+        self._fetcher = SyncFetcher(base_url, token, etag_cache_size=max_contexts)
+        self._polling_interval = polling_interval
+        self._context_ttl = context_ttl
+        self._max_contexts = max_contexts
+        self._logger = Logger(debug)
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._threads: list[threading.Thread] = []
+        self.upstream_requests = 0
+        self.uds = uds
+        self._server: socketserver.BaseServer
+        if uds is not None:
+            if os.path.exists(uds):
+                os.unlink(uds)
+            self._server = _ThreadingUnixHTTPServer(uds, self._handler_class())
+            self._url = "http://relay"
+        else:
+            tcp = _ThreadingTCPHTTPServer((host, port), self._handler_class())
+            self._server = tcp
+            self._url = f"http://{tcp.server_address[0]!s}:{tcp.server_address[1]}"
+
+    @property
+    def url(self) -> str:
+        """Base URL for SDKs; with ``uds`` it must be combined with ``uds=...``."""
+        return self._url
+
+    @property
+    def contexts(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def start(self) -> Relay:
+        if not self._threads:
+            self._stopped.clear()
+            self._threads = [
+                threading.Thread(
+                    target=self._server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True
+                ),
+                threading.Thread(target=self._poll_loop, daemon=True),
+            ]
+            for thread in self._threads:
+                thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self._threads:
+            self._stopped.set()
+            self._server.shutdown()
+            for thread in self._threads:
+                thread.join()
+            self._threads = []
+        self._server.server_close()
+        self._fetcher.close()
+        if self.uds is not None and os.path.exists(self.uds):
+            os.unlink(self.uds)
+
+    def serve_forever(self) -> None:
+        """Serve until interrupted."""
+        self.start()
+        try:
+            self._stopped.wait()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.stop()
+
+    def __enter__(self) -> Relay:
+        return self.start()
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.stop()
+
+    def evaluate(
+        self, body: dict[str, Any], if_none_match: str | None = None
+    ) -> tuple[int, str | None, bytes]:
+        """Answer an evaluate request body; returns status, ETag and response body."""
+        context = cast(EvaluationContext, body.get("context") or {})
+        entry = self._entry(context)
+        if not entry.fetched:
+            with entry.refresh_lock:
+                if not entry.fetched:
+                    self._fetch(entry)
+        scope = make_scope(body.get("keys"), body.get("prefixes"))
+        scope_key = "" if scope is None else json.dumps(scope.to_body(), sort_keys=True)
+        with entry.lock:
+            snapshot = entry.cache.snapshot()
+            if entry.encoded_for is not snapshot:
+                entry.encoded = {}
+                entry.encoded_for = snapshot
+            encoded = entry.encoded.get(scope_key)
+            if encoded is None:
+                flags, configs = snapshot.flags, snapshot.configs
+                payload: dict[str, Any] = {
+                    "flags": dict(flags) if scope is None else scope.filter(flags),
+                    "configs": dict(configs) if scope is None else scope.filter(configs),
+                }
+                if snapshot.tags:
+                    tags = snapshot.tags if scope is None else scope.filter(snapshot.tags)
+                    payload["tags"] = {key: list(names) for key, names in tags.items()}
+                if snapshot.version is not None:
+                    payload["version"] = snapshot.version
+                data = json.dumps(payload, separators=(",", ":")).encode()
+                etag = f'"{hashlib.blake2b(data, digest_size=16).hexdigest()}"'
+                encoded = entry.encoded[scope_key] = (etag, data)
+        etag, data = encoded
+        if if_none_match == etag:
+            return 304, etag, b""
+        return 200, etag, data
+
+    def poll(self) -> None:
+        """Refresh every cached context from upstream and drop idle ones."""
+        cutoff = time.monotonic() - self._context_ttl
+        with self._lock:
+            for key in [k for k, e in self._entries.items() if e.last_used < cutoff]:
+                del self._entries[key]
+            entries = list(self._entries.values())
+        for entry in entries:
+            if self._stopped.is_set():
+                return
+            with entry.refresh_lock:
+                try:
+                    self._fetch(entry, since=entry.cache.version)
+                except Exception as exc:
+                    self._logger.error("Upstream refresh failed", exc)
+
+    def _entry(self, context: EvaluationContext) -> _Entry:
+        key = context_key(context)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self._entries[key] = _Entry(context)
+                while len(self._entries) > self._max_contexts:
+                    self._entries.popitem(last=False)
+            else:
+                self._entries.move_to_end(key)
+            entry.last_used = time.monotonic()
+            return entry
+
+    def _fetch(self, entry: _Entry, since: int | None = None) -> None:
+        try:
+            entry.cache.apply(self._upstream(entry.context, since))
+        except VersionGap:
+            entry.cache.apply(self._upstream(entry.context, None))
+        entry.fetched = True
+
+    def _upstream(self, context: EvaluationContext, since: int | None) -> EvaluationResponse:
+        with self._lock:
+            self.upstream_requests += 1
+        return self._fetcher.fetch_all(context, since=since)
+
+    def _poll_loop(self) -> None:
+        while not self._stopped.wait(self._polling_interval):
+            self.poll()
+
+    def _handler_class(self) -> type[BaseHTTPRequestHandler]:
+        relay = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self) -> None:
+                if self.path != "/api/v1/evaluate":
+                    self._send(404, None, b'{"error":"not found"}')
+                    return
+                length = int(self.headers.get("Content-Length") or 0)
+                self._answer(lambda: json.loads(self.rfile.read(length)) if length else {})
+
+            def do_GET(self) -> None:
+                path, _, query = self.path.partition("?")
+                if path != "/api/v1/evaluate":
+                    self._send(404, None, b'{"error":"not found"}')
+                    return
+                self._answer(lambda: decode_query(query))
+
+            def _answer(self, read_body: Callable[[], Any]) -> None:
+                try:
+                    body = read_body()
+                    status, etag, data = relay.evaluate(body, self.headers.get("If-None-Match"))
+                except (ValueError, AttributeError):
+                    self._send(400, None, b'{"error":"invalid request"}')
+                except EdgeFlagsError as exc:
+                    status = exc.status_code if exc.status_code is not None else 502
+                    self._send(status, None, json.dumps({"error": str(exc)}).encode())
+                except Exception as exc:
+                    self._send(502, None, json.dumps({"error": str(exc)}).encode())
+                else:
+                    self._send(status, etag, data)
+
+            def _send(self, status: int, etag: str | None, data: bytes) -> None:
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                if etag is not None:
+                    self.send_header("ETag", etag)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def address_string(self) -> str:
+                # Unix domain socket peers have no address.
+                return str(self.client_address[0]) if self.client_address else "uds"
+
+            def log_message(self, format: str, *args: Any) -> None:
+                pass
+
+        return Handler
@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+from collections.abc import Iterable, Mapping
+from typing import Any, TypeVar
+
+_V = TypeVar("_V")
+
+
+class Scope:
+    """Subset of flag and config keys a client evaluates.
+
+    A key is in scope when it is listed in ``keys`` or starts with one of ``prefixes``.
+    """
+
+    __slots__ = ("keys", "prefixes")
+
+    def __init__(self, keys: Iterable[str] = (), prefixes: Iterable[str] = ()) -> None:
+        self.keys = frozenset(keys)
+        self.prefixes = tuple(prefixes)
+
+    def __contains__(self, key: object) -> bool:
+        if not isinstance(key, str):
+            return False
+        return key in self.keys or key.startswith(self.prefixes)
+
+    def filter(self, values: Mapping[str, _V]) -> dict[str, _V]:
+        return {key: value for key, value in values.items() if key in self}
+
+    def to_body(self) -> dict[str, Any]:
+        body: dict[str, Any] = {}
+        if self.keys:
+            body["keys"] = sorted(self.keys)
+        if self.prefixes:
+            body["prefixes"] = list(self.prefixes)
+        return body
+
+
+def make_scope(keys: Iterable[str] | None, prefixes: Iterable[str] | None) -> Scope | None:
+    """Build a :class:`Scope`, or ``None`` when neither keys nor prefixes are declared."""
+    if keys is None and prefixes is None:
+        return None
+    return Scope(keys or (), prefixes or ())
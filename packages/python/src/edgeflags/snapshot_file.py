@@ -0,0 +1,283 @@
+"""Compact binary snapshot files.
+
+A snapshot file bakes flags and configs into a single file that loads without parsing
+every value up front. The layout is little-endian:
+
+* header: magic ``EFSN``, format version, reserved, snapshot version (``-1`` when
+  unknown), flag count, config count, data offset, CRC-32 of everything after the
+  header;
+* origin (format 2): length, then the JSON ``{"context": <digest>, "scope": {...}}``
+  of the context and scope the snapshot was fetched for, empty when unknown;
+* key index: per key (flags first, then configs, each sorted) the key length, value
+  offset relative to the data section, value length, then the UTF-8 key;
+* data section: each distinct value encoded once as compact JSON.
+
+:func:`load_snapshot` memory-maps the file and only decodes a value the first time
+its key is read.
+"""
+
+from __future__ import annotations
+
+import json
+import mmap
+import os
+import struct
+import sys
+import zlib
+from collections.abc import Callable, Iterable, Iterator, Mapping
+from typing import Any
+
+from .context import EncodedContext
+from .errors import SnapshotFormatError
+from .frozen import freeze
+from .scope import make_scope
+from .types import Bootstrap, EvaluationContext, FlagValue
+
+MAGIC = b"EFSN"
+FORMAT_VERSION = 2
+
+_HEADER = struct.Struct("<4sHHqIIQI")
+_ORIGIN = struct.Struct("<H")
+_ENTRY = struct.Struct("<HQI")
+_MISSING: Any = object()
+
+StrPath = str | os.PathLike[str]
+
+
+def _origin(
+    context: EvaluationContext | None,
+    keys: Iterable[str] | None,
+    prefixes: Iterable[str] | None,
+) -> bytes:
+    if context is None:
+        return b""
+    scope = make_scope(keys, prefixes)
+    origin = {
+        "context": EncodedContext(context).digest,
+        "scope": {} if scope is None else scope.to_body(),
+    }
+    return json.dumps(origin, separators=(",", ":"), sort_keys=True).encode()
+
+
+def encode_snapshot(
+    flags: Mapping[str, FlagValue],
+    configs: Mapping[str, Any],
+    *,
+    version: int | None = None,
+    context: EvaluationContext | None = None,
+    keys: Iterable[str] | None = None,
+    prefixes: Iterable[str] | None = None,
+) -> bytes:
+    """Encode flags and configs in the binary snapshot format.
+
+    ``context`` and ``keys``/``prefixes`` record what the snapshot was fetched for; a
+    client only continues from its ``version`` when they match its own.
+    """
+    origin = _origin(context, keys, prefixes)
+    data = bytearray()
+    offsets: dict[bytes, int] = {}
+    index = bytearray()
+    for values in (flags, configs):
+        for key in sorted(values):
+            encoded = json.dumps(values[key], separators=(",", ":"), ensure_ascii=False).encode()
+            offset = offsets.get(encoded)
+            if offset is None:
+                offset = offsets[encoded] = len(data)
+                data += encoded
+            name = key.encode()
+            index += _ENTRY.pack(len(name), offset, len(encoded))
+            index += name
+
+    body = _ORIGIN.pack(len(origin)) + origin + bytes(index) + bytes(data)
+    header = _HEADER.pack(
+        MAGIC,
+        FORMAT_VERSION,
+        0,
+        -1 if version is None else version,
+        len(flags),
+        len(configs),
+        _HEADER.size + len(body) - len(data),
+        zlib.crc32(body),
+    )
+    return header + body
+
+
+def write_snapshot(
+    path: StrPath,
+    flags: Mapping[str, FlagValue],
+    configs: Mapping[str, Any],
+    *,
+    version: int | None = None,
+    context: EvaluationContext | None = None,
+    keys: Iterable[str] | None = None,
+    prefixes: Iterable[str] | None = None,
+) -> int:
+    """Write a snapshot file atomically and return its size in bytes.
+
+    See :func:`encode_snapshot` for ``context`` and ``keys``/``prefixes``.
+    """
+    encoded = encode_snapshot(
+        flags, configs, version=version, context=context, keys=keys, prefixes=prefixes
+    )
+    tmp = f"{os.fspath(path)}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(encoded)
+    os.replace(tmp, path)
+    return len(encoded)
+
+
+def is_snapshot_file(path: StrPath) -> bool:
+    """Whether ``path`` starts with the binary snapshot magic."""
+    with open(path, "rb") as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+class LazyValues(Mapping[str, Any]):
+    """Read-only mapping decoding each value from the snapshot buffer on first access.
+
+    Decoded values are frozen like every other cached value and memoized, so repeated
+    reads return the same object.
+    """
+
+    __slots__ = ("_buffer", "_index", "_decoded")
+
+    def __init__(self, buffer: mmap.mmap | bytes, index: dict[str, tuple[int, int]]) -> None:
+        self._buffer = buffer
+        self._index = index
+        self._decoded: dict[str, Any] = {}
+
+    def __getitem__(self, key: str) -> Any:
+        value = self._decoded.get(key, _MISSING)
+        if value is _MISSING:
+            start, length = self._index[key]
+            decoded = freeze(json.loads(self._buffer[start : start + length]))
+            # setdefault keeps one object per key if two threads race to decode it.
+            value = self._decoded.setdefault(key, decoded)
+        return value
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._index
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._index)
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    @property
+    def decoded(self) -> int:
+        """Number of values decoded so far."""
+        return len(self._decoded)
+
+    def raw(self, key: str) -> bytes:
+        """Return the encoded JSON of ``key`` without decoding it."""
+        start, length = self._index[key]
+        return bytes(self._buffer[start : start + length])
+
+    def subset(self, predicate: Callable[[str], bool]) -> LazyValues:
+        """Return the keys matching ``predicate``, sharing this buffer."""
+        subset = LazyValues(
+            self._buffer, {key: span for key, span in self._index.items() if predicate(key)}
+        )
+        subset._decoded = {k: v for k, v in self._decoded.items() if k in subset._index}
+        return subset
+
+
+class SnapshotFile:
+    """Snapshot loaded from a binary snapshot file.
+
+    Pass it (or its path) as ``bootstrap`` to a client. The file stays mapped as long
+    as the snapshot or any of its values' mappings are referenced. ``context`` is the
+    digest of the context the snapshot was fetched for and ``scope`` its keys and
+    prefixes, both ``None`` when the file doesn't record them.
+    """
+
+    __slots__ = (
+        "flags",
+        "configs",
+        "version",
+        "format_version",
+        "size",
+        "context",
+        "scope",
+        "_buffer",
+    )
+
+    def __init__(self, buffer: mmap.mmap | bytes, *, verify: bool = False) -> None:
+        if len(buffer) < _HEADER.size:
+            raise SnapshotFormatError("Snapshot file is truncated")
+        magic, format_version, _, version, flag_count, config_count, data_offset, crc = (
+            _HEADER.unpack_from(buffer)
+        )
+        if magic != MAGIC:
+            raise SnapshotFormatError("Not an EdgeFlags snapshot file")
+        if format_version > FORMAT_VERSION:
+            raise SnapshotFormatError(f"Unsupported snapshot format version {format_version}")
+        if verify and zlib.crc32(buffer[_HEADER.size :]) != crc:
+            raise SnapshotFormatError("Snapshot file checksum mismatch")
+
+        self._buffer = buffer
+        self.version: int | None = None if version < 0 else version
+        self.format_version: int = format_version
+        self.size = len(buffer)
+        self.context: str | None = None
+        self.scope: dict[str, Any] | None = None
+        position = _HEADER.size
+        indexes: list[dict[str, tuple[int, int]]] = []
+        try:
+            if format_version >= 2:
+                (origin_length,) = _ORIGIN.unpack_from(buffer, position)
+                position += _ORIGIN.size
+                if origin_length:
+                    origin = json.loads(buffer[position : position + origin_length])
+                    self.context, self.scope = origin["context"], origin["scope"]
+                position += origin_length
+            for count in (flag_count, config_count):
+                index: dict[str, tuple[int, int]] = {}
+                for _ in range(count):
+                    key_length, offset, length = _ENTRY.unpack_from(buffer, position)
+                    position += _ENTRY.size
+                    key = sys.intern(buffer[position : position + key_length].decode())
+                    position += key_length
+                    index[key] = (data_offset + offset, length)
+                indexes.append(index)
+        except (struct.error, ValueError, KeyError, TypeError) as exc:
+            raise SnapshotFormatError(f"Corrupt snapshot index: {exc}") from exc
+        if position != data_offset:
+            raise SnapshotFormatError("Corrupt snapshot index")
+        self.flags = LazyValues(buffer, indexes[0])
+        self.configs = LazyValues(buffer, indexes[1])
+
+    def close(self) -> None:
+        """Unmap the file. Values not decoded yet can no longer be read."""
+        if isinstance(self._buffer, mmap.mmap):
+            self._buffer.close()
+
+    def __enter__(self) -> SnapshotFile:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+
+def load_snapshot(path: StrPath, *, verify: bool = False) -> SnapshotFile:
+    """Memory-map a snapshot file; ``verify`` checks its CRC-32 first."""
+    with open(path, "rb") as f:
+        try:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError as exc:  # empty file
+            raise SnapshotFormatError("Snapshot file is truncated") from exc
+    try:
+        return SnapshotFile(buffer, verify=verify)
+    except BaseException:
+        buffer.close()
+        raise
+
+
+def read_bootstrap(path: StrPath) -> SnapshotFile | Bootstrap:
+    """Load a binary snapshot file, or a JSON file holding ``flags``/``configs``."""
+    if is_snapshot_file(path):
+        return load_snapshot(path)
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    return Bootstrap(flags=data.get("flags", {}), configs=data.get("configs", {}))
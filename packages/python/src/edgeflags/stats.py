@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import threading
+from collections.abc import Iterable, Mapping
+
+from .types import KeyReadStats, ReadReport
+
+
+class _Shard:
+    __slots__ = ("thread", "flag_reads", "flag_defaults", "config_reads", "config_defaults")
+
+    def __init__(self, thread: threading.Thread | None) -> None:
+        self.thread = thread
+        self.flag_reads: dict[str, int] = {}
+        self.flag_defaults: dict[str, int] = {}
+        self.config_reads: dict[str, int] = {}
+        self.config_defaults: dict[str, int] = {}
+
+
+def _add(into: dict[str, int], counts: Mapping[str, int]) -> None:
+    for key, count in counts.items():
+        into[key] = into.get(key, 0) + count
+
+
+def _report(reads: Mapping[str, int], defaults: Mapping[str, int]) -> dict[str, KeyReadStats]:
+    return {
+        key: KeyReadStats(reads=count, defaults=defaults.get(key, 0))
+        for key, count in reads.items()
+    }
+
+
+class ReadStats:
+    """Per-key read counters sharded by thread.
+
+    Each thread only ever writes its own shard, so recording a read takes no lock.
+    Shards are summed when a report is built, and shards of exited threads are
+    folded into a shared total by :meth:`compact`.
+    """
+
+    def __init__(self) -> None:
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._shards: list[_Shard] = []
+        self._merged = _Shard(None)
+
+    def record_flag(self, key: str, hit: bool) -> None:
+        shard = self._shard()
+        reads = shard.flag_reads
+        reads[key] = reads.get(key, 0) + 1
+        if not hit:
+            defaults = shard.flag_defaults
+            defaults[key] = defaults.get(key, 0) + 1
+
+    def record_config(self, key: str, hit: bool) -> None:
+        shard = self._shard()
+        reads = shard.config_reads
+        reads[key] = reads.get(key, 0) + 1
+        if not hit:
+            defaults = shard.config_defaults
+            defaults[key] = defaults.get(key, 0) + 1
+
+    def compact(self) -> None:
+        """Fold the shards of exited threads into the shared totals."""
+        with self._lock:
+            live: list[_Shard] = []
+            for shard in self._shards:
+                if shard.thread is not None and shard.thread.is_alive():
+                    live.append(shard)
+                else:
+                    self._fold(self._merged, shard)
+            self._shards = live
+
+    def report(self, flag_keys: Iterable[str], config_keys: Iterable[str]) -> ReadReport:
+        """Summarize reads; keys from ``flag_keys``/``config_keys`` never read are unused."""
+        self.compact()
+        total = _Shard(None)
+        with self._lock:
+            self._fold(total, self._merged)
+            for shard in self._shards:
+                self._fold(total, shard)
+        return ReadReport(
+            flags=_report(total.flag_reads, total.flag_defaults),
+            configs=_report(total.config_reads, total.config_defaults),
+            unused_flags=sorted(key for key in flag_keys if key not in total.flag_reads),
+            unused_configs=sorted(key for key in config_keys if key not in total.config_reads),
+        )
+
+    def reset(self) -> None:
+        with self._lock:
+            self._shards = []
+            self._merged = _Shard(None)
+            self._local = threading.local()
+
+    def _shard(self) -> _Shard:
+        try:
+            return self._local.shard  # type: ignore[no-any-return]
+        except AttributeError:
+            shard = _Shard(threading.current_thread())
+            with self._lock:
+                self._shards.append(shard)
+            self._local.shard = shard
+            return shard
+
+    @staticmethod
+    def _fold(into: _Shard, shard: _Shard) -> None:
+        # dict() takes a consistent copy while the owning thread keeps counting.
+        _add(into.flag_reads, dict(shard.flag_reads))
+        _add(into.flag_defaults, dict(shard.flag_defaults))
+        _add(into.config_reads, dict(shard.config_reads))
+        _add(into.config_defaults, dict(shard.config_defaults))
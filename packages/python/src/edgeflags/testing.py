@@ -0,0 +1,370 @@
+"""In-process stand-in for the EdgeFlags service.
+
+:class:`StandInServer` serves ``/api/v1/evaluate`` over a real local socket, so tests,
+benchmarks and load experiments can exercise the SDK end to end without an external
+service::
+
+    with StandInServer(flags=generate_flags(1000), configs=generate_configs(100)) as server:
+        ef = EdgeFlagsSync("ff_test", server.url)
+        ef.init()
+"""
+
+from __future__ import annotations
+
+import json
+import random
+import sys
+import threading
+import time
+from collections.abc import Iterable, Mapping
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, TypedDict
+
+from .context import decode_query
+from .types import FlagValue
+
+_HISTORY = 64
+
+
+class RecordedRequest(TypedDict):
+    method: str
+    path: str
+    body: dict[str, Any]
+    status: int
+    bytes_sent: int
+    started: float
+    duration: float
+
+
+class StandInChange(TypedDict, total=False):
+    flags: dict[str, FlagValue]
+    configs: dict[str, Any]
+    deleted_flags: list[str]
+    deleted_configs: list[str]
+
+
+def generate_flags(count: int, *, seed: int = 0) -> dict[str, FlagValue]:
+    """Generate ``count`` flags with a realistic mix of value types."""
+    rng = random.Random(seed)
+    flags: dict[str, FlagValue] = {}
+    for i in range(count):
+        kind = i % 4
+        if kind == 0 or kind == 1:
+            flags[f"flag_{i}"] = rng.random() < 0.5
+        elif kind == 2:
+            flags[f"flag_{i}"] = rng.choice(["control", "variant_a", "variant_b"])
+        else:
+            flags[f"flag_{i}"] = rng.randint(0, 1000)
+    return flags
+
+
+def generate_configs(count: int, size: int = 256, *, seed: int = 0) -> dict[str, Any]:
+    """Generate ``count`` nested configs of roughly ``size`` JSON bytes each."""
+    rng = random.Random(seed)
+    configs: dict[str, Any] = {}
+    for i in range(count):
+        items = max(1, size // 48)
+        configs[f"config_{i}"] = {
+            "enabled": rng.random() < 0.5,
+            "limits": {"max": rng.randint(1, 10_000), "burst": rng.randint(1, 100)},
+            "items": [{"id": j, "weight": round(rng.random(), 4)} for j in range(items)],
+        }
+    return configs
+
+
+class _HTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request: Any, client_address: Any) -> None:
+        # Clients dropping keep-alive connections (e.g. cancelled fetches) are expected.
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+class StandInServer:
+    """Local HTTP server implementing the EdgeFlags evaluate endpoint.
+
+    It keeps a short version history to answer ``since`` requests with deltas,
+    honors ``keys``/``prefixes`` scopes, and can inject latency, slow bodies and
+    error responses. It answers both POST and GET evaluate requests, optionally with a
+    ``Cache-Control`` header. With ``dependencies`` it reports which context attributes
+    each key depends on. Every request is recorded in :attr:`requests`.
+    """
+
+    def __init__(
+        self,
+        flags: Mapping[str, FlagValue] | None = None,
+        configs: Mapping[str, Any] | None = None,
+        *,
+        latency: float = 0.0,
+        body_delay: float = 0.0,
+        error_rate: float = 0.0,
+        error_status: int = 503,
+        deltas: bool = True,
+        cache_control: str | None = None,
+        dependencies: Mapping[str, Iterable[str]] | None = None,
+        seed: int = 0,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ) -> None:
+        self.latency = latency
+        self.body_delay = body_delay
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.deltas = deltas
+        self.cache_control = cache_control
+        self.dependencies = (
+            None if dependencies is None else {k: list(v) for k, v in dependencies.items()}
+        )
+        self.requests: list[RecordedRequest] = []
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._history: list[tuple[int, dict[str, FlagValue], dict[str, Any]]] = [
+            (0, dict(flags or {}), dict(configs or {}))
+        ]
+        self._failures: list[int] = []
+        self._gaps = 0
+        self._script: list[StandInChange] = []
+        self._script_every = 1
+        self._evaluations = 0
+        self._httpd = _HTTPServer((host, port), self._handler_class())
+        self._thread: threading.Thread | None = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host!s}:{port}"
+
+    @property
+    def version(self) -> int:
+        with self._lock:
+            return self._history[-1][0]
+
+    def start(self) -> StandInServer:
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._httpd.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True
+            )
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self._thread is not None:
+            self._httpd.shutdown()
+            self._thread.join()
+            self._thread = None
+        self._httpd.server_close()
+
+    def __enter__(self) -> StandInServer:
+        return self.start()
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.stop()
+
+    def publish(
+        self,
+        flags: Mapping[str, FlagValue] | None = None,
+        configs: Mapping[str, Any] | None = None,
+        *,
+        deleted_flags: Iterable[str] = (),
+        deleted_configs: Iterable[str] = (),
+    ) -> int:
+        """Apply a change on top of the current state and return the new version."""
+        with self._lock:
+            return self._publish(
+                StandInChange(
+                    flags=dict(flags or {}),
+                    configs=dict(configs or {}),
+                    deleted_flags=list(deleted_flags),
+                    deleted_configs=list(deleted_configs),
+                )
+            )
+
+    def replace(self, flags: Mapping[str, FlagValue], configs: Mapping[str, Any]) -> int:
+        """Replace the whole state and return the new version."""
+        with self._lock:
+            version = self._history[-1][0] + 1
+            self._history.append((version, dict(flags), dict(configs)))
+            del self._history[:-_HISTORY]
+            return version
+
+    def forget_history(self) -> None:
+        """Drop older versions so the next ``since`` request cannot be served a delta."""
+        with self._lock:
+            del self._history[:-1]
+
+    def fail_next(self, count: int = 1, status: int = 500) -> None:
+        """Answer the next ``count`` evaluate requests with ``status``."""
+        with self._lock:
+            self._failures.extend([status] * count)
+
+    def gap_next(self, count: int = 1) -> None:
+        """Answer the next ``count`` delta requests against a base the client never saw."""
+        with self._lock:
+            self._gaps += count
+
+    def script(self, changes: Iterable[StandInChange], *, every: int = 1) -> None:
+        """Publish the next change from ``changes`` after every ``every`` evaluations."""
+        with self._lock:
+            self._script = list(changes)
+            self._script_every = every
+
+    def reset_requests(self) -> None:
+        with self._lock:
+            self.requests.clear()
+
+    def _publish(self, change: StandInChange) -> int:
+        version, flags, configs = self._history[-1]
+        flags = {**flags, **change.get("flags", {})}
+        configs = {**configs, **change.get("configs", {})}
+        for key in change.get("deleted_flags", []):
+            flags.pop(key, None)
+        for key in change.get("deleted_configs", []):
+            configs.pop(key, None)
+        self._history.append((version + 1, flags, configs))
+        del self._history[:-_HISTORY]
+        return version + 1
+
+    def _evaluate(self, body: dict[str, Any]) -> tuple[int, dict[str, Any]]:
+        with self._lock:
+            self._evaluations += 1
+            if self._failures:
+                return self._failures.pop(0), {"error": "injected failure"}
+            if self.error_rate and self._rng.random() < self.error_rate:
+                return self.error_status, {"error": "injected failure"}
+
+            version, flags, configs = self._history[-1]
+            payload = self._payload(body, version, flags, configs)
+
+            if self._script and self._evaluations % self._script_every == 0:
+                self._publish(self._script.pop(0))
+            return 200, payload
+
+    def _payload(
+        self,
+        body: dict[str, Any],
+        version: int,
+        flags: dict[str, FlagValue],
+        configs: dict[str, Any],
+    ) -> dict[str, Any]:
+        keys = set(body.get("keys", ()))
+        prefixes = tuple(body.get("prefixes", ()))
+
+        def in_scope(key: str) -> bool:
+            return (not keys and not prefixes) or key in keys or key.startswith(prefixes)
+
+        since = body.get("since")
+        base = next((entry for entry in self._history if entry[0] == since), None)
+        if not self.deltas or base is None:
+            return self._with_dependencies(
+                {
+                    "version": version,
+                    "flags": {k: v for k, v in flags.items() if in_scope(k)},
+                    "configs": {k: v for k, v in configs.items() if in_scope(k)},
+                }
+            )
+
+        if self._gaps:
+            self._gaps -= 1
+            return {
+                "version": version,
+                "base_version": base[0] - 1,
+                "flags": {},
+                "configs": {},
+                "deleted_flags": [],
+                "deleted_configs": [],
+            }
+
+        _, old_flags, old_configs = base
+        return self._with_dependencies(
+            {
+                "version": version,
+                "base_version": since,
+                "flags": {
+                    k: v for k, v in flags.items() if in_scope(k) and old_flags.get(k, None) != v
+                },
+                "configs": {
+                    k: v
+                    for k, v in configs.items()
+                    if in_scope(k) and old_configs.get(k, None) != v
+                },
+                "deleted_flags": [k for k in old_flags if k not in flags and in_scope(k)],
+                "deleted_configs": [k for k in old_configs if k not in configs and in_scope(k)],
+            }
+        )
+
+    def _with_dependencies(self, payload: dict[str, Any]) -> dict[str, Any]:
+        # Report dependencies for every key the payload carries.
+        if self.dependencies is not None:
+            payload["dependencies"] = {
+                key: self.dependencies.get(key, [])
+                for key in (*payload["flags"], *payload["configs"])
+            }
+        return payload
+
+    def _record(self, request: RecordedRequest) -> None:
+        with self._lock:
+            self.requests.append(request)
+
+    def _handler_class(self) -> type[BaseHTTPRequestHandler]:
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self) -> None:
+                started = time.monotonic()
+                length = int(self.headers.get("Content-Length") or 0)
+                raw = self.rfile.read(length) if length else b""
+                self._handle(started, self.path, json.loads(raw) if raw else {})
+
+            def do_GET(self) -> None:
+                started = time.monotonic()
+                path, _, query = self.path.partition("?")
+                self._handle(started, path, decode_query(query))
+
+            def _handle(self, started: float, path: str, body: dict[str, Any]) -> None:
+                if path != "/api/v1/evaluate":
+                    status, payload = 404, {"error": "not found"}
+                else:
+                    if server.latency:
+                        time.sleep(server.latency)
+                    status, payload = server._evaluate(body)
+
+                data = json.dumps(payload).encode()
+                # Record before responding, so a client that got the response always
+                # finds its request in ``server.requests``.
+                server._record(
+                    RecordedRequest(
+                        method=self.command,
+                        path=self.path,
+                        body=body,
+                        status=status,
+                        bytes_sent=len(data),
+                        started=started,
+                        duration=time.monotonic() - started,
+                    )
+                )
+                self._send(status, data)
+
+            def _send(self, status: int, data: bytes) -> None:
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                if server.cache_control is not None and status == 200:
+                    self.send_header("Cache-Control", server.cache_control)
+                self.end_headers()
+                if server.body_delay:
+                    # Trickle the body out in chunks to simulate a slow network.
+                    chunk = max(1, len(data) // 10)
+                    for offset in range(0, len(data), chunk):
+                        self.wfile.write(data[offset : offset + chunk])
+                        self.wfile.flush()
+                        time.sleep(server.body_delay / 10)
+                else:
+                    self.wfile.write(data)
+
+            def log_message(self, format: str, *args: Any) -> None:
+                pass
+
+        return Handler
@@ -0,0 +1,21 @@
+from __future__ import annotations
+
+import dataclasses
+from collections.abc import Callable
+from typing import Any, TypeVar
+
+_T = TypeVar("_T")
+
+
+def decoder_for(type_: type[_T]) -> Callable[[Any], _T]:
+    """Pick a decoder turning a raw config value into ``type_``.
+
+    Pydantic models use ``model_validate`` (or ``parse_obj`` on v1), dataclasses are
+    built from the value's keys, and anything else is called with the value.
+    """
+    validate = getattr(type_, "model_validate", None) or getattr(type_, "parse_obj", None)
+    if validate is not None:
+        return validate  # type: ignore[no-any-return]
+    if dataclasses.is_dataclass(type_):
+        return lambda value: type_(**value)
+    return type_
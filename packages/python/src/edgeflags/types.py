@@ -15,28 +15,123 @@ class EvaluationContext(TypedDict, total=False):
     custom: dict[str, Any]
 
 
-class EvaluationResponse(TypedDict):
+class _EvaluationPayload(TypedDict):
     flags: dict[str, FlagValue]
     configs: dict[str, Any]
 
 
+class EvaluationResponse(_EvaluationPayload, total=False):
+    """Evaluation payload, either a full snapshot or a delta.
+
+    A response carrying ``base_version`` is a delta against that snapshot version:
+    ``flags``/``configs`` hold upserts and ``deleted_*`` list removed keys.
+    ``dependencies`` maps keys to the context attributes their evaluation reads and
+    ``tags`` config keys to their tags.
+    """
+
+    version: int
+    base_version: int
+    deleted_flags: list[str]
+    deleted_configs: list[str]
+    dependencies: dict[str, list[str]]
+    tags: dict[str, list[str]]
+
+
 class FlagChange(TypedDict):
     key: str
     previous: FlagValue | None
-    current: FlagValue
+    current: FlagValue | None
+
 
+class PathChange(TypedDict):
+    """Change of one value inside a config, addressed by a JSON pointer.
+
+    The pointer's first token is the config key, e.g. ``/checkout/limits/max``.
+    """
+
+    path: str
+    previous: Any
+    current: Any
 
-class ConfigChange(TypedDict):
+
+class _ConfigChangeBase(TypedDict):
     key: str
     previous: Any
     current: Any
 
 
-class ChangeEvent(TypedDict):
+class ConfigChange(_ConfigChangeBase, total=False):
+    """Change of one config; ``paths`` lists the changed leaves in path-change mode."""
+
+    paths: list[PathChange]
+
+
+class _ChangeLists(TypedDict):
     flags: list[FlagChange]
     configs: list[ConfigChange]
 
 
+class ChangeEvent(_ChangeLists, total=False):
+    """Flag and config changes from one update.
+
+    ``previous`` is ``None`` for added keys and ``current`` is ``None`` for deleted ones.
+    ``sequence`` numbers events in the client's change feed.
+    """
+
+    sequence: int
+
+
+class KeyReadStats(TypedDict):
+    reads: int
+    defaults: int
+
+
+class ReadReport(TypedDict):
+    """Read counts per key; ``defaults`` counts reads of keys missing from the cache."""
+
+    flags: dict[str, KeyReadStats]
+    configs: dict[str, KeyReadStats]
+    unused_flags: list[str]
+    unused_configs: list[str]
+
+
+class SourceTiming(TypedDict):
+    source: str
+    ok: bool
+    elapsed: float
+
+
+class InitReport(TypedDict):
+    """How ``init()`` became ready.
+
+    ``source`` is ``"network"``, ``"bootstrap"`` or ``"environment"``; ``sources``
+    lists every source in the order it answered, with seconds since ``init()`` started.
+    """
+
+    source: str | None
+    ready_after: float | None
+    sources: list[SourceTiming]
+
+
+class EndpointStats(TypedDict):
+    """Health of one base URL; ``latency`` is an EWMA in seconds, ``None`` until measured."""
+
+    url: str
+    latency: float | None
+    requests: int
+    failures: int
+    ejected: bool
+    ejections: int
+
+
+class FailoverStats(TypedDict):
+    """Endpoint routing state; ``failovers`` counts requests served by a fallback."""
+
+    active: str
+    failovers: int
+    endpoints: list[EndpointStats]
+
+
 class Bootstrap(TypedDict, total=False):
     flags: dict[str, FlagValue]
     configs: dict[str, Any]
@@ -0,0 +1,272 @@
+"""Receiver for invalidation pushes from the flag service.
+
+Mount it next to your app and stretch ``polling_interval`` to a long safety net::
+
+    ef = EdgeFlags(token="...", base_url="...", polling_interval=900)
+    app = Starlette(routes=[Mount("/edgeflags/webhook", EdgeFlagsASGIWebhook(ef, secret))])
+
+The service POSTs a JSON body such as ``{"keys": ["checkout"], "version": 42}`` signed
+with HMAC-SHA256 in the ``X-EdgeFlags-Signature`` header. Each accepted push schedules
+a refresh of the listed keys (or of everything when no keys are listed) and is answered
+``202`` right away. Pushes arriving while a refresh runs are merged into a single
+follow-up refresh.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import hmac
+import json
+import threading
+import time
+from collections.abc import Iterable, MutableMapping
+from typing import Any
+
+from .client import EdgeFlags, EdgeFlagsSync
+from .middleware import _Receive, _Scope, _Send, _StartResponse
+
+SIGNATURE_HEADER = "X-EdgeFlags-Signature"
+_DEFAULT_TOLERANCE = 300.0
+_MAX_BODY = 64 * 1024
+
+_Client = EdgeFlags | EdgeFlagsSync
+_Response = tuple[int, bytes]
+
+
+def sign_payload(secret: str, body: bytes, timestamp: int | None = None) -> str:
+    """Return the signature header value for ``body``, as the flag service sends it."""
+    t = int(time.time()) if timestamp is None else timestamp
+    digest = hmac.new(secret.encode(), f"{t}.".encode() + body, hashlib.sha256).hexdigest()
+    return f"t={t},v1={digest}"
+
+
+def verify_signature(
+    secrets: str | Iterable[str],
+    body: bytes,
+    header: str | None,
+    *,
+    tolerance: float = _DEFAULT_TOLERANCE,
+    now: float | None = None,
+) -> bool:
+    """Check a signature header against one or more secrets.
+
+    The header is ``t=<unix time>,v1=<hex digest>[,v1=...]``; pushes signed more than
+    ``tolerance`` seconds away from ``now`` are rejected to limit replays. Passing
+    several secrets lets a secret be rotated without dropping pushes.
+    """
+    if not header:
+        return False
+    timestamp: int | None = None
+    digests: list[str] = []
+    for part in header.split(","):
+        name, _, value = part.strip().partition("=")
+        if name == "t" and value.isdigit():
+            timestamp = int(value)
+        elif name == "v1":
+            digests.append(value)
+    if timestamp is None or not digests:
+        return False
+    if abs((time.time() if now is None else now) - timestamp) > tolerance:
+        return False
+    for secret in [secrets] if isinstance(secrets, str) else secrets:
+        expected = sign_payload(secret, body, timestamp).partition(",v1=")[2]
+        if any(hmac.compare_digest(expected, digest) for digest in digests):
+            return True
+    return False
+
+
+def _parse(body: bytes) -> tuple[frozenset[str] | None, int | None]:
+    data = json.loads(body)
+    if not isinstance(data, dict):
+        raise ValueError("push body must be an object")
+    keys = data.get("keys")
+    version = data.get("version")
+    if keys is not None and not (
+        isinstance(keys, list) and all(isinstance(key, str) for key in keys)
+    ):
+        raise ValueError("keys must be a list of strings")
+    if version is not None and (not isinstance(version, int) or isinstance(version, bool)):
+        raise ValueError("version must be an integer")
+    # An empty key list says nothing about what changed: refresh everything.
+    return (frozenset(keys) if keys else None), version
+
+
+class _Target:
+    """Coalesces pushes for one client into at most one running refresh."""
+
+    __slots__ = ("client", "lock", "full", "keys", "running", "task")
+
+    def __init__(self, client: _Client) -> None:
+        self.client = client
+        self.lock = threading.Lock()
+        self.full = False
+        self.keys: set[str] = set()
+        self.running = False
+        self.task: asyncio.Task[None] | None = None
+
+    def push(self, keys: frozenset[str] | None, version: int | None) -> None:
+        known = self.client.version
+        if version is not None and known is not None and known >= version:
+            return
+        with self.lock:
+            if keys is None:
+                self.full = True
+            else:
+                self.keys |= keys
+            if self.running:
+                return
+            self.running = True
+        if isinstance(self.client, EdgeFlags):
+            self.task = asyncio.get_running_loop().create_task(self._drain_async(self.client))
+        else:
+            # On the client's runtime, so a gevent or eventlet worker's hub keeps running.
+            client = self.client
+            client.runtime.spawn(lambda: self._drain(client), "edgeflags-webhook")
+
+    def _take(self) -> tuple[bool, set[str]] | None:
+        with self.lock:
+            if not self.full and not self.keys:
+                self.running = False
+                return None
+            batch = self.full, self.keys
+            self.full, self.keys = False, set()
+            return batch
+
+    def _drain(self, client: EdgeFlagsSync) -> None:
+        while (batch := self._take()) is not None:
+            full, keys = batch
+            try:
+                client.refresh(None if full else keys)
+            except Exception as exc:
+                client.report_error(exc)
+
+    async def _drain_async(self, client: EdgeFlags) -> None:
+        while (batch := self._take()) is not None:
+            full, keys = batch
+            try:
+                await client.refresh(None if full else keys)
+            except Exception as exc:
+                client.report_error(exc)
+
+
+class _Receiver:
+    def __init__(
+        self,
+        clients: _Client | Iterable[_Client],
+        secret: str | Iterable[str],
+        tolerance: float,
+    ) -> None:
+        if isinstance(clients, EdgeFlags | EdgeFlagsSync):
+            clients = [clients]
+        self._targets = [_Target(client) for client in clients]
+        self._secrets = [secret] if isinstance(secret, str) else list(secret)
+        self._tolerance = tolerance
+
+    def handle(self, method: str, signature: str | None, body: bytes) -> _Response:
+        if method != "POST":
+            return 405, b'{"error":"method not allowed"}'
+        if not verify_signature(self._secrets, body, signature, tolerance=self._tolerance):
+            return 401, b'{"error":"invalid signature"}'
+        try:
+            keys, version = _parse(body)
+        except ValueError:
+            return 400, b'{"error":"invalid push"}'
+        for target in self._targets:
+            target.push(keys, version)
+        return 202, b'{"accepted":true}'
+
+
+class EdgeFlagsASGIWebhook:
+    """ASGI app receiving invalidation pushes for async or sync clients."""
+
+    def __init__(
+        self,
+        clients: _Client | Iterable[_Client],
+        secret: str | Iterable[str],
+        *,
+        tolerance: float = _DEFAULT_TOLERANCE,
+    ) -> None:
+        self._receiver = _Receiver(clients, secret, tolerance)
+
+    async def __call__(self, scope: _Scope, receive: _Receive, send: _Send) -> None:
+        if scope["type"] == "lifespan":
+            await _lifespan(receive, send)
+            return
+        if scope["type"] != "http":
+            return
+        chunks: list[bytes] = []
+        size = 0
+        while True:
+            message = await receive()
+            chunk = message.get("body", b"")
+            size += len(chunk)
+            if size > _MAX_BODY:
+                await _send_asgi(send, 413, b'{"error":"push too large"}')
+                return
+            chunks.append(chunk)
+            if not message.get("more_body"):
+                break
+        signature = None
+        for name, value in scope.get("headers", ()):
+            if name.decode("latin-1").lower() == SIGNATURE_HEADER.lower():
+                signature = value.decode("latin-1")
+        status, data = self._receiver.handle(scope["method"], signature, b"".join(chunks))
+        await _send_asgi(send, status, data)
+
+
+class EdgeFlagsWSGIWebhook:
+    """WSGI app receiving invalidation pushes for sync clients."""
+
+    def __init__(
+        self,
+        clients: EdgeFlagsSync | Iterable[EdgeFlagsSync],
+        secret: str | Iterable[str],
+        *,
+        tolerance: float = _DEFAULT_TOLERANCE,
+    ) -> None:
+        self._receiver = _Receiver(clients, secret, tolerance)
+
+    def __call__(self, environ: dict[str, Any], start_response: _StartResponse) -> Iterable[bytes]:
+        try:
+            length = int(environ.get("CONTENT_LENGTH") or 0)
+        except ValueError:
+            length = 0
+        if length > _MAX_BODY:
+            status, data = 413, b'{"error":"push too large"}'
+        else:
+            body = environ["wsgi.input"].read(length) if length else b""
+            header = "HTTP_" + SIGNATURE_HEADER.upper().replace("-", "_")
+            status, data = self._receiver.handle(
+                environ.get("REQUEST_METHOD", "GET"), environ.get(header), body
+            )
+        start_response(
+            f"{status} {_REASONS[status]}",
+            [("Content-Type", "application/json"), ("Content-Length", str(len(data)))],
+        )
+        return [data]
+
+
+_REASONS = {
+    202: "Accepted",
+    400: "Bad Request",
+    401: "Unauthorized",
+    405: "Method Not Allowed",
+    413: "Content Too Large",
+}
+
+
+async def _send_asgi(send: _Send, status: int, data: bytes) -> None:
+    headers = [(b"content-type", b"application/json"), (b"content-length", b"%d" % len(data))]
+    await send({"type": "http.response.start", "status": status, "headers": headers})
+    await send({"type": "http.response.body", "body": data})
+
+
+async def _lifespan(receive: _Receive, send: _Send) -> None:
+    while True:
+        message: MutableMapping[str, Any] = await receive()
+        if message["type"] == "lifespan.startup":
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            await send({"type": "lifespan.shutdown.complete"})
+            return
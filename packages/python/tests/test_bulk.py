@@ -0,0 +1,152 @@
+import json
+from collections.abc import AsyncIterator
+from pathlib import Path
+
+import pytest
+
+from edgeflags.bulk import BulkEvaluator, BulkResult, read_contexts
+from edgeflags.testing import StandInServer
+from edgeflags.types import EvaluationContext
+
+
+async def _collect(results: AsyncIterator[BulkResult]) -> list[BulkResult]:
+    return [result async for result in results]
+
+
+class TestBulkEvaluator:
+    async def test_yields_results_in_input_order(self) -> None:
+        contexts: list[EvaluationContext] = [{"user_id": f"u{i}"} for i in range(50)]
+        with StandInServer(flags={"a": True}, configs={"c": 1}) as server:
+            async with BulkEvaluator(server.url, "tok", concurrency=4) as bulk:
+                results = await _collect(bulk.evaluate(contexts))
+
+        assert [r["index"] for r in results] == list(range(50))
+        assert [r["context"] for r in results] == contexts
+        assert all(r["flags"] == {"a": True} and r["configs"] == {"c": 1} for r in results)
+        assert results[0]["version"] == 0
+        assert bulk.requests == 50
+
+    async def test_deduplicates_minimized_contexts(self) -> None:
+        contexts: list[EvaluationContext] = [
+            {"user_id": f"u{i}", "plan": "pro" if i % 2 else "free"} for i in range(40)
+        ]
+        with StandInServer(flags={"a": True}, dependencies={"a": ["plan"]}) as server:
+            async with BulkEvaluator(server.url, "tok", concurrency=1) as bulk:
+                results = await _collect(bulk.evaluate(contexts))
+            bodies = [request["body"]["context"] for request in server.requests]
+
+        assert len(results) == 40
+        # The first request reports the dependencies; after it only plans differ.
+        assert bulk.requests == 3
+        assert bulk.deduplicated == 37
+        assert bodies[1:] == [{"plan": "pro"}, {"plan": "free"}]
+
+    async def test_reevaluates_when_dependencies_grow(self) -> None:
+        with StandInServer(flags={"a": True}, dependencies={"a": ["plan"]}) as server:
+            async with BulkEvaluator(server.url, "tok", concurrency=2) as bulk:
+                await _collect(bulk.evaluate([{"user_id": "u0", "plan": "pro"}]))
+                server.dependencies = {"a": ["plan", "region"]}
+                server.reset_requests()
+                # The first two minimize to {"plan": "free"} and share one request,
+                # whose response reports that region matters too.
+                results = await _collect(
+                    bulk.evaluate(
+                        [
+                            {"plan": "free", "region": "us"},
+                            {"plan": "free", "region": "eu"},
+                            {"plan": "free"},
+                        ]
+                    )
+                )
+            bodies = [request["body"]["context"] for request in server.requests]
+
+        assert [r["index"] for r in results] == [0, 1, 2]
+        assert {"plan": "free", "region": "us"} in bodies
+        assert {"plan": "free", "region": "eu"} in bodies
+        # The response cached before the change was dropped.
+        assert bodies.count({"plan": "free"}) == 2
+
+    async def test_concurrent_identical_contexts_share_a_request(self) -> None:
+        contexts: list[EvaluationContext] = [{"user_id": "same"}] * 20
+        with StandInServer(flags={"a": True}, latency=0.05) as server:
+            async with BulkEvaluator(server.url, "tok", concurrency=20) as bulk:
+                results = await _collect(bulk.evaluate(contexts))
+
+        assert len(results) == 20
+        assert bulk.requests == 1
+        assert len(server.requests) == 1
+
+    async def test_bounds_requests_in_flight(self) -> None:
+        contexts: list[EvaluationContext] = [{"user_id": f"u{i}"} for i in range(24)]
+        with StandInServer(flags={"a": True}, latency=0.05) as server:
+            async with BulkEvaluator(server.url, "tok", concurrency=3) as bulk:
+                await _collect(bulk.evaluate(contexts))
+            spans = [(r["started"], r["started"] + r["duration"]) for r in server.requests]
+
+        overlap = max(sum(1 for s, e in spans if s <= start < e) for start, _ in spans)
+        assert overlap <= 3
+
+    async def test_start_skips_completed_contexts(self) -> None:
+        contexts: list[EvaluationContext] = [{"user_id": f"u{i}"} for i in range(10)]
+
+        async def stream() -> AsyncIterator[EvaluationContext]:
+            for context in contexts:
+                yield context
+
+        with StandInServer(flags={"a": True}) as server:
+            async with BulkEvaluator(server.url, "tok") as bulk:
+                from_list = await _collect(bulk.evaluate(contexts, start=7))
+                from_stream = await _collect(bulk.evaluate(stream(), start=7))
+
+        assert [r["index"] for r in from_list] == [7, 8, 9]
+        assert [r["context"] for r in from_stream] == contexts[7:]
+
+    async def test_retries_then_reports_errors(self) -> None:
+        contexts: list[EvaluationContext] = [{"user_id": "u1"}, {"user_id": "u2"}]
+        with StandInServer(flags={"a": True}) as server:
+            server.fail_next(1, status=503)
+            async with BulkEvaluator(server.url, "tok", concurrency=1, retries=1) as bulk:
+                results = await _collect(bulk.evaluate(contexts))
+            assert results[0]["flags"] == {"a": True}
+
+            server.fail_next(4, status=503)
+            async with BulkEvaluator(server.url, "tok", concurrency=1, retries=1) as bulk:
+                results = await _collect(bulk.evaluate(contexts))
+
+        assert [r["index"] for r in results] == [0, 1]
+        assert all("503" in r["error"] and "flags" not in r for r in results)
+
+    async def test_does_not_retry_client_errors(self) -> None:
+        with StandInServer(flags={"a": True}) as server:
+            server.fail_next(1, status=401)
+            async with BulkEvaluator(server.url, "tok", retries=3) as bulk:
+                results = await _collect(bulk.evaluate([{"user_id": "u1"}]))
+
+        assert "401" in results[0]["error"]
+        assert bulk.requests == 1
+
+    async def test_scope(self) -> None:
+        with StandInServer(flags={"a": True, "b": False}) as server:
+            async with BulkEvaluator(server.url, "tok", keys=["a"]) as bulk:
+                results = await _collect(bulk.evaluate([{"user_id": "u1"}]))
+
+        assert results[0]["flags"] == {"a": True}
+
+    def test_rejects_zero_concurrency(self) -> None:
+        with pytest.raises(ValueError):
+            BulkEvaluator("http://127.0.0.1:1", "tok", concurrency=0)
+
+
+class TestReadContexts:
+    def test_reads_json_lines(self, tmp_path: Path) -> None:
+        path = tmp_path / "users.jsonl"
+        path.write_text('{"user_id": "u1"}\n\n{"user_id": "u2", "plan": "pro"}\n')
+
+        assert list(read_contexts(path)) == [{"user_id": "u1"}, {"user_id": "u2", "plan": "pro"}]
+
+    def test_rejects_non_objects(self, tmp_path: Path) -> None:
+        path = tmp_path / "users.jsonl"
+        path.write_text(json.dumps({"user_id": "u1"}) + "\n[1]\n")
+
+        with pytest.raises(ValueError, match=":2:"):
+            list(read_contexts(path))
@@ -1,4 +1,11 @@
-from edgeflags.cache import Cache, _deep_equal
+import threading
+from typing import Any
+
+import pytest
+
+from edgeflags.cache import Cache, VersionGap, _deep_equal
+from edgeflags.frozen import freeze
+from edgeflags.scope import Scope
 
 
 class TestDeepEqual:
@@ -38,6 +45,10 @@ class TestDeepEqual:
         obj = {"x": [1, 2]}
         assert _deep_equal(obj, obj)
 
+    def test_frozen_against_raw(self) -> None:
+        assert _deep_equal(freeze({"x": [1, {"y": 2}]}), {"x": [1, {"y": 2}]})
+        assert not _deep_equal(freeze({"x": [1, 2]}), {"x": [1, 3]})
+
 
 class TestCache:
     def test_seed_and_get(self) -> None:
@@ -60,13 +71,49 @@ class TestCache:
         assert cache.all_flags() == {"a": True, "b": False}
         assert cache.all_configs() == {"x": 1}
 
-    def test_all_flags_returns_copy(self) -> None:
+    def test_all_flags_is_read_only(self) -> None:
         cache = Cache()
         cache.seed({"a": True}, {})
         flags = cache.all_flags()
-        flags["b"] = False
+        with pytest.raises(TypeError):
+            flags["b"] = False
         assert cache.get_flag("b") is None
 
+    def test_all_flags_view_is_not_copied(self) -> None:
+        cache = Cache()
+        cache.seed({"a": True}, {"x": 1})
+        assert cache.all_flags() is cache.all_flags()
+        assert cache.all_configs() is cache.all_configs()
+
+    def test_views_are_stable_across_updates(self) -> None:
+        cache = Cache()
+        cache.seed({"a": True}, {})
+        before = cache.all_flags()
+        cache.update({"a": False}, {})
+
+        assert before == {"a": True}
+        assert cache.all_flags() == {"a": False}
+
+    def test_config_values_are_frozen(self) -> None:
+        cache = Cache()
+        cache.seed({}, {"nested": {"a": {"b": 1}, "items": [1, 2]}})
+        value = cache.get_config("nested")
+
+        with pytest.raises(TypeError):
+            value["a"]["b"] = 2
+        assert value["items"] == (1, 2)
+        assert cache.get_config("nested") == {"a": {"b": 1}, "items": (1, 2)}
+
+    def test_update_keeps_unchanged_values(self) -> None:
+        cache = Cache()
+        cache.seed({}, {"nested": {"a": 1}, "other": {"b": 2}})
+        unchanged = cache.get_config("other")
+
+        cache.update({}, {"nested": {"a": 2}, "other": {"b": 2}})
+
+        assert cache.get_config("other") is unchanged
+        assert cache.get_config("nested") == {"a": 2}
+
     def test_update_detects_changes(self) -> None:
         cache = Cache()
         cache.seed({"dark_mode": True}, {"theme": "blue"})
@@ -106,6 +153,154 @@ class TestCache:
 
         changes = cache.update({}, {"nested": {"a": 1, "b": [1, 3]}})
         assert changes is not None
+        assert changes["configs"][0]["previous"] == {"a": 1, "b": (1, 2)}
+        assert changes["configs"][0]["current"] == {"a": 1, "b": (1, 3)}
+
+    def test_replace_deletes_missing_keys(self) -> None:
+        cache = Cache()
+        cache.seed({"a": True, "b": True}, {"x": 1, "y": 2})
+
+        changes = cache.replace({"a": True}, {"y": 2}, version=3)
+
+        assert changes is not None
+        assert changes["flags"] == [{"key": "b", "previous": True, "current": None}]
+        assert changes["configs"] == [{"key": "x", "previous": 1, "current": None}]
+        assert dict(cache.all_flags()) == {"a": True}
+        assert dict(cache.all_configs()) == {"y": 2}
+        assert cache.version == 3
+
+    def test_delta_applies_upserts_and_tombstones(self) -> None:
+        cache = Cache()
+        cache.seed({"a": True, "b": True}, {"x": 1}, version=1)
+
+        changes = cache.update(
+            {"c": False},
+            {"x": 2},
+            deleted_flags=["b", "missing"],
+            base_version=1,
+            version=2,
+        )
+
+        assert changes is not None
+        assert [c["key"] for c in changes["flags"]] == ["c", "b"]
+        assert changes["flags"][1]["current"] is None
+        assert dict(cache.all_flags()) == {"a": True, "c": False}
+        assert cache.get_config("x") == 2
+        assert cache.version == 2
+
+    def test_delta_version_gap_raises(self) -> None:
+        cache = Cache()
+        cache.seed({"a": True}, {}, version=1)
+
+        with pytest.raises(VersionGap):
+            cache.update({"a": False}, {}, base_version=2, version=3)
+
+        assert cache.get_flag("a") is True
+        assert cache.version == 1
+
+    def test_version_advances_without_changes(self) -> None:
+        cache = Cache()
+        cache.seed({"a": True}, {}, version=1)
+        flags = cache.all_flags()
+
+        assert cache.update({"a": True}, {}, base_version=1, version=2) is None
+        assert cache.version == 2
+        assert cache.all_flags() is flags
+
+    def test_apply_dispatches_on_base_version(self) -> None:
+        cache = Cache()
+        cache.seed({"a": True, "b": True}, {}, version=1)
+
+        cache.apply({"flags": {"c": True}, "configs": {}, "base_version": 1, "version": 2})
+        assert set(cache.all_flags()) == {"a", "b", "c"}
+
+        cache.apply({"flags": {"a": True}, "configs": {}, "version": 5})
+        assert set(cache.all_flags()) == {"a"}
+        assert cache.version == 5
+
+    def test_prepare_and_commit(self) -> None:
+        cache = Cache()
+        cache.seed({"a": True}, {}, version=1)
+
+        pending = cache.prepare({"flags": {"a": False}, "configs": {}, "version": 2})
+        assert cache.get_flag("a") is True
+
+        changes = cache.commit(pending)
+        assert changes is not None
+        assert cache.get_flag("a") is False
+        assert cache.version == 2
+
+    def test_commit_rediffs_when_cache_moved(self) -> None:
+        cache = Cache()
+        cache.seed({"a": True, "b": True}, {})
+
+        pending = cache.prepare({"flags": {"a": False, "b": True}, "configs": {}})
+        cache.update({"b": False}, {})
+        changes = cache.commit(pending)
+
+        assert changes is not None
+        assert {c["key"] for c in changes["flags"]} == {"a", "b"}
+        assert dict(cache.all_flags()) == {"a": False, "b": True}
+
+    def test_merge_only_touches_scope(self) -> None:
+        cache = Cache()
+        cache.seed({"kill": False, "gone": True, "other": 1}, {}, version=4)
+
+        changes = cache.merge(
+            {"flags": {"kill": True}, "configs": {}}, Scope(keys=["kill", "gone"])
+        )
+
+        assert changes is not None
+        assert [c["key"] for c in changes["flags"]] == ["kill", "gone"]
+        assert dict(cache.all_flags()) == {"kill": True, "other": 1}
+        assert cache.version == 4
+
+    def test_forget_version(self) -> None:
+        cache = Cache()
+        cache.seed({"a": True}, {}, version=4)
+        cache.forget_version()
+
+        assert cache.version is None
+        assert cache.get_flag("a") is True
+
+    def test_decode_config_is_memoized(self) -> None:
+        cache = Cache()
+        cache.seed({}, {"limits": {"max": 1}})
+        calls: list[Any] = []
+
+        def decode(raw: Any) -> int:
+            calls.append(raw)
+            return int(raw["max"])
+
+        assert cache.decode_config("limits", int, decode, pytest.fail) == 1
+        assert cache.decode_config("limits", int, decode, pytest.fail) == 1
+        assert len(calls) == 1
+        assert cache.decode_config("missing", int, decode, pytest.fail) is None
+
+    def test_decode_config_invalidated_on_change(self) -> None:
+        cache = Cache()
+        cache.seed({}, {"limits": {"max": 1}})
+        cache.decode_config("limits", int, lambda raw: raw["max"], pytest.fail)
+
+        cache.update({}, {"limits": {"max": 2}})
+
+        assert cache.decode_config("limits", int, lambda raw: raw["max"], pytest.fail) == 2
+
+    def test_decode_failure_keeps_last_good(self) -> None:
+        cache = Cache()
+        cache.seed({}, {"limits": {"max": 1}})
+        errors: list[Exception] = []
+        decode = lambda raw: int(raw["max"])  # noqa: E731
+        cache.decode_config("limits", int, decode, errors.append)
+
+        cache.update({}, {"limits": {"max": "many"}})
+
+        assert cache.decode_config("limits", int, decode, errors.append) == 1
+        assert cache.decode_config("limits", int, decode, errors.append) == 1
+        assert len(errors) == 1
+
+        cache.update({}, {"limits": {"max": 3}})
+        assert cache.decode_config("limits", int, decode, errors.append) == 3
 
     def test_clear(self) -> None:
         cache = Cache()
@@ -114,3 +309,197 @@ class TestCache:
 
         assert cache.all_flags() == {}
         assert cache.all_configs() == {}
+
+
+class TestStructuralSharing:
+    def test_unchanged_subtrees_are_shared(self) -> None:
+        cache = Cache()
+        cache.seed({}, {"cfg": {"a": {"x": [1, 2]}, "b": {"y": 1}}})
+        before = cache.get_config("cfg")
+
+        cache.update({}, {"cfg": {"a": {"x": [1, 2]}, "b": {"y": 2}}})
+
+        after = cache.get_config("cfg")
+        assert after is not before
+        assert after["a"] is before["a"]
+        assert after["b"] == {"y": 2}
+
+    def test_equal_update_keeps_identity(self) -> None:
+        cache = Cache()
+        cache.seed({}, {"cfg": {"a": [1, {"b": 2}]}})
+        before = cache.get_config("cfg")
+
+        assert cache.update({}, {"cfg": {"a": [1, {"b": 2}]}}) is None
+        assert cache.get_config("cfg") is before
+
+    def test_no_paths_by_default(self) -> None:
+        cache = Cache()
+        cache.seed({}, {"cfg": {"a": 1}})
+        changes = cache.update({}, {"cfg": {"a": 2}})
+        assert changes is not None
+        assert "paths" not in changes["configs"][0]
+
+
+class TestPathChanges:
+    def paths(self, cache: Cache, configs: dict[str, Any], **kwargs: Any) -> list[Any]:
+        changes = cache.update({}, configs, **kwargs)
+        assert changes is not None
+        return [path for change in changes["configs"] for path in change["paths"]]
+
+    def test_leaf_changes(self) -> None:
+        cache = Cache(path_changes=True)
+        cache.seed({}, {"cfg": {"limits": {"max": 5, "min": 1}, "name": "a"}})
+
+        paths = self.paths(cache, {"cfg": {"limits": {"max": 6, "min": 1}, "name": "a"}})
+
+        assert paths == [{"path": "/cfg/limits/max", "previous": 5, "current": 6}]
+
+    def test_added_and_removed_fields(self) -> None:
+        cache = Cache(path_changes=True)
+        cache.seed({}, {"cfg": {"old": 1, "keep": 2}})
+
+        paths = self.paths(cache, {"cfg": {"keep": 2, "new/field": 3}})
+
+        assert paths == [
+            {"path": "/cfg/new~1field", "previous": None, "current": 3},
+            {"path": "/cfg/old", "previous": 1, "current": None},
+        ]
+
+    def test_list_items(self) -> None:
+        cache = Cache(path_changes=True)
+        cache.seed({}, {"cfg": {"items": [1, 2, 3]}})
+
+        paths = self.paths(cache, {"cfg": {"items": [1, 5]}})
+
+        assert paths == [
+            {"path": "/cfg/items/1", "previous": 2, "current": 5},
+            {"path": "/cfg/items/2", "previous": 3, "current": None},
+        ]
+
+    def test_whole_keys(self) -> None:
+        cache = Cache(path_changes=True)
+        cache.seed({}, {"gone": {"a": 1}})
+
+        paths = self.paths(cache, {"added": {"b": 2}}, deleted_configs=["gone"])
+
+        assert paths == [
+            {"path": "/added", "previous": None, "current": {"b": 2}},
+            {"path": "/gone", "previous": {"a": 1}, "current": None},
+        ]
+
+    def test_type_change_is_a_leaf(self) -> None:
+        cache = Cache(path_changes=True)
+        cache.seed({}, {"cfg": {"a": {"b": 1}}})
+
+        paths = self.paths(cache, {"cfg": {"a": [1]}})
+
+        assert paths == [{"path": "/cfg/a", "previous": {"b": 1}, "current": (1,)}]
+
+
+class TestConfigIndex:
+    CONFIGS = {"payments.limits": 1, "payments.fees": 2, "paymentsx": 3, "search.boost": 4}
+
+    def test_prefix_view(self) -> None:
+        cache = Cache()
+        cache.update({}, self.CONFIGS)
+        view = cache.snapshot().configs_with_prefix("payments.")
+
+        assert dict(view) == {"payments.fees": 2, "payments.limits": 1}
+        assert list(view) == ["payments.fees", "payments.limits"]
+        assert "paymentsx" not in view and "payments.limits" in view
+        with pytest.raises(KeyError):
+            view["search.boost"]
+        with pytest.raises(TypeError):
+            view["payments.new"] = 1  # type: ignore[index]
+        assert dict(cache.snapshot().configs_with_prefix("")) == self.CONFIGS
+        assert len(cache.snapshot().configs_with_prefix("zzz")) == 0
+
+    def test_index_follows_updates(self) -> None:
+        cache = Cache()
+        cache.update({}, self.CONFIGS)
+        before = cache.snapshot()
+        before.configs_with_prefix("payments.")
+        cache.update({}, {"payments.tax": 5}, deleted_configs=["payments.fees"])
+        after = cache.snapshot()
+
+        assert after._keys == ("payments.limits", "payments.tax", "paymentsx", "search.boost")
+        assert list(after.configs_with_prefix("payments.")) == ["payments.limits", "payments.tax"]
+        assert list(before.configs_with_prefix("payments.")) == [
+            "payments.fees",
+            "payments.limits",
+        ]
+
+    def test_value_changes_share_the_index(self) -> None:
+        cache = Cache()
+        cache.update({}, self.CONFIGS)
+        cache.snapshot().configs_with_prefix("p")
+        keys = cache.snapshot()._keys
+        cache.update({}, {"payments.fees": 9})
+
+        assert cache.snapshot()._keys is keys
+        assert cache.snapshot().configs_with_prefix("payments.")["payments.fees"] == 9
+
+    def test_tag_view(self) -> None:
+        cache = Cache()
+        cache.apply(
+            {
+                "flags": {},
+                "configs": self.CONFIGS,
+                "version": 1,
+                "tags": {"payments.fees": ["billing"], "search.boost": ["billing", "ranking"]},
+            }
+        )
+        snapshot = cache.snapshot()
+        assert dict(snapshot.configs_with_tag("billing")) == {
+            "payments.fees": 2,
+            "search.boost": 4,
+        }
+
+        cache.apply(
+            {
+                "flags": {},
+                "configs": {},
+                "version": 2,
+                "base_version": 1,
+                "deleted_configs": ["search.boost"],
+                "tags": {"payments.fees": [], "paymentsx": ["billing"]},
+            }
+        )
+
+        assert dict(cache.snapshot().configs_with_tag("billing")) == {"paymentsx": 3}
+        assert len(cache.snapshot().configs_with_tag("ranking")) == 0
+        assert len(snapshot.configs_with_tag("ranking")) == 1
+
+    def test_full_response_replaces_tags(self) -> None:
+        cache = Cache()
+        cache.apply({"flags": {}, "configs": {"a": 1}, "tags": {"a": ["t"]}})
+        cache.apply({"flags": {}, "configs": {"a": 1}})
+
+        assert len(cache.snapshot().configs_with_tag("t")) == 0
+
+
+class TestConcurrentReads:
+    def test_readers_see_whole_updates(self) -> None:
+        cache = Cache()
+        cache.update({"a": 0, "b": 0}, {})
+        stop = threading.Event()
+        torn: list[tuple[Any, Any]] = []
+
+        def read() -> None:
+            while not stop.is_set():
+                snapshot = cache.snapshot()
+                a, b = snapshot.flags["a"], snapshot.flags["b"]
+                if a != b:
+                    torn.append((a, b))
+
+        readers = [threading.Thread(target=read) for _ in range(4)]
+        for reader in readers:
+            reader.start()
+        for i in range(1, 500):
+            cache.update({"a": i, "b": i}, {})
+        stop.set()
+        for reader in readers:
+            reader.join()
+
+        assert torn == []
+        assert cache.get_flag("a") == 499
@@ -0,0 +1,212 @@
+import io
+import json
+from pathlib import Path
+
+import pytest
+
+from edgeflags.cli import main
+from edgeflags.context import EncodedContext
+from edgeflags.snapshot_file import load_snapshot, write_snapshot
+from edgeflags.testing import StandInServer
+
+
+def run(*argv: str) -> tuple[int, str]:
+    out = io.StringIO()
+    status = main(list(argv), out)
+    return status, out.getvalue()
+
+
+class TestCli:
+    def test_fetch_writes_binary_snapshot(self, tmp_path: Path) -> None:
+        path = tmp_path / "flags.efsnap"
+        with StandInServer(flags={"a": True, "b": False}, configs={"c": {"x": 1}}) as server:
+            status, output = run(
+                "fetch", "--url", server.url, "--token", "ff_test", "-o", str(path)
+            )
+
+        assert status == 0
+        assert "2 flags and 1 configs" in output
+        snapshot = load_snapshot(path, verify=True)
+        assert dict(snapshot.flags) == {"a": True, "b": False}
+        assert snapshot.version == 0
+        assert snapshot.context == EncodedContext({}).digest
+        assert snapshot.scope == {}
+
+    def test_fetch_scoped_json(self, tmp_path: Path) -> None:
+        path = tmp_path / "flags.json"
+        with StandInServer(flags={"a": True, "b": False}) as server:
+            status, _ = run(
+                "fetch",
+                "--url",
+                server.url,
+                "--token",
+                "ff_test",
+                "--key",
+                "a",
+                "--json",
+                "-o",
+                str(path),
+            )
+
+        assert status == 0
+        assert json.loads(path.read_text())["flags"] == {"a": True}
+
+    def test_fetch_requires_token(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.delenv("EDGEFLAGS_TOKEN", raising=False)
+        status, _ = run("fetch", "--url", "http://127.0.0.1:1", "-o", str(tmp_path / "x"))
+        assert status == 2
+
+    def test_dump(self, tmp_path: Path) -> None:
+        path = tmp_path / "flags.efsnap"
+        write_snapshot(path, {"a": True}, {"c": {"x": [1, 2]}}, version=3)
+
+        status, output = run("dump", str(path))
+        assert status == 0
+        assert json.loads(output) == {
+            "version": 3,
+            "flags": {"a": True},
+            "configs": {"c": {"x": [1, 2]}},
+        }
+
+        status, output = run("dump", str(path), "--key", "c")
+        assert json.loads(output) == {"x": [1, 2]}
+
+        status, _ = run("dump", str(path), "--key", "missing")
+        assert status == 2
+
+    def test_inspect(self, tmp_path: Path) -> None:
+        path = tmp_path / "flags.efsnap"
+        write_snapshot(path, {"a": True}, {"small": 1, "large": {"x": "y" * 100}}, version=3)
+
+        status, output = run("inspect", str(path))
+
+        assert status == 0
+        assert "binary v2 (checksum ok)" in output
+        assert "flags:          1" in output
+        assert output.index("large") < output.index("small")
+
+    def test_diff(self, tmp_path: Path) -> None:
+        old = tmp_path / "old.efsnap"
+        new = tmp_path / "new.json"
+        write_snapshot(old, {"a": True, "b": True}, {"c": 1}, version=1)
+        new.write_text(
+            json.dumps({"version": 2, "flags": {"a": False, "d": 1}, "configs": {"c": 1}})
+        )
+
+        status, output = run("diff", str(old), str(new))
+
+        assert status == 1
+        assert output.splitlines() == [
+            "version 1 -> 2",
+            "~ flag a: true -> false",
+            "- flag b",
+            "+ flag d = 1",
+        ]
+        assert run("diff", str(old), str(old)) == (0, "")
+
+    def test_evaluate(self, tmp_path: Path) -> None:
+        contexts = tmp_path / "users.jsonl"
+        contexts.write_text("".join(json.dumps({"user_id": f"u{i}"}) + "\n" for i in range(5)))
+        output = tmp_path / "out.jsonl"
+        with StandInServer(flags={"a": True, "b": False}) as server:
+            status, summary = run(
+                "evaluate",
+                "--url",
+                server.url,
+                "--token",
+                "ff_test",
+                "--key",
+                "a",
+                "-i",
+                str(contexts),
+                "-o",
+                str(output),
+            )
+
+        assert status == 0
+        assert "Evaluated 5 contexts with 5 requests" in summary
+        lines = [json.loads(line) for line in output.read_text().splitlines()]
+        assert [line["index"] for line in lines] == list(range(5))
+        assert lines[3] == {
+            "index": 3,
+            "user_id": "u3",
+            "version": 0,
+            "flags": {"a": True},
+            "configs": {},
+        }
+
+    def test_evaluate_resumes_after_complete_lines(self, tmp_path: Path) -> None:
+        contexts = tmp_path / "users.jsonl"
+        contexts.write_text("".join(json.dumps({"user_id": f"u{i}"}) + "\n" for i in range(5)))
+        output = tmp_path / "out.jsonl"
+        output.write_text('{"index":0}\n{"index":1}\n{"index":2,"fl')
+        with StandInServer(flags={"a": True}) as server:
+            status, summary = run(
+                "evaluate",
+                "--url",
+                server.url,
+                "--token",
+                "ff_test",
+                "-i",
+                str(contexts),
+                "-o",
+                str(output),
+                "--resume",
+            )
+
+        assert status == 0
+        assert "Evaluated 3 contexts (resumed at 2) with 3 requests" in summary
+        lines = [json.loads(line) for line in output.read_text().splitlines()]
+        assert [line["index"] for line in lines] == [0, 1, 2, 3, 4]
+
+    def test_evaluate_resume_retries_failed_contexts(self, tmp_path: Path) -> None:
+        contexts = tmp_path / "users.jsonl"
+        contexts.write_text("".join(json.dumps({"user_id": f"u{i}"}) + "\n" for i in range(4)))
+        output = tmp_path / "out.jsonl"
+        output.write_text(
+            '{"index":0,"configs":{"note":"\\"error\\": none"}}\n'
+            '{"index":1,"error":"503"}\n{"index":2}\n'
+        )
+        with StandInServer(flags={"a": True}) as server:
+            status, summary = run(
+                "evaluate",
+                "--url",
+                server.url,
+                "--token",
+                "ff_test",
+                "-i",
+                str(contexts),
+                "-o",
+                str(output),
+                "--resume",
+            )
+            bodies = [request["body"]["context"] for request in server.requests]
+
+        assert status == 0
+        assert "Evaluated 2 contexts (resumed at 3, retrying 1 failed)" in summary
+        assert bodies == [{"user_id": "u1"}, {"user_id": "u3"}]
+        lines = [json.loads(line) for line in output.read_text().splitlines()]
+        assert [line["index"] for line in lines] == [0, 2, 1, 3]
+        assert not any("error" in line for line in lines)
+
+    def test_evaluate_exits_1_on_failed_contexts(self, tmp_path: Path) -> None:
+        contexts = tmp_path / "users.jsonl"
+        contexts.write_text('{"user_id": "u1"}\n')
+        output = tmp_path / "out.jsonl"
+        with StandInServer(flags={"a": True}) as server:
+            server.fail_next(1, status=403)
+            status, summary = run(
+                "evaluate",
+                "--url",
+                server.url,
+                "--token",
+                "t",
+                "-i",
+                str(contexts),
+                "-o",
+                str(output),
+            )
+
+        assert status == 1
+        assert "1 failed" in summary
+        assert "403" in json.loads(output.read_text())["error"]
@@ -1,8 +1,17 @@
+import asyncio
+import json
+import time
+from pathlib import Path
+from typing import Any
+
 import pytest
 from pytest_httpx import HTTPXMock
 
+from edgeflags import client as client_module
 from edgeflags.client import EdgeFlags
 from edgeflags.errors import EdgeFlagsError
+from edgeflags.snapshot_file import read_bootstrap
+from edgeflags.testing import StandInServer
 
 EVAL_RESPONSE = {"flags": {"dark_mode": True, "beta": False}, "configs": {"theme": "blue"}}
 
@@ -47,6 +56,71 @@ class TestEdgeFlagsInit:
         assert len(ready_called) == 1
         client.destroy()
 
+    async def test_init_response_replaces_bootstrap(self) -> None:
+        with StandInServer(flags={"a": True}) as server:
+            client = EdgeFlags(
+                "tok", server.url, bootstrap={"flags": {"a": False, "retired": True}}
+            )
+            await client.init()
+            assert dict(client.all_flags()) == {"a": True}
+
+            server.publish({"a": False})
+            await client.refresh()
+            assert dict(client.all_flags()) == {"a": False}
+            client.destroy()
+
+
+class TestEdgeFlagsScope:
+    async def test_scoped_client(self, httpx_mock: HTTPXMock) -> None:
+        httpx_mock.add_response(json={"flags": {"dark_mode": True}, "configs": {}})
+        client = EdgeFlags(
+            "tok",
+            "http://localhost",
+            keys=["dark_mode"],
+            bootstrap={"flags": {"dark_mode": False, "beta": True}},
+        )
+        assert dict(client.all_flags()) == {"dark_mode": False}
+
+        await client.init()
+
+        request = httpx_mock.get_request()
+        assert request is not None
+        assert json.loads(request.content)["keys"] == ["dark_mode"]
+        assert client.flag("dark_mode") is True
+        client.destroy()
+
+    async def test_scoped_deletes_stay_in_scope(self, httpx_mock: HTTPXMock) -> None:
+        httpx_mock.add_response(json={"flags": {"a": True, "b": True}, "configs": {}})
+        client = EdgeFlags("tok", "http://localhost", prefixes=["a"])
+        await client.init()
+
+        changes: list[Any] = []
+        client.on("change", changes.append)
+        httpx_mock.add_response(json={"flags": {"b": False}, "configs": {}})
+        await client.refresh()
+
+        assert dict(client.all_flags()) == {}
+        assert [c["key"] for c in changes[0]["flags"]] == ["a"]
+        client.destroy()
+
+
+class TestEdgeFlagsOffload:
+    async def test_large_payloads_decoded_off_loop(self, httpx_mock: HTTPXMock) -> None:
+        httpx_mock.add_response(json=EVAL_RESPONSE)
+        client = EdgeFlags("tok", "http://localhost", offload_threshold=1)
+        await client.init()
+        assert client.flag("dark_mode") is True
+
+        changes: list[Any] = []
+        client.on("change", changes.append)
+        httpx_mock.add_response(json={"flags": {"dark_mode": False}, "configs": {}})
+        await client.refresh()
+
+        assert client.flag("dark_mode") is False
+        assert dict(client.all_configs()) == {}
+        assert len(changes) == 1
+        await client.aclose()
+
 
 class TestEdgeFlagsMethods:
     async def test_flag_and_config(self, httpx_mock: HTTPXMock) -> None:
@@ -118,6 +192,31 @@ class TestEdgeFlagsChangeEvents:
         client.destroy()
 
 
+class TestEdgeFlagsChangeFeed:
+    async def test_changes_async_iterator(self, httpx_mock: HTTPXMock) -> None:
+        httpx_mock.add_response(json=EVAL_RESPONSE)
+        client = EdgeFlags("tok", "http://localhost")
+        await client.init()
+        received: list[Any] = []
+        changes = client.changes(keys=["theme"])
+
+        async def consume() -> None:
+            async for change in changes:
+                received.append(change)
+
+        task = asyncio.create_task(consume())
+        httpx_mock.add_response(json={"flags": {"dark_mode": False}, "configs": {"theme": "blue"}})
+        await client.refresh()
+        httpx_mock.add_response(json={"flags": {"dark_mode": False}, "configs": {"theme": "red"}})
+        await client.refresh()
+        client.destroy()
+        await asyncio.wait_for(task, 1)
+
+        assert len(received) == 1
+        assert received[0]["sequence"] == 2
+        assert received[0]["configs"][0]["current"] == "red"
+
+
 class TestEdgeFlagsIdentify:
     async def test_identify_refreshes(self, httpx_mock: HTTPXMock) -> None:
         httpx_mock.add_response(json=EVAL_RESPONSE)
@@ -132,6 +231,17 @@ class TestEdgeFlagsIdentify:
         assert client.flag("beta") is True
         client.destroy()
 
+    async def test_identify_skips_refetch_when_no_dependency_changes(self) -> None:
+        with StandInServer(flags={"a": True}, dependencies={"a": ["custom.tier"]}) as server:
+            client = EdgeFlags("tok", server.url, context={"user_id": "u1", "custom": {"tier": 1}})
+            await client.init()
+            await client.identify({"user_id": "u2", "custom": {"tier": 1, "team": "x"}})
+            assert len(server.requests) == 1
+
+            await client.identify({"user_id": "u2", "custom": {"tier": 2}})
+            assert server.requests[1]["body"]["context"] == {"custom": {"tier": 2}}
+            await client.aclose()
+
 
 class TestEdgeFlagsDestroy:
     async def test_destroy_clears_state(self, httpx_mock: HTTPXMock) -> None:
@@ -144,3 +254,110 @@ class TestEdgeFlagsDestroy:
         assert not client.is_ready
         assert client.all_flags() == {}
         assert client.all_configs() == {}
+
+
+class TestEdgeFlagsInitDeadline:
+    async def test_ready_from_bootstrap_then_upgrades(self) -> None:
+        with StandInServer(flags={"a": True}, latency=0.3) as server:
+            client = EdgeFlags("tok", server.url, bootstrap={"flags": {"a": False}})
+            upgraded = asyncio.Event()
+            client.on("change", lambda _: upgraded.set())
+
+            await client.init(deadline=2)
+
+            assert client.flag("a") is False
+            assert client.init_report is not None
+            assert client.init_report["source"] == "bootstrap"
+
+            await asyncio.wait_for(upgraded.wait(), 5)
+            assert client.flag("a") is True
+            await client.aclose()
+
+    async def test_network_wins_without_local_source(self) -> None:
+        with StandInServer(flags={"a": True}) as server:
+            client = EdgeFlags("tok", server.url)
+            await client.init(deadline=2)
+
+            assert client.flag("a") is True
+            assert client.init_report is not None
+            assert client.init_report["source"] == "network"
+            await client.aclose()
+
+    async def test_network_error_before_environment_is_reported_once(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        path = tmp_path / "flags.json"
+        path.write_text('{"flags": {"a": false}, "configs": {}}')
+        monkeypatch.setenv("EDGEFLAGS_SNAPSHOT", str(path))
+
+        def slow_read(path: str) -> Any:
+            time.sleep(0.2)
+            return read_bootstrap(path)
+
+        monkeypatch.setattr(client_module, "read_bootstrap", slow_read)
+        with StandInServer(flags={"a": True}) as server:
+            server.fail_next(1, 503)
+            client = EdgeFlags("tok", server.url, polling_interval=0.05)
+            errors: list[Exception] = []
+            client.on("error", errors.append)
+            await client.init(deadline=2)
+
+            assert client.flag("a") is False
+            assert client.init_report is not None
+            sources = [s["source"] for s in client.init_report["sources"]]
+            assert sources == ["network", "environment"]
+            for _ in range(200):
+                if client.flag("a") is True:
+                    break
+                await asyncio.sleep(0.01)
+            assert client.flag("a") is True
+            assert len(errors) == 1
+            await client.aclose()
+
+    async def test_deadline_without_source_raises(self) -> None:
+        with StandInServer(latency=0.5) as server:
+            client = EdgeFlags("tok", server.url)
+            with pytest.raises(EdgeFlagsError, match="within"):
+                await client.init(deadline=0.1)
+            await client.aclose()
+
+
+class TestEdgeFlagsPriorityKeys:
+    async def test_priority_keys_poll_on_fast_lane(self) -> None:
+        with StandInServer(flags={"kill": False, "other": 1}) as server:
+            client = EdgeFlags(
+                "tok",
+                server.url,
+                polling_interval=3600,
+                priority_keys=["kill"],
+                priority_interval=0.05,
+            )
+            await client.init()
+            changed = asyncio.Event()
+            client.on("change", lambda _: changed.set())
+            server.publish(flags={"kill": True, "other": 2})
+
+            await asyncio.wait_for(changed.wait(), 5)
+
+            assert client.flag("kill") is True
+            assert client.flag("other") == 1
+            await client.aclose()
+
+
+class TestEdgeFlagsIdlePolling:
+    async def test_read_resumes_parked_polling(self) -> None:
+        with StandInServer(flags={"a": 1}) as server:
+            client = EdgeFlags("tok", server.url, polling_interval=0.02, idle_timeout=0.05)
+            await client.init()
+            await asyncio.sleep(0.2)
+            assert client._poller is not None and client._poller.parked
+
+            server.publish(flags={"a": 2})
+            assert client.flag("a") == 1
+            for _ in range(200):
+                if client.flag("a") == 2:
+                    break
+                await asyncio.sleep(0.01)
+
+            assert client.flag("a") == 2
+            await client.aclose()
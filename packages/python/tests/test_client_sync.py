@@ -1,8 +1,16 @@
+import time
+from pathlib import Path
+from typing import Any
+
 import pytest
 from pytest_httpx import HTTPXMock
 
+from edgeflags import client as client_module
 from edgeflags.client import EdgeFlagsSync
 from edgeflags.errors import EdgeFlagsError
+from edgeflags.poller import _delay_after
+from edgeflags.snapshot_file import read_bootstrap, write_snapshot
+from edgeflags.testing import StandInServer
 
 EVAL_RESPONSE = {"flags": {"dark_mode": True, "beta": False}, "configs": {"theme": "blue"}}
 
@@ -47,6 +55,63 @@ class TestEdgeFlagsSyncInit:
         assert len(ready_called) == 1
         client.destroy()
 
+    def test_init_response_replaces_bootstrap(self) -> None:
+        with StandInServer(flags={"a": True}) as server:
+            client = EdgeFlagsSync(
+                "tok", server.url, bootstrap={"flags": {"a": False, "retired": True}}
+            )
+            client.init()
+            assert dict(client.all_flags()) == {"a": True}
+
+            server.publish({"a": False})
+            client.refresh()
+            assert dict(client.all_flags()) == {"a": False}
+            client.destroy()
+
+    def test_version(self) -> None:
+        with StandInServer(flags={"a": True}) as server:
+            server.publish({"a": False})
+            client = EdgeFlagsSync("tok", server.url)
+            assert client.version is None
+            client.init()
+            assert client.version == server.version == 1
+            client.destroy()
+
+    def test_snapshot_bootstrap_keeps_version_for_deltas(self, tmp_path: Path) -> None:
+        path = tmp_path / "flags.efsnap"
+        with StandInServer(flags={"a": False, "b": True}) as server:
+            server.publish({"a": True})
+            write_snapshot(path, {"a": True, "b": True}, {}, version=server.version, context={})
+            server.publish({"b": False})
+            server.fail_next(1, 503)
+            client = EdgeFlagsSync("tok", server.url, bootstrap=path)
+            client.init()
+            client.refresh()
+            assert dict(client.all_flags()) == {"a": True, "b": False}
+            client.destroy()
+
+        assert server.requests[-1]["body"]["since"] == 1
+
+    @pytest.mark.parametrize(
+        "origin",
+        [{}, {"context": {"user_id": "other"}}, {"context": {}, "keys": ["a"]}],
+        ids=["unknown", "other-context", "other-scope"],
+    )
+    def test_snapshot_bootstrap_for_other_origin_fetches_in_full(
+        self, tmp_path: Path, origin: dict[str, Any]
+    ) -> None:
+        path = tmp_path / "flags.efsnap"
+        with StandInServer(flags={"a": True, "b": True}) as server:
+            write_snapshot(path, {"a": True}, {}, version=server.version, **origin)
+            server.fail_next(1, 503)
+            client = EdgeFlagsSync("tok", server.url, bootstrap=path)
+            client.init()
+            client.refresh()
+            assert dict(client.all_flags()) == {"a": True, "b": True}
+            client.destroy()
+
+        assert "since" not in server.requests[-1]["body"]
+
 
 class TestEdgeFlagsSyncMethods:
     def test_flag_and_config(self, httpx_mock: HTTPXMock) -> None:
@@ -102,6 +167,37 @@ class TestEdgeFlagsSyncChangeEvents:
         client.destroy()
 
 
+class TestEdgeFlagsSyncChangeFeed:
+    def test_changes_replays_history(self, httpx_mock: HTTPXMock) -> None:
+        httpx_mock.add_response(json=EVAL_RESPONSE)
+        client = EdgeFlagsSync("tok", "http://localhost")
+        client.init()
+        start = 0
+
+        httpx_mock.add_response(json={"flags": {"dark_mode": False}, "configs": {}})
+        client.refresh()
+        httpx_mock.add_response(json={"flags": {"dark_mode": True}, "configs": {}})
+        client.refresh()
+
+        events = list(client.changes(since=start, keys=["dark_mode"], timeout=0))
+        assert [e["sequence"] for e in events] == [1, 2]
+        assert [e["flags"][0]["current"] for e in events] == [False, True]
+        client.destroy()
+
+    def test_change_event_carries_sequence(self, httpx_mock: HTTPXMock) -> None:
+        httpx_mock.add_response(json=EVAL_RESPONSE)
+        client = EdgeFlagsSync("tok", "http://localhost")
+        client.init()
+        received: list[Any] = []
+        client.on("change", received.append)
+
+        httpx_mock.add_response(json={"flags": {"dark_mode": False}, "configs": {}})
+        client.refresh()
+
+        assert received[0]["sequence"] == 1
+        client.destroy()
+
+
 class TestEdgeFlagsSyncIdentify:
     def test_identify_refreshes(self, httpx_mock: HTTPXMock) -> None:
         httpx_mock.add_response(json=EVAL_RESPONSE)
@@ -117,6 +213,71 @@ class TestEdgeFlagsSyncIdentify:
         client.destroy()
 
 
+class TestEdgeFlagsSyncContextMinimization:
+    def test_sends_only_dependent_attributes(self) -> None:
+        with StandInServer(flags={"a": True}, dependencies={"a": ["plan"]}) as server:
+            client = EdgeFlagsSync(
+                "tok", server.url, context={"user_id": "u1", "plan": "pro", "segments": ["x"]}
+            )
+            client.init()
+            client.refresh()
+
+            assert server.requests[0]["body"]["context"]["user_id"] == "u1"
+            assert server.requests[1]["body"]["context"] == {"plan": "pro"}
+            client.destroy()
+
+    def test_identify_skips_refetch_when_no_dependency_changes(self) -> None:
+        with StandInServer(flags={"a": True}, dependencies={"a": ["plan"]}) as server:
+            client = EdgeFlagsSync("tok", server.url, context={"user_id": "u1", "plan": "pro"})
+            client.init()
+            client.identify({"user_id": "u2", "plan": "pro"})
+            assert len(server.requests) == 1
+
+            client.identify({"user_id": "u2", "plan": "free"})
+            assert len(server.requests) == 2
+            assert server.requests[1]["body"] == {"context": {"plan": "free"}}
+            client.destroy()
+
+    def test_new_dependency_refetches_with_full_attributes(self) -> None:
+        context = {"user_id": "u1", "plan": "pro", "email": "u1@example.com"}
+        with StandInServer(flags={"a": True}, dependencies={"a": ["plan"]}) as server:
+            client = EdgeFlagsSync("tok", server.url, context=context)
+            client.init()
+            assert server.dependencies is not None
+            server.dependencies["a"] = ["plan", "email"]
+            server.publish(flags={"a": False})
+            server.reset_requests()
+            client.refresh()
+
+            assert [r["body"]["context"] for r in server.requests] == [
+                {"plan": "pro"},
+                {"plan": "pro", "email": "u1@example.com"},
+            ]
+            assert "since" not in server.requests[1]["body"]
+            assert client.flag("a") is False
+            client.destroy()
+
+
+class TestEdgeFlagsSyncNamespaces:
+    def test_prefix_and_tag_views(self, httpx_mock: HTTPXMock) -> None:
+        httpx_mock.add_response(
+            json={
+                "flags": {},
+                "configs": {"payments.fees": 1, "payments.limits": 2, "search.boost": 3},
+                "tags": {"payments.fees": ["billing"]},
+            }
+        )
+        client = EdgeFlagsSync("tok", "http://localhost")
+        client.init()
+
+        assert dict(client.configs_with_prefix("payments.")) == {
+            "payments.fees": 1,
+            "payments.limits": 2,
+        }
+        assert dict(client.configs_with_tag("billing")) == {"payments.fees": 1}
+        client.destroy()
+
+
 class TestEdgeFlagsSyncDestroy:
     def test_destroy_clears_state(self, httpx_mock: HTTPXMock) -> None:
         httpx_mock.add_response(json=EVAL_RESPONSE)
@@ -128,3 +289,253 @@ class TestEdgeFlagsSyncDestroy:
         assert not client.is_ready
         assert client.all_flags() == {}
         assert client.all_configs() == {}
+
+
+class TestEdgeFlagsSyncPathChanges:
+    def test_on_path_filters_by_prefix(self, httpx_mock: HTTPXMock) -> None:
+        httpx_mock.add_response(
+            json={"flags": {}, "configs": {"ui": {"theme": {"color": "blue"}, "font": "sans"}}}
+        )
+        httpx_mock.add_response(
+            json={"flags": {}, "configs": {"ui": {"theme": {"color": "red"}, "font": "serif"}}}
+        )
+        client = EdgeFlagsSync("tok", "http://localhost", path_changes=True)
+        client.init()
+        seen: list[Any] = []
+        client.on_path("/ui/theme", seen.append)
+
+        client.refresh()
+
+        assert seen == [[{"path": "/ui/theme/color", "previous": "blue", "current": "red"}]]
+        client.destroy()
+
+    def test_on_path_requires_path_changes(self) -> None:
+        client = EdgeFlagsSync("tok", "http://localhost", _mock={})
+        with pytest.raises(EdgeFlagsError):
+            client.on_path("/ui", print)
+
+
+class TestEdgeFlagsSyncInitDeadline:
+    def test_ready_from_bootstrap_then_upgrades(self) -> None:
+        with StandInServer(flags={"a": True}, latency=0.3) as server:
+            client = EdgeFlagsSync("tok", server.url, bootstrap={"flags": {"a": False}})
+            changes = client.changes(timeout=5)
+
+            client.init(deadline=2)
+
+            assert client.flag("a") is False
+            report = client.init_report
+            assert report is not None
+            assert report["source"] == "bootstrap"
+            assert report["ready_after"] is not None and report["ready_after"] < 0.3
+
+            change = next(changes)
+            assert change["flags"] == [{"key": "a", "previous": False, "current": True}]
+            assert [s["source"] for s in report["sources"]] == ["bootstrap", "network"]
+            client.destroy()
+
+    def test_network_wins_without_local_source(self) -> None:
+        with StandInServer(flags={"a": True}) as server:
+            client = EdgeFlagsSync("tok", server.url)
+            client.init(deadline=2)
+
+            assert client.flag("a") is True
+            assert client.init_report is not None
+            assert client.init_report["source"] == "network"
+            client.destroy()
+
+    def test_races_environment_snapshot(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        path = tmp_path / "flags.efsnap"
+        write_snapshot(path, {"a": False}, {})
+        monkeypatch.setenv("EDGEFLAGS_SNAPSHOT", str(path))
+        with StandInServer(flags={"a": True}, latency=0.5) as server:
+            client = EdgeFlagsSync("tok", server.url)
+            client.init(deadline=2)
+
+            assert client.flag("a") is False
+            assert client.init_report is not None
+            assert client.init_report["source"] == "environment"
+            client.destroy()
+
+    def test_deadline_without_source_raises(self) -> None:
+        with StandInServer(latency=0.5) as server:
+            client = EdgeFlagsSync("tok", server.url)
+            with pytest.raises(EdgeFlagsError, match="within"):
+                client.init(deadline=0.1)
+            assert not client.is_ready
+            client.destroy()
+
+    def test_network_error_falls_back_to_environment(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        path = tmp_path / "flags.json"
+        path.write_text('{"flags": {"a": false}, "configs": {}}')
+        monkeypatch.setenv("EDGEFLAGS_SNAPSHOT", str(path))
+        with StandInServer() as server:
+            server.fail_next(1, 503)
+            client = EdgeFlagsSync("tok", server.url)
+            client.init(deadline=2)
+
+            assert client.flag("a") is False
+            client.destroy()
+
+    def test_network_error_before_environment_is_reported_once(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        path = tmp_path / "flags.json"
+        path.write_text('{"flags": {"a": false}, "configs": {}}')
+        monkeypatch.setenv("EDGEFLAGS_SNAPSHOT", str(path))
+
+        def slow_read(path: str) -> Any:
+            time.sleep(0.2)
+            return read_bootstrap(path)
+
+        monkeypatch.setattr(client_module, "read_bootstrap", slow_read)
+        with StandInServer(flags={"a": True}) as server:
+            server.fail_next(1, 503)
+            client = EdgeFlagsSync("tok", server.url, polling_interval=0.05)
+            errors: list[Exception] = []
+            client.on("error", errors.append)
+            client.init(deadline=2)
+
+            assert client.flag("a") is False
+            assert client.init_report is not None
+            sources = [s["source"] for s in client.init_report["sources"]]
+            assert sources == ["network", "environment"]
+            assert len(errors) == 1
+            # Polling takes over fetching the network data.
+            deadline = time.monotonic() + 2
+            while client.flag("a") is False and time.monotonic() < deadline:
+                time.sleep(0.01)
+            assert client.flag("a") is True
+            client.destroy()
+
+    def test_init_report_without_deadline(self, httpx_mock: HTTPXMock) -> None:
+        httpx_mock.add_response(json=EVAL_RESPONSE)
+        client = EdgeFlagsSync("tok", "http://localhost")
+        client.init()
+
+        report = client.init_report
+        assert report is not None
+        assert report["source"] == "network"
+        assert [s["ok"] for s in report["sources"]] == [True]
+        client.destroy()
+
+
+class TestEdgeFlagsSyncPriorityKeys:
+    def test_priority_keys_poll_on_fast_lane(self) -> None:
+        with StandInServer(flags={"kill": False, "other": 1}) as server:
+            client = EdgeFlagsSync(
+                "tok",
+                server.url,
+                polling_interval=3600,
+                priority_keys=["kill"],
+                priority_interval=0.05,
+            )
+            client.init()
+            changes = client.changes(timeout=5)
+            server.publish(flags={"kill": True, "other": 2})
+
+            change = next(changes)
+
+            assert change["flags"] == [{"key": "kill", "previous": False, "current": True}]
+            assert client.flag("other") == 1
+            scoped = server.requests[1]["body"]
+            assert scoped["keys"] == ["kill"]
+            assert "since" not in scoped
+            client.destroy()
+
+    def test_priority_keys_outside_scope_are_ignored(self) -> None:
+        client = EdgeFlagsSync("tok", "http://localhost", keys=["a"], priority_keys=["a", "b"])
+        assert client._priority is not None
+        assert client._priority.keys == {"a"}
+
+
+class TestEdgeFlagsSyncPacing:
+    def test_server_interval_drives_polling(self, httpx_mock: HTTPXMock) -> None:
+        httpx_mock.add_response(json=EVAL_RESPONSE, headers={"X-EdgeFlags-Poll-Interval": "90"})
+        client = EdgeFlagsSync("tok", "http://localhost", polling_interval=5)
+        client.init()
+
+        assert client._poll_hint() == (90.0, None)
+        client.destroy()
+
+    def test_retry_after_zero_does_not_spin(self, httpx_mock: HTTPXMock) -> None:
+        httpx_mock.add_response(json=EVAL_RESPONSE)
+        httpx_mock.add_response(status_code=503, headers={"Retry-After": "0"}, is_reusable=True)
+        client = EdgeFlagsSync("tok", "http://localhost", polling_interval=0.05)
+        client.init()
+        time.sleep(0.5)
+        client.destroy()
+
+        assert len(httpx_mock.get_requests()) == 2
+
+    def test_past_retry_after_date_does_not_spin(self, httpx_mock: HTTPXMock) -> None:
+        httpx_mock.add_response(json=EVAL_RESPONSE)
+        httpx_mock.add_response(
+            status_code=429,
+            headers={"Retry-After": "Wed, 21 Oct 2015 07:28:00 GMT"},
+            is_reusable=True,
+        )
+        client = EdgeFlagsSync("tok", "http://localhost", polling_interval=0.05)
+        client.init()
+        time.sleep(0.5)
+        client.destroy()
+
+        assert len(httpx_mock.get_requests()) == 2
+
+    def test_max_age_zero_keeps_polling_interval(self, httpx_mock: HTTPXMock) -> None:
+        httpx_mock.add_response(json=EVAL_RESPONSE, headers={"Cache-Control": "max-age=0"})
+        client = EdgeFlagsSync("tok", "http://localhost", polling_interval=60)
+        client.init()
+
+        assert _delay_after(60, None, client._poll_hint) == 60
+        client.destroy()
+
+
+class TestEdgeFlagsSyncGetMode:
+    def test_identify_reuses_fresh_responses(self) -> None:
+        with StandInServer(flags={"a": True}, cache_control="max-age=60") as server:
+            client = EdgeFlagsSync("tok", server.url, context={"user_id": "u1"}, http_method="GET")
+            client.init()
+            client.identify({"user_id": "u2"})
+            client.identify({"user_id": "u1"})
+
+            assert client.flag("a") is True
+            assert len(server.requests) == 2
+            client.destroy()
+
+
+class TestEdgeFlagsSyncIdlePolling:
+    def test_parks_when_idle_and_revalidates_on_read(self) -> None:
+        with StandInServer(flags={"a": 1}) as server:
+            client = EdgeFlagsSync("tok", server.url, polling_interval=0.02, idle_timeout=0.05)
+            client.init()
+            time.sleep(0.2)
+            assert client._poller is not None and client._poller.parked
+            polls = len(server.requests)
+            time.sleep(0.1)
+            assert len(server.requests) == polls
+
+            server.publish(flags={"a": 2})
+            assert client.flag("a") == 1
+            deadline = time.monotonic() + 2
+            while client.flag("a") != 2 and time.monotonic() < deadline:
+                time.sleep(0.01)
+
+            assert client.flag("a") == 2
+            client.destroy()
+
+    def test_stale_read_refreshes_synchronously(self) -> None:
+        with StandInServer(flags={"a": 1}) as server:
+            client = EdgeFlagsSync(
+                "tok", server.url, polling_interval=0.02, idle_timeout=0.05, max_staleness=0.1
+            )
+            client.init()
+            time.sleep(0.25)
+            server.publish(flags={"a": 2})
+
+            assert client.flag("a") == 2
+            client.destroy()
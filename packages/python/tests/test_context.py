@@ -0,0 +1,72 @@
+from edgeflags.context import EncodedContext, decode_query, encode_context, minimize_context
+
+
+class TestEncodedContext:
+    def test_canonical_regardless_of_order(self) -> None:
+        a = EncodedContext({"user_id": "u1", "plan": "pro", "segments": ["b", "a", "b"]})
+        b = EncodedContext({"segments": ["a", "b"], "plan": "pro", "user_id": "u1"})
+
+        assert a.json == b.json == b'{"plan":"pro","segments":["a","b"],"user_id":"u1"}'
+        assert a.digest == b.digest
+        assert a.query == b.query
+        assert a == b
+
+    def test_different_contexts_differ(self) -> None:
+        a = EncodedContext({"user_id": "u1"})
+        b = EncodedContext({"user_id": "u2"})
+
+        assert a.digest != b.digest
+        assert a.query != b.query
+
+    def test_encode_reuses_existing_encoding(self) -> None:
+        encoded = EncodedContext({"user_id": "u1"})
+
+        assert encode_context(encoded) is encoded
+        assert encode_context({"user_id": "u1"}) == encoded
+
+    def test_query_round_trip(self) -> None:
+        encoded = EncodedContext({"user_id": "ü", "custom": {"n": 1}})
+        body = decode_query(f"{encoded.query}&since=4&keys=a&keys=b&prefixes=p.")
+
+        assert body == {
+            "context": {"custom": {"n": 1}, "user_id": "ü"},
+            "since": 4,
+            "keys": ["a", "b"],
+            "prefixes": ["p."],
+        }
+
+    def test_empty_query(self) -> None:
+        assert decode_query("") == {"context": {}}
+
+
+class TestMinimizeContext:
+    CONTEXT = {
+        "user_id": "u1",
+        "plan": "pro",
+        "segments": ["beta", "eu", "staff"],
+        "custom": {"tier": 2, "team": "core"},
+    }
+
+    def test_keeps_only_dependent_attributes(self) -> None:
+        minimized = minimize_context(self.CONTEXT, {"plan", "custom.tier", "segments.eu"})
+
+        assert minimized == {"plan": "pro", "segments": ["eu"], "custom": {"tier": 2}}
+
+    def test_whole_custom_and_segments(self) -> None:
+        minimized = minimize_context(self.CONTEXT, {"custom", "segments", "custom.tier"})
+
+        assert minimized == {
+            "segments": self.CONTEXT["segments"],
+            "custom": self.CONTEXT["custom"],
+        }
+
+    def test_users_differing_elsewhere_share_an_encoding(self) -> None:
+        attributes = {"plan", "segments.beta"}
+        a = minimize_context({"user_id": "a", "plan": "pro", "segments": ["x"]}, attributes)
+        b = minimize_context({"user_id": "b", "plan": "pro"}, attributes)
+
+        assert EncodedContext(a) == EncodedContext(b)
+
+    def test_unknown_dependencies_keep_everything(self) -> None:
+        assert minimize_context(self.CONTEXT, None) is self.CONTEXT
+        assert minimize_context(self.CONTEXT, set()) == {}
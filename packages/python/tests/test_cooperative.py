@@ -0,0 +1,149 @@
+import io
+import sys
+import threading
+import time
+
+import pytest
+
+from edgeflags.client import EdgeFlagsSync
+from edgeflags.cooperative import THREADS, Runtime, detect, select_runtime
+from edgeflags.errors import EdgeFlagsError
+from edgeflags.poller import SyncPoller
+from edgeflags.testing import StandInServer
+from edgeflags.webhook import EdgeFlagsWSGIWebhook, sign_payload
+
+
+class TestSelectRuntime:
+    def test_threads_without_cooperative_runtime(self) -> None:
+        assert detect() is None
+        assert select_runtime(None) is THREADS
+        assert select_runtime(False) is THREADS
+
+    def test_missing_runtime_raises(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setitem(sys.modules, "eventlet", None)
+
+        with pytest.raises(EdgeFlagsError, match="eventlet"):
+            select_runtime("eventlet")
+
+    def test_sync_client_defaults_to_threads(self) -> None:
+        client = EdgeFlagsSync("tok", "http://localhost")
+
+        assert client._runtime is THREADS
+        client.destroy()
+
+
+class TestThreadRuntime:
+    def test_call_later_and_cancel(self) -> None:
+        fired = threading.Event()
+        THREADS.call_later(0.01, fired.set)
+        cancelled = threading.Event()
+        THREADS.call_later(0.05, cancelled.set).cancel()
+
+        assert fired.wait(1)
+        time.sleep(0.1)
+        assert not cancelled.is_set()
+
+    def test_blocking_passes_arguments(self) -> None:
+        assert THREADS.blocking(divmod, 7, 2) == (3, 1)
+        assert THREADS.blocking(int, "ff", base=16) == 255
+
+    def test_poller_uses_runtime(self) -> None:
+        scheduled: list[float] = []
+
+        class Recording(Runtime):
+            def call_later(self, delay, fn):  # type: ignore[no-untyped-def]
+                scheduled.append(delay)
+                return super().call_later(delay, fn)
+
+        poller = SyncPoller(0.01, lambda: None, lambda e: None, runtime=Recording())
+        poller.start()
+        time.sleep(0.05)
+        poller.stop()
+
+        assert len(scheduled) >= 2
+
+
+class TestGevent:
+    def test_polls_on_greenlets(self) -> None:
+        gevent = pytest.importorskip("gevent")
+        with StandInServer(flags={"a": 1}) as server:
+            client = EdgeFlagsSync("tok", server.url, polling_interval=0.05, cooperative="gevent")
+            assert client._runtime.name == "gevent"
+            client.init()
+            server.publish(flags={"a": 2})
+            deadline = time.monotonic() + 5
+            while client.flag("a") != 2 and time.monotonic() < deadline:
+                gevent.sleep(0.01)
+
+            assert client.flag("a") == 2
+            client.destroy()
+
+    def test_lock_is_greenlet_aware(self) -> None:
+        gevent = pytest.importorskip("gevent")
+        runtime = select_runtime("gevent")
+        lock = runtime.lock()
+        order: list[str] = []
+
+        def worker(name: str) -> None:
+            with lock:
+                order.append(f"{name}+")
+                gevent.sleep(0.01)
+                order.append(f"{name}-")
+
+        gevent.joinall([gevent.spawn(worker, "a"), gevent.spawn(worker, "b")])
+
+        assert order == ["a+", "a-", "b+", "b-"]
+
+    def test_changes_wait_yields_to_other_greenlets(self) -> None:
+        gevent = pytest.importorskip("gevent")
+        client = EdgeFlagsSync("tok", "http://localhost", cooperative="gevent")
+        ticks: list[float] = []
+
+        def ticker() -> None:
+            while True:
+                ticks.append(time.monotonic())
+                gevent.sleep(0.01)
+
+        greenlet = gevent.spawn(ticker)
+        gevent.sleep(0)
+        assert list(client.changes(timeout=0.3)) == []
+        greenlet.kill()
+
+        assert len(ticks) >= 10
+        client.destroy()
+
+    def test_changes_wake_on_greenlet_refresh(self) -> None:
+        gevent = pytest.importorskip("gevent")
+        with StandInServer(flags={"a": 1}) as server:
+            client = EdgeFlagsSync("tok", server.url, polling_interval=3600, cooperative="gevent")
+            client.init()
+            server.publish(flags={"a": 2})
+            gevent.spawn_later(0.05, client.refresh)
+
+            event = next(client.changes(timeout=2))
+
+            assert event["flags"][0]["current"] == 2
+            client.destroy()
+
+    def test_webhook_refreshes_on_a_greenlet(self) -> None:
+        gevent = pytest.importorskip("gevent")
+        with StandInServer(flags={"a": 1}) as server:
+            client = EdgeFlagsSync("tok", server.url, polling_interval=3600, cooperative="gevent")
+            client.init()
+            server.publish(flags={"a": 2})
+            app = EdgeFlagsWSGIWebhook(client, "secret")
+            body = b'{"keys": ["a"]}'
+            environ = {
+                "REQUEST_METHOD": "POST",
+                "CONTENT_LENGTH": str(len(body)),
+                "wsgi.input": io.BytesIO(body),
+                "HTTP_X_EDGEFLAGS_SIGNATURE": sign_payload("secret", body),
+            }
+            app(environ, lambda status, headers: None)
+
+            assert not any(t.name == "edgeflags-webhook" for t in threading.enumerate())
+            deadline = time.monotonic() + 5
+            while client.flag("a") != 2 and time.monotonic() < deadline:
+                gevent.sleep(0.01)
+            assert client.flag("a") == 2
+            client.destroy()
@@ -1,3 +1,6 @@
+import threading
+from collections.abc import Callable
+
 from edgeflags.emitter import Emitter
 
 
@@ -59,3 +62,36 @@ class TestEmitter:
         unsub = emitter.on("ready", lambda: None)
         unsub()
         unsub()  # should not raise
+
+    def test_unsubscribe_during_emit_keeps_current_round(self) -> None:
+        emitter = Emitter()
+        calls: list[str] = []
+        unsubs: list[Callable[[], None]] = []
+
+        def first() -> None:
+            calls.append("first")
+            unsubs[1]()
+
+        unsubs.append(emitter.on("ready", first))
+        unsubs.append(emitter.on("ready", lambda: calls.append("second")))
+        emitter.emit("ready")
+        emitter.emit("ready")
+
+        assert calls == ["first", "second", "first"]
+
+    def test_concurrent_subscribers_are_all_kept(self) -> None:
+        emitter = Emitter()
+        received: list[int] = []
+
+        def subscribe(n: int) -> None:
+            for _ in range(100):
+                emitter.on("change", lambda payload, n=n: received.append(n))
+
+        threads = [threading.Thread(target=subscribe, args=(n,)) for n in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        emitter.emit("change", "data")
+
+        assert len(received) == 800
@@ -0,0 +1,216 @@
+import socket
+
+import pytest
+
+from edgeflags.client import EdgeFlags, EdgeFlagsSync
+from edgeflags.endpoints import EndpointPool
+from edgeflags.errors import EdgeFlagsError
+from edgeflags.fetcher import AsyncFetcher, SyncFetcher
+from edgeflags.testing import StandInServer
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _urls(pool: EndpointPool) -> list[str]:
+    return [endpoint.url for endpoint in pool.order()]
+
+
+def _closed_port_url() -> str:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    return f"http://127.0.0.1:{port}"
+
+
+class TestEndpointPool:
+    def test_prefers_lowest_latency(self) -> None:
+        pool = EndpointPool(["http://a", "http://b"], clock=Clock())
+        a, b = pool.endpoints
+
+        assert _urls(pool) == ["http://a", "http://b"]
+        pool.success(a, 0.2)
+        # b is unmeasured, so it is tried next.
+        assert _urls(pool) == ["http://b", "http://a"]
+        pool.success(b, 0.05)
+
+        assert _urls(pool) == ["http://b", "http://a"]
+        assert pool.stats()["active"] == "http://b"
+
+    def test_latency_is_an_ewma(self) -> None:
+        pool = EndpointPool(["http://a"], alpha=0.5, clock=Clock())
+        (a,) = pool.endpoints
+        pool.success(a, 0.1)
+        pool.success(a, 0.3)
+
+        assert a.latency == pytest.approx(0.2)
+
+    def test_ejects_after_consecutive_failures_and_probes(self) -> None:
+        clock = Clock()
+        pool = EndpointPool(["http://a", "http://b"], ejection_time=10, clock=clock)
+        a, b = pool.endpoints
+        pool.success(b, 0.1)
+        pool.failure(a)
+        assert not pool.stats()["endpoints"][0]["ejected"]
+        pool.failure(a)
+
+        assert pool.stats()["endpoints"][0]["ejected"]
+        assert _urls(pool) == ["http://b", "http://a"]
+
+        clock.now += 10
+        assert _urls(pool) == ["http://a", "http://b"]
+        # Only one request probes.
+        assert _urls(pool) == ["http://b", "http://a"]
+        pool.failure(a)
+
+        # A failed probe doubles the ejection.
+        clock.now += 10
+        assert _urls(pool)[0] == "http://b"
+        clock.now += 10
+        assert _urls(pool)[0] == "http://a"
+        pool.success(a, 0.05)
+
+        stats = pool.stats()
+        assert stats["endpoints"][0]["ejected"] is False
+        assert stats["endpoints"][0]["ejections"] == 2
+        assert stats["active"] == "http://a"
+
+    def test_reprobes_slower_endpoints(self) -> None:
+        clock = Clock()
+        pool = EndpointPool(["http://a", "http://b"], probe_interval=60, clock=clock)
+        a, b = pool.endpoints
+        pool.success(a, 0.05)
+        pool.success(b, 0.5)
+        assert _urls(pool)[0] == "http://a"
+
+        clock.now += 60
+        assert _urls(pool)[0] == "http://b"
+        assert _urls(pool)[0] == "http://a"
+
+    def test_single_endpoint_is_never_ejected(self) -> None:
+        pool = EndpointPool(["http://a"], clock=Clock())
+        for _ in range(5):
+            pool.failure(pool.endpoints[0])
+
+        assert pool.stats()["endpoints"][0]["ejected"] is False
+
+    def test_counts_failovers(self) -> None:
+        pool = EndpointPool(["http://a", "http://b"], clock=Clock())
+        a, b = pool.order()
+        pool.failure(a)
+        pool.success(b, 0.1, attempt=1)
+
+        assert pool.stats()["failovers"] == 1
+
+    def test_requires_a_url(self) -> None:
+        with pytest.raises(ValueError):
+            EndpointPool([])
+
+
+class TestFailover:
+    def test_fails_over_from_unreachable_endpoint(self) -> None:
+        with StandInServer(flags={"a": True}) as server:
+            fetcher = SyncFetcher([_closed_port_url(), server.url], "tok")
+            try:
+                data = fetcher.fetch_all({})
+                stats = fetcher.endpoint_stats
+            finally:
+                fetcher.close()
+
+        assert data["flags"] == {"a": True}
+        assert stats["failovers"] == 1
+        assert stats["endpoints"][0]["failures"] == 1
+        assert stats["endpoints"][1]["latency"] is not None
+
+    def test_fails_over_on_server_errors(self) -> None:
+        with StandInServer(flags={"a": 1}) as first, StandInServer(flags={"a": 2}) as second:
+            first.fail_next(2, status=503)
+            fetcher = SyncFetcher([first.url, second.url], "tok")
+            try:
+                values = [fetcher.fetch_all({})["flags"]["a"] for _ in range(3)]
+                stats = fetcher.endpoint_stats
+            finally:
+                fetcher.close()
+
+        assert values == [2, 2, 2]
+        assert stats["endpoints"][0]["ejected"] is True
+        assert stats["active"] == second.url
+
+    def test_client_errors_do_not_fail_over(self) -> None:
+        with StandInServer() as first, StandInServer() as second:
+            first.fail_next(1, status=401)
+            fetcher = SyncFetcher([first.url, second.url], "tok")
+            try:
+                with pytest.raises(EdgeFlagsError) as exc_info:
+                    fetcher.fetch_all({})
+            finally:
+                fetcher.close()
+
+        assert exc_info.value.status_code == 401
+        assert second.requests == []
+
+    def test_all_endpoints_down(self) -> None:
+        with StandInServer() as first, StandInServer() as second:
+            first.fail_next(1, status=500)
+            second.fail_next(1, status=502)
+            fetcher = SyncFetcher([first.url, second.url], "tok")
+            try:
+                with pytest.raises(EdgeFlagsError) as exc_info:
+                    fetcher.fetch_all({})
+            finally:
+                fetcher.close()
+
+        assert exc_info.value.status_code == 502
+
+    def test_routes_to_the_faster_server(self) -> None:
+        with StandInServer(latency=0.05) as slow, StandInServer() as fast:
+            fetcher = SyncFetcher([slow.url, fast.url], "tok")
+            try:
+                for _ in range(5):
+                    fetcher.fetch_all({})
+            finally:
+                fetcher.close()
+
+        assert len(slow.requests) == 1
+        assert len(fast.requests) == 4
+
+    async def test_async_failover(self) -> None:
+        with StandInServer(flags={"a": True}) as server:
+            fetcher = AsyncFetcher([_closed_port_url(), server.url], "tok")
+            try:
+                data = await fetcher.fetch_all({})
+            finally:
+                await fetcher.close()
+
+        assert data["flags"] == {"a": True}
+        assert fetcher.endpoint_stats["failovers"] == 1
+
+
+class TestClientEndpointStats:
+    def test_sync_client(self) -> None:
+        with StandInServer(flags={"a": True}) as server:
+            client = EdgeFlagsSync("tok", [_closed_port_url(), server.url])
+            client.init()
+
+            assert client.flag("a") is True
+            assert client.endpoint_stats()["failovers"] == 1
+            client.destroy()
+
+    async def test_async_client(self) -> None:
+        with StandInServer(flags={"a": True}) as server:
+            client = EdgeFlags("tok", [server.url])
+            await client.init()
+
+            assert client.endpoint_stats()["active"] == server.url
+            await client.aclose()
+
+    def test_mock_client_has_no_endpoints(self) -> None:
+        client = EdgeFlagsSync("tok", "http://localhost", _mock={})
+
+        with pytest.raises(EdgeFlagsError):
+            client.endpoint_stats()
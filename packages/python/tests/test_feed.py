@@ -0,0 +1,116 @@
+import asyncio
+import threading
+
+import pytest
+
+from edgeflags.errors import ChangeFeedOverrun
+from edgeflags.feed import ChangeFeed
+from edgeflags.types import ChangeEvent
+
+
+def event(*keys: str) -> ChangeEvent:
+    return ChangeEvent(
+        flags=[{"key": key, "previous": None, "current": True} for key in keys],
+        configs=[],
+    )
+
+
+class TestChangeFeed:
+    def test_append_assigns_sequence(self) -> None:
+        feed = ChangeFeed()
+        first = event("a")
+        assert feed.append(first) == 1
+        assert feed.append(event("b")) == 2
+        assert first["sequence"] == 1
+        assert feed.sequence == 2
+
+    def test_since(self) -> None:
+        feed = ChangeFeed()
+        for key in "abc":
+            feed.append(event(key))
+
+        assert [e["sequence"] for e in feed.since(1)] == [2, 3]
+        assert feed.since(3) == []
+
+    def test_overrun(self) -> None:
+        feed = ChangeFeed(capacity=2)
+        for key in "abcd":
+            feed.append(event(key))
+
+        assert [e["sequence"] for e in feed.since(2)] == [3, 4]
+        with pytest.raises(ChangeFeedOverrun) as exc_info:
+            feed.since(1)
+        assert exc_info.value.oldest == 3
+
+    def test_iter_replays_and_times_out(self) -> None:
+        feed = ChangeFeed()
+        feed.append(event("a"))
+        feed.append(event("b"))
+
+        assert [e["sequence"] for e in feed.iter(since=0, timeout=0)] == [1, 2]
+        assert list(feed.iter(timeout=0.01)) == []
+
+    def test_iter_filters_keys(self) -> None:
+        feed = ChangeFeed()
+        feed.append(event("a"))
+        feed.append(event("b", "c"))
+
+        events = list(feed.iter(since=0, keys=["c"], timeout=0))
+
+        assert len(events) == 1
+        assert events[0]["sequence"] == 2
+        assert [c["key"] for c in events[0]["flags"]] == ["c"]
+
+    def test_iter_blocks_until_append(self) -> None:
+        feed = ChangeFeed()
+        received: list[int] = []
+
+        def consume() -> None:
+            for e in feed.iter(since=0):
+                received.append(e["sequence"])
+
+        thread = threading.Thread(target=consume)
+        thread.start()
+        feed.append(event("a"))
+        feed.append(event("b"))
+        feed.close()
+        thread.join(timeout=2)
+
+        assert not thread.is_alive()
+        assert received == [1, 2]
+
+    def test_iter_detects_overrun_of_slow_consumer(self) -> None:
+        feed = ChangeFeed(capacity=1)
+        iterator = feed.iter(since=0)
+        feed.append(event("a"))
+        feed.append(event("b"))
+
+        with pytest.raises(ChangeFeedOverrun):
+            next(iterator)
+
+    async def test_aiter(self) -> None:
+        feed = ChangeFeed()
+        received: list[int] = []
+
+        async def consume() -> None:
+            async for e in feed.aiter(keys=["b"]):
+                received.append(e["sequence"])
+
+        task = asyncio.create_task(consume())
+        await asyncio.sleep(0)
+        feed.append(event("a"))
+        await asyncio.sleep(0)
+        feed.append(event("b"))
+        feed.close()
+        await asyncio.wait_for(task, 1)
+
+        assert received == [2]
+
+    async def test_aiter_wakes_from_other_thread(self) -> None:
+        feed = ChangeFeed()
+        iterator = feed.aiter()
+        threading.Timer(0.01, feed.append, [event("a")]).start()
+
+        first = await asyncio.wait_for(iterator.__anext__(), 1)
+
+        assert first["sequence"] == 1
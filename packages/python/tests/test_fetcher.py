@@ -1,8 +1,14 @@
+import json
+
+import httpx
 import pytest
 from pytest_httpx import HTTPXMock
 
+from edgeflags.context import EncodedContext
 from edgeflags.errors import EdgeFlagsError
-from edgeflags.fetcher import AsyncFetcher, SyncFetcher
+from edgeflags.fetcher import AsyncFetcher, SyncFetcher, _ResponseCache
+from edgeflags.scope import Scope
+from edgeflags.testing import StandInServer
 
 
 class TestAsyncFetcher:
@@ -59,6 +65,87 @@ class TestAsyncFetcher:
         finally:
             await fetcher.close()
 
+    async def test_since_and_delta_fields(self, httpx_mock: HTTPXMock) -> None:
+        httpx_mock.add_response(
+            url="http://localhost/api/v1/evaluate",
+            json={
+                "flags": {"a": True},
+                "configs": {},
+                "version": 8,
+                "base_version": 7,
+                "deleted_flags": ["b"],
+            },
+        )
+        fetcher = AsyncFetcher("http://localhost", "tok")
+        try:
+            result = await fetcher.fetch_all({}, since=7)
+            request = httpx_mock.get_request()
+            assert request is not None
+            assert json.loads(request.content) == {"context": {}, "since": 7}
+            assert result["version"] == 8
+            assert result["base_version"] == 7
+            assert result["deleted_flags"] == ["b"]
+            assert result["deleted_configs"] == []
+        finally:
+            await fetcher.close()
+
+    async def test_scoped_request(self, httpx_mock: HTTPXMock) -> None:
+        httpx_mock.add_response(
+            url="http://localhost/api/v1/evaluate",
+            json={
+                "flags": {"a": True, "other": True},
+                "configs": {"payments.fee": 1, "theme": "blue"},
+            },
+        )
+        fetcher = AsyncFetcher("http://localhost", "tok")
+        try:
+            result = await fetcher.fetch_all({}, scope=Scope(keys=["a"], prefixes=["payments."]))
+            request = httpx_mock.get_request()
+            assert request is not None
+            assert json.loads(request.content) == {
+                "context": {},
+                "keys": ["a"],
+                "prefixes": ["payments."],
+            }
+            assert result["flags"] == {"a": True}
+            assert result["configs"] == {"payments.fee": 1}
+        finally:
+            await fetcher.close()
+
+    async def test_offloaded_decode(self, httpx_mock: HTTPXMock) -> None:
+        httpx_mock.add_response(
+            url="http://localhost/api/v1/evaluate",
+            json={"flags": {"a": True}, "configs": {}},
+            is_reusable=True,
+        )
+        fetcher = AsyncFetcher("http://localhost", "tok", offload_threshold=1)
+        try:
+            result, offloaded = await fetcher.fetch({})
+            assert result["flags"] == {"a": True}
+            assert offloaded
+        finally:
+            await fetcher.close()
+
+        fetcher = AsyncFetcher("http://localhost", "tok", offload_threshold=10_000)
+        try:
+            _, offloaded = await fetcher.fetch({})
+            assert not offloaded
+        finally:
+            await fetcher.close()
+
+    async def test_process_decode(self, httpx_mock: HTTPXMock) -> None:
+        httpx_mock.add_response(
+            url="http://localhost/api/v1/evaluate",
+            json={"flags": {"a": True, "b": False}, "configs": {}},
+        )
+        fetcher = AsyncFetcher("http://localhost", "tok", process_threshold=1)
+        try:
+            result, offloaded = await fetcher.fetch({}, scope=Scope(keys=["a"]))
+            assert result["flags"] == {"a": True}
+            assert offloaded
+        finally:
+            await fetcher.close()
+
     async def test_error_has_status_code(self, httpx_mock: HTTPXMock) -> None:
         httpx_mock.add_response(
             url="http://localhost/api/v1/evaluate",
@@ -87,6 +174,22 @@ class TestSyncFetcher:
         finally:
             fetcher.close()
 
+    def test_full_response_has_no_base_version(self, httpx_mock: HTTPXMock) -> None:
+        httpx_mock.add_response(
+            url="http://localhost/api/v1/evaluate",
+            json={"flags": {}, "configs": {}, "version": 3},
+        )
+        fetcher = SyncFetcher("http://localhost", "tok")
+        try:
+            result = fetcher.fetch_all({})
+            request = httpx_mock.get_request()
+            assert request is not None
+            assert json.loads(request.content) == {"context": {}}
+            assert result["version"] == 3
+            assert "base_version" not in result
+        finally:
+            fetcher.close()
+
     def test_auth_header(self, httpx_mock: HTTPXMock) -> None:
         httpx_mock.add_response(
             url="http://localhost/api/v1/evaluate",
@@ -112,3 +215,275 @@ class TestSyncFetcher:
                 fetcher.fetch_all({})
         finally:
             fetcher.close()
+
+    def test_conditional_requests(self, httpx_mock: HTTPXMock) -> None:
+        httpx_mock.add_response(
+            json={"flags": {"a": True}, "configs": {}, "version": 3}, headers={"ETag": '"v3"'}
+        )
+        httpx_mock.add_response(status_code=304)
+        fetcher = SyncFetcher("http://localhost", "tok")
+        try:
+            fetcher.fetch_all({})
+            result = fetcher.fetch_all({}, since=3)
+
+            first, second = httpx_mock.get_requests()
+            assert "If-None-Match" not in first.headers
+            assert second.headers["If-None-Match"] == '"v3"'
+            assert result == {
+                "flags": {},
+                "configs": {},
+                "version": 3,
+                "base_version": 3,
+                "deleted_flags": [],
+                "deleted_configs": [],
+            }
+        finally:
+            fetcher.close()
+
+    def test_no_conditional_request_for_other_context(self, httpx_mock: HTTPXMock) -> None:
+        httpx_mock.add_response(json={"flags": {}, "configs": {}}, headers={"ETag": '"x"'})
+        httpx_mock.add_response(json={"flags": {}, "configs": {}})
+        fetcher = SyncFetcher("http://localhost", "tok")
+        try:
+            fetcher.fetch_all({"user_id": "a"})
+            fetcher.fetch_all({"user_id": "b"}, since=1)
+
+            assert "If-None-Match" not in httpx_mock.get_requests()[1].headers
+        finally:
+            fetcher.close()
+
+    def test_scoped_fetch_keeps_full_poll_etag(self, httpx_mock: HTTPXMock) -> None:
+        httpx_mock.add_response(json={"flags": {}, "configs": {}}, headers={"ETag": '"full"'})
+        httpx_mock.add_response(json={"flags": {}, "configs": {}}, headers={"ETag": '"a"'})
+        httpx_mock.add_response(status_code=304)
+        httpx_mock.add_response(status_code=304)
+        fetcher = SyncFetcher("http://localhost", "tok")
+        try:
+            fetcher.fetch_all({})
+            fetcher.fetch_all({}, scope=Scope(keys=["a"]))
+            fetcher.fetch_all({}, since=1)
+            fetcher.fetch_all({}, since=1, scope=Scope(keys=["a"]))
+
+            requests = httpx_mock.get_requests()
+            assert requests[2].headers["If-None-Match"] == '"full"'
+            assert requests[3].headers["If-None-Match"] == '"a"'
+        finally:
+            fetcher.close()
+
+    def test_etags_beyond_capacity_are_dropped(self, httpx_mock: HTTPXMock) -> None:
+        for user in "abc":
+            httpx_mock.add_response(json={"flags": {}, "configs": {}}, headers={"ETag": user})
+        httpx_mock.add_response(json={"flags": {}, "configs": {}})
+        httpx_mock.add_response(status_code=304)
+        fetcher = SyncFetcher("http://localhost", "tok", etag_cache_size=2)
+        try:
+            for user in "abc":
+                fetcher.fetch_all({"user_id": user})
+            fetcher.fetch_all({"user_id": "a"}, since=1)
+            fetcher.fetch_all({"user_id": "c"}, since=1)
+
+            requests = httpx_mock.get_requests()
+            assert "If-None-Match" not in requests[3].headers
+            assert requests[4].headers["If-None-Match"] == "c"
+        finally:
+            fetcher.close()
+
+    def test_retry_after_on_429(self, httpx_mock: HTTPXMock) -> None:
+        httpx_mock.add_response(status_code=429, headers={"Retry-After": "7"})
+        fetcher = SyncFetcher("http://localhost", "tok")
+        try:
+            with pytest.raises(EdgeFlagsError) as exc_info:
+                fetcher.fetch_all({})
+            assert exc_info.value.status_code == 429
+            assert exc_info.value.retry_after == 7.0
+        finally:
+            fetcher.close()
+
+    def test_retry_after_http_date(self, httpx_mock: HTTPXMock) -> None:
+        httpx_mock.add_response(
+            status_code=503, headers={"Retry-After": "Wed, 21 Oct 2015 07:28:00 GMT"}
+        )
+        fetcher = SyncFetcher("http://localhost", "tok")
+        try:
+            with pytest.raises(EdgeFlagsError) as exc_info:
+                fetcher.fetch_all({})
+            assert exc_info.value.retry_after == 0.0
+        finally:
+            fetcher.close()
+
+    def test_poll_hints(self, httpx_mock: HTTPXMock) -> None:
+        body = {"flags": {}, "configs": {}}
+        httpx_mock.add_response(json=body, headers={"X-EdgeFlags-Poll-Interval": "120"})
+        httpx_mock.add_response(json=body, headers={"Cache-Control": "public, max-age=30"})
+        httpx_mock.add_response(json=body)
+        httpx_mock.add_response(json=body, headers={"Cache-Control": "max-age=0"})
+        fetcher = SyncFetcher("http://localhost", "tok")
+        try:
+            assert fetcher.poll_hint == (None, None)
+            fetcher.fetch_all({})
+            assert fetcher.poll_hint == (120.0, None)
+            fetcher.fetch_all({})
+            assert fetcher.poll_hint == (120.0, 30.0)
+            # max-age applies to one response, the recommended interval sticks.
+            fetcher.fetch_all({})
+            assert fetcher.poll_hint == (120.0, None)
+            fetcher.fetch_all({})
+            assert fetcher.poll_hint == (120.0, 0.0)
+        finally:
+            fetcher.close()
+
+
+class TestGetMode:
+    def test_get_request_carries_canonical_context(self, httpx_mock: HTTPXMock) -> None:
+        httpx_mock.add_response(json={"flags": {"a": True}, "configs": {}})
+        fetcher = SyncFetcher("http://localhost", "tok", method="GET")
+        try:
+            context = EncodedContext({"user_id": "u1", "segments": ["b", "a"]})
+            result = fetcher.fetch_all(context, since=3, scope=Scope(keys=["a"]))
+        finally:
+            fetcher.close()
+
+        request = httpx_mock.get_requests()[0]
+        assert request.method == "GET"
+        assert request.content == b""
+        assert str(request.url) == (
+            f"http://localhost/api/v1/evaluate?{context.query}&since=3&keys=a"
+        )
+        assert result["flags"] == {"a": True}
+
+    def test_post_body_splices_encoded_context(self, httpx_mock: HTTPXMock) -> None:
+        httpx_mock.add_response(json={"flags": {}, "configs": {}})
+        fetcher = SyncFetcher("http://localhost", "tok")
+        try:
+            fetcher.fetch_all({"plan": "pro", "user_id": "u1"}, since=2)
+        finally:
+            fetcher.close()
+
+        request = httpx_mock.get_requests()[0]
+        assert request.content == b'{"context":{"plan":"pro","user_id":"u1"},"since":2}'
+        assert request.headers["Content-Type"] == "application/json"
+
+    def test_fresh_responses_are_reused(self) -> None:
+        with StandInServer(flags={"a": True}, cache_control="max-age=60") as server:
+            fetcher = SyncFetcher(server.url, "tok", method="GET")
+            try:
+                for user in ("u1", "u2", "u1", "u2"):
+                    fetcher.fetch_all({"user_id": user})
+            finally:
+                fetcher.close()
+
+        assert len(server.requests) == 2
+        assert all(r["method"] == "GET" for r in server.requests)
+
+    def test_uncacheable_responses_are_refetched(self) -> None:
+        with StandInServer(flags={"a": True}, cache_control="no-store") as server:
+            fetcher = SyncFetcher(server.url, "tok", method="GET")
+            try:
+                fetcher.fetch_all({})
+                fetcher.fetch_all({})
+            finally:
+                fetcher.close()
+
+        assert len(server.requests) == 2
+
+    async def test_async_get_mode(self) -> None:
+        with StandInServer(flags={"a": 1}, cache_control="max-age=60") as server:
+            fetcher = AsyncFetcher(server.url, "tok", method="GET")
+            try:
+                first = await fetcher.fetch_all({"user_id": "u1"})
+                second = await fetcher.fetch_all({"user_id": "u1"})
+            finally:
+                await fetcher.close()
+
+        assert first == second
+        assert len(server.requests) == 1
+
+
+class TestResponseCache:
+    def _response(self, **headers: str) -> httpx.Response:
+        return httpx.Response(200, headers=headers, content=b"{}")
+
+    def test_freshness_from_max_age_and_age(self) -> None:
+        now = [100.0]
+        cache = _ResponseCache(clock=lambda: now[0])
+        cache.store("k", self._response(**{"Cache-Control": "max-age=10", "Age": "4"}), 100.0)
+
+        assert cache.get("k") == b"{}"
+        now[0] = 106.0
+        assert cache.get("k") is None
+
+    def test_expires_header(self) -> None:
+        cache = _ResponseCache(clock=lambda: 0.0)
+        cache.store(
+            "k",
+            self._response(
+                Date="Wed, 21 Oct 2015 07:28:00 GMT", Expires="Wed, 21 Oct 2015 07:28:30 GMT"
+            ),
+            0.0,
+        )
+
+        assert cache.get("k") == b"{}"
+
+    def test_no_cache_is_not_stored(self) -> None:
+        cache = _ResponseCache(clock=lambda: 0.0)
+        cache.store("k", self._response(**{"Cache-Control": "max-age=10, no-cache"}), 0.0)
+
+        assert cache.get("k") is None
+
+    def test_evicts_least_recently_used(self) -> None:
+        cache = _ResponseCache(capacity=2, clock=lambda: 0.0)
+        for key in ("a", "b"):
+            cache.store(key, self._response(**{"Cache-Control": "max-age=10"}), 0.0)
+        cache.get("a")
+        cache.store("c", self._response(**{"Cache-Control": "max-age=10"}), 0.0)
+
+        assert cache.get("b") is None
+        assert cache.get("a") is not None
+
+
+class TestDependencies:
+    def test_tracks_union_of_key_dependencies(self, httpx_mock: HTTPXMock) -> None:
+        httpx_mock.add_response(
+            json={
+                "version": 1,
+                "flags": {"a": True, "b": 1},
+                "configs": {},
+                "dependencies": {"a": ["plan"], "b": ["custom.tier"]},
+            }
+        )
+        httpx_mock.add_response(
+            json={
+                "version": 2,
+                "base_version": 1,
+                "flags": {"c": True},
+                "configs": {},
+                "deleted_flags": ["b"],
+                "dependencies": {"c": ["segments.beta"]},
+            }
+        )
+        httpx_mock.add_response(json={"version": 3, "flags": {}, "configs": {}})
+        fetcher = SyncFetcher("http://localhost", "tok")
+
+        assert fetcher.context_attributes is None
+        fetcher.fetch_all({})
+        assert fetcher.context_attributes == {"plan", "custom.tier"}
+        fetcher.fetch_all({}, since=1)
+        assert fetcher.context_attributes == {"plan", "segments.beta"}
+        fetcher.fetch_all({})
+        assert fetcher.context_attributes is None
+        fetcher.close()
+
+    def test_scoped_responses_update_listed_keys(self, httpx_mock: HTTPXMock) -> None:
+        httpx_mock.add_response(
+            json={"flags": {"a": 1, "b": 2}, "configs": {}, "dependencies": {"a": [], "b": []}}
+        )
+        httpx_mock.add_response(
+            json={"flags": {"a": 1}, "configs": {}, "dependencies": {"a": ["email"]}}
+        )
+        fetcher = SyncFetcher("http://localhost", "tok")
+
+        fetcher.fetch_all({})
+        assert fetcher.context_attributes == frozenset()
+        fetcher.fetch_all({}, scope=Scope(keys=["a"]))
+        assert fetcher.context_attributes == {"email"}
+        fetcher.close()
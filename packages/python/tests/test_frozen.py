@@ -0,0 +1,63 @@
+import copy
+import json
+import pickle
+
+import pytest
+
+from edgeflags.frozen import FrozenDict, freeze
+
+
+class TestFrozenDict:
+    def test_behaves_like_dict(self) -> None:
+        value = FrozenDict({"a": 1})
+        assert isinstance(value, dict)
+        assert value == {"a": 1}
+        assert value["a"] == 1
+        assert json.dumps(value) == '{"a": 1}'
+
+    def test_mutation_raises(self) -> None:
+        value = FrozenDict({"a": 1})
+        with pytest.raises(TypeError):
+            value["b"] = 2
+        with pytest.raises(TypeError):
+            del value["a"]
+        with pytest.raises(TypeError):
+            value.update(b=2)
+        with pytest.raises(TypeError):
+            value.pop("a")
+        with pytest.raises(TypeError):
+            value.setdefault("b", 2)
+        with pytest.raises(TypeError):
+            value.clear()
+        assert value == {"a": 1}
+
+    def test_copy_is_mutable(self) -> None:
+        value = FrozenDict({"a": 1})
+        clone = value.copy()
+        clone["b"] = 2
+        assert value == {"a": 1}
+
+    def test_pickle_and_deepcopy(self) -> None:
+        value = freeze({"a": {"b": [1, 2]}})
+        restored = pickle.loads(pickle.dumps(value))
+        assert type(restored) is FrozenDict
+        assert restored == value
+        assert copy.deepcopy(value) == value
+
+
+class TestFreeze:
+    def test_scalars_unchanged(self) -> None:
+        assert freeze(1) == 1
+        assert freeze("a") == "a"
+        assert freeze(None) is None
+
+    def test_nested(self) -> None:
+        value = freeze({"a": [{"b": 1}], "c": {"d": [1, 2]}})
+        assert type(value) is FrozenDict
+        assert type(value["a"]) is tuple
+        assert type(value["a"][0]) is FrozenDict
+        assert value["c"]["d"] == (1, 2)
+
+    def test_already_frozen_is_reused(self) -> None:
+        value = freeze({"a": 1})
+        assert freeze(value) is value
@@ -1,6 +1,9 @@
+from typing import Any
+
 from pytest_httpx import HTTPXMock
 
 from edgeflags.client import EdgeFlags, EdgeFlagsSync
+from edgeflags.testing import StandInServer
 
 INITIAL = {"flags": {"dark_mode": True}, "configs": {"theme": "blue"}}
 UPDATED = {"flags": {"dark_mode": False}, "configs": {"theme": "red"}}
@@ -36,6 +39,68 @@ class TestAsyncLifecycle:
         assert client.all_flags() == {}
 
 
+class TestAsyncDeltaPolling:
+    async def test_applies_deltas_with_deletions(self) -> None:
+        with StandInServer({"a": True, "b": True}, {"theme": "blue"}) as server:
+            client = EdgeFlags("tok", server.url)
+            await client.init()
+
+            changes: list[Any] = []
+            client.on("change", changes.append)
+            server.publish(configs={"theme": "red"}, deleted_flags=["b"])
+            await client.refresh()
+            assert dict(client.all_flags()) == {"a": True}
+            assert client.config("theme") == "red"
+            client.destroy()
+
+        assert server.requests[-1]["body"]["since"] == 0
+        assert changes[0]["flags"] == [{"key": "b", "previous": True, "current": None}]
+
+    async def test_resyncs_on_version_gap(self) -> None:
+        with StandInServer({"a": True}) as server:
+            client = EdgeFlags("tok", server.url)
+            await client.init()
+
+            server.publish({"a": False})
+            server.publish({"c": True})
+            server.gap_next()
+            await client.refresh()
+
+            assert [r["body"].get("since") for r in server.requests] == [None, 0, None]
+            assert dict(client.all_flags()) == {"a": False, "c": True}
+            client.destroy()
+
+    async def test_identify_requests_full_snapshot(self) -> None:
+        with StandInServer({"a": True}) as server:
+            client = EdgeFlags("tok", server.url)
+            await client.init()
+
+            await client.identify({"user_id": "user-1"})
+            client.destroy()
+
+        assert "since" not in server.requests[-1]["body"]
+
+
+class TestSyncDeltaPolling:
+    def test_applies_deltas_and_resyncs(self) -> None:
+        with StandInServer({"a": True, "b": True}) as server:
+            client = EdgeFlagsSync("tok", server.url)
+            client.init()
+
+            server.publish(deleted_flags=["b"])
+            client.refresh()
+            assert dict(client.all_flags()) == {"a": True}
+
+            server.publish({"a": False})
+            server.publish({"d": True})
+            server.gap_next()
+            client.refresh()
+
+            assert [r["body"].get("since") for r in server.requests] == [None, 0, 1, None]
+            assert dict(client.all_flags()) == {"a": False, "d": True}
+            client.destroy()
+
+
 class TestSyncLifecycle:
     def test_full_lifecycle(self, httpx_mock: HTTPXMock) -> None:
         httpx_mock.add_response(json=INITIAL)
@@ -0,0 +1,68 @@
+from collections.abc import Callable, Iterator
+from typing import Any
+
+import pytest
+
+from edgeflags.middleware import EdgeFlagsASGIMiddleware, EdgeFlagsWSGIMiddleware
+from edgeflags.mock import create_mock_client, create_mock_client_sync
+
+
+class TestASGIMiddleware:
+    async def test_pins_snapshot_for_request(self) -> None:
+        client = create_mock_client(flags={"dark_mode": True})
+        seen: list[Any] = []
+
+        async def app(scope: Any, receive: Any, send: Any) -> None:
+            seen.append(client.flag("dark_mode"))
+            client._cache.update({"dark_mode": False}, {})
+            seen.append(client.flag("dark_mode"))
+
+        middleware = EdgeFlagsASGIMiddleware(app, client)
+        await middleware({"type": "http"}, None, None)  # type: ignore[arg-type]
+
+        assert seen == [True, True]
+        assert client.flag("dark_mode") is False
+
+    async def test_lifespan_is_not_pinned(self) -> None:
+        client = create_mock_client(flags={"dark_mode": True})
+        seen: list[Any] = []
+
+        async def app(scope: Any, receive: Any, send: Any) -> None:
+            client._cache.update({"dark_mode": False}, {})
+            seen.append(client.flag("dark_mode"))
+
+        middleware = EdgeFlagsASGIMiddleware(app, client)
+        await middleware({"type": "lifespan"}, None, None)  # type: ignore[arg-type]
+
+        assert seen == [False]
+
+
+class TestWSGIMiddleware:
+    def test_pins_snapshot_while_body_streams(self) -> None:
+        client = create_mock_client_sync(flags={"dark_mode": True})
+
+        def app(environ: dict[str, Any], start_response: Callable[..., Any]) -> Iterator[bytes]:
+            start_response("200 OK", [])
+            client._cache.update({"dark_mode": False}, {})
+            yield str(client.flag("dark_mode")).encode()
+            yield str(client.flags(["dark_mode", "missing"], False)).encode()
+
+        middleware = EdgeFlagsWSGIMiddleware(app, client)
+        body = middleware({}, lambda status, headers: None)
+        chunks = list(body)
+
+        assert chunks == [b"True", b"{'dark_mode': True, 'missing': False}"]
+        assert client.flag("dark_mode") is False
+
+    def test_pin_released_on_error(self) -> None:
+        client = create_mock_client_sync(flags={"dark_mode": True})
+
+        def app(environ: dict[str, Any], start_response: Callable[..., Any]) -> list[bytes]:
+            raise RuntimeError("boom")
+
+        middleware = EdgeFlagsWSGIMiddleware(app, client)
+        with pytest.raises(RuntimeError):
+            middleware({}, lambda status, headers: None)
+        client._cache.update({"dark_mode": False}, {})
+
+        assert client.flag("dark_mode") is False
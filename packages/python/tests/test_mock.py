@@ -1,6 +1,14 @@
+from dataclasses import dataclass
+
 from edgeflags.mock import create_mock_client, create_mock_client_sync
 
 
+@dataclass
+class Pricing:
+    currency: str
+    amount: int
+
+
 class TestMockClient:
     async def test_ready_without_network(self) -> None:
         client = create_mock_client(flags={"feat": True})
@@ -60,6 +68,41 @@ class TestMockClientSync:
         assert client.flag("dark_mode") is True
         assert client.config("theme") == "blue"
 
+    def test_bulk_flags(self) -> None:
+        client = create_mock_client_sync(flags={"a": True, "b": False})
+        assert client.flags(["a", "b", "c"]) == {"a": True, "b": False, "c": None}
+        assert client.flags(["c"], False) == {"c": False}
+
+    def test_pin(self) -> None:
+        client = create_mock_client_sync(flags={"a": True}, configs={"x": 1})
+
+        with client.pin() as snapshot:
+            client._cache.update({"a": False}, {"x": 2})
+            assert client.flag("a") is True
+            assert client.config("x") == 1
+            assert snapshot.flags["a"] is True
+
+        assert client.flag("a") is False
+        assert client.config("x") == 2
+
+    def test_typed_config(self) -> None:
+        client = create_mock_client_sync(configs={"pricing": {"currency": "EUR", "amount": 5}})
+
+        pricing = client.typed_config("pricing", Pricing)
+
+        assert pricing == Pricing("EUR", 5)
+        assert client.typed_config("pricing", Pricing) is pricing
+        assert client.typed_config("missing", Pricing) is None
+
+    def test_typed_config_decode_error(self) -> None:
+        client = create_mock_client_sync(configs={"pricing": {"currency": "EUR"}})
+        errors: list[Exception] = []
+        client.on("error", errors.append)
+
+        fallback = Pricing("USD", 0)
+        assert client.typed_config("pricing", Pricing, fallback) is fallback
+        assert len(errors) == 1
+
     def test_default_for_missing(self) -> None:
         client = create_mock_client_sync()
         assert client.flag("missing") is None
@@ -0,0 +1,21 @@
+from edgeflags.paths import escape, matches
+
+
+class TestPaths:
+    def test_escape(self) -> None:
+        assert escape("a/b") == "a~1b"
+        assert escape("m~n") == "m~0n"
+        assert escape("plain") == "plain"
+
+    def test_matches_prefix_and_descendants(self) -> None:
+        assert matches("/theme/color", "/theme/color")
+        assert matches("/theme/color/primary", "/theme/color")
+        assert not matches("/theme/colors", "/theme/color")
+        assert not matches("/layout", "/theme")
+
+    def test_matches_ancestors(self) -> None:
+        assert matches("/theme", "/theme/color")
+        assert not matches("/the", "/theme/color")
+
+    def test_empty_prefix_matches_everything(self) -> None:
+        assert matches("/anything", "")
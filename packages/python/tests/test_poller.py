@@ -2,7 +2,11 @@ import asyncio
 import threading
 import time
 
-from edgeflags.poller import AsyncPoller, SyncPoller
+import pytest
+
+from edgeflags import poller as poller_module
+from edgeflags.errors import EdgeFlagsError
+from edgeflags.poller import AsyncPoller, IdleTracker, SyncPoller, _delay_after
 
 
 class TestAsyncPoller:
@@ -61,6 +65,60 @@ class TestAsyncPoller:
         assert poller.running
         poller.stop()
 
+    async def test_pace_overrides_interval(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(poller_module, "_MIN_SERVER_DELAY", 0.01)
+        count = 0
+
+        def task() -> None:
+            nonlocal count
+            count += 1
+
+        poller = AsyncPoller(10.0, task, lambda e: None, pace=lambda: (0.02, None))
+        poller.start()
+        await asyncio.sleep(0.15)
+        poller.stop()
+
+        assert count >= 2
+
+    async def test_retry_after_delays_next_run(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(poller_module, "_MIN_SERVER_DELAY", 0.01)
+        count = 0
+
+        def task() -> None:
+            nonlocal count
+            count += 1
+            raise EdgeFlagsError("slow down", 429, retry_after=10.0)
+
+        poller = AsyncPoller(0.02, task, lambda e: None, pace=lambda: (0.02, None))
+        poller.start()
+        await asyncio.sleep(0.15)
+        poller.stop()
+
+        assert count == 1
+
+    async def test_parks_while_idle_and_resumes(self) -> None:
+        count = 0
+        idle = True
+
+        def task() -> None:
+            nonlocal count
+            count += 1
+
+        poller = AsyncPoller(0.02, task, lambda e: None, idle=lambda: idle)
+        poller.start()
+        await asyncio.sleep(0.1)
+        assert count == 0
+        assert poller.parked
+
+        idle = False
+        poller.resume()
+        await asyncio.sleep(0.01)
+        assert count == 1
+        await asyncio.sleep(0.1)
+        poller.stop()
+
+        assert count >= 3
+
 
 class TestSyncPoller:
     def test_executes_task(self) -> None:
@@ -114,3 +172,76 @@ class TestSyncPoller:
         assert poller.running
         poller.stop()
         assert not poller.running
+
+    def test_pace_and_retry_after(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(poller_module, "_MIN_SERVER_DELAY", 0.01)
+        runs: list[float] = []
+
+        def task() -> None:
+            runs.append(time.monotonic())
+            if len(runs) == 2:
+                raise EdgeFlagsError("unavailable", 503, retry_after=10.0)
+
+        poller = SyncPoller(10.0, task, lambda e: None, pace=lambda: (0.02, None))
+        poller.start()
+        time.sleep(0.2)
+        poller.stop()
+
+        assert len(runs) == 2
+
+    def test_parks_while_idle_and_resumes(self) -> None:
+        runs: list[float] = []
+        idle = True
+        poller = SyncPoller(
+            0.02, lambda: runs.append(time.monotonic()), lambda e: None, idle=lambda: idle
+        )
+        poller.start()
+        time.sleep(0.1)
+        assert runs == []
+        assert poller.parked
+
+        idle = False
+        poller.resume(run_now=False)
+        assert not poller.parked
+        time.sleep(0.005)
+        assert runs == []
+        time.sleep(0.1)
+        poller.stop()
+
+        assert len(runs) >= 2
+
+
+class TestIdleTracker:
+    def test_idle_after_timeout_without_reads(self) -> None:
+        tracker = IdleTracker(0.05)
+
+        assert not tracker.idle()
+        tracker.read = True
+        time.sleep(0.06)
+        assert not tracker.idle()
+        assert not tracker.parked
+        time.sleep(0.06)
+        assert tracker.idle()
+        assert tracker.parked
+
+    def test_unpark_once(self) -> None:
+        tracker = IdleTracker(0.0)
+        tracker.idle()
+
+        assert tracker.unpark()
+        assert not tracker.unpark()
+        assert not tracker.parked
+
+
+class TestDelayAfter:
+    def test_server_delays_are_clamped(self) -> None:
+        assert _delay_after(60.0, EdgeFlagsError("busy", 503, retry_after=0.0), None) == 1.0
+        assert _delay_after(60.0, EdgeFlagsError("busy", 503, retry_after=5.0), None) == 5.0
+        assert _delay_after(60.0, RuntimeError("boom"), None) == 60.0
+        assert _delay_after(60.0, None, lambda: (0.0, None)) == 1.0
+
+    def test_max_age_only_lengthens_the_interval(self) -> None:
+        assert _delay_after(60.0, None, lambda: (None, 0.0)) == 60.0
+        assert _delay_after(60.0, None, lambda: (None, 300.0)) == 300.0
+        assert _delay_after(60.0, None, lambda: (120.0, 30.0)) == 120.0
+        assert _delay_after(5.0, None, lambda: (None, None)) == 5.0
@@ -0,0 +1,145 @@
+import gzip
+import json
+import time
+from pathlib import Path
+
+import httpx
+import pytest
+
+from edgeflags.client import EdgeFlags, EdgeFlagsSync
+from edgeflags.fetcher import AsyncFetcher, SyncFetcher
+from edgeflags.recording import Recorder, ReplayTransport, read_recording, scrub
+from edgeflags.testing import StandInServer
+
+
+def _record(path: Path, *, redact: bool = True) -> list[dict]:
+    results = []
+    with (
+        StandInServer(flags={"a": "blue", "b": 1}, configs={"c": {"name": "x"}}) as server,
+        Recorder(path, redact=redact) as recorder,
+    ):
+        fetcher = SyncFetcher(server.url, "tok", recorder=recorder)
+        first = fetcher.fetch_all({"user_id": "u1"})
+        results.append(first)
+        server.publish(flags={"a": "green"})
+        results.append(fetcher.fetch_all({"user_id": "u1"}, since=first["version"]))
+        fetcher.close()
+    return results
+
+
+class TestScrub:
+    def test_keeps_shape_and_sizes(self) -> None:
+        value = {"name": "checkout", "limits": [1, "eu", True], "empty": ""}
+        scrubbed = scrub(value)
+
+        assert scrubbed["limits"][0] == 1 and scrubbed["limits"][2] is True
+        assert len(scrubbed["name"]) == 8 and scrubbed["name"] != "checkout"
+        assert len(scrubbed["limits"][1]) == 2
+        assert scrubbed["empty"] == ""
+        assert scrub(value) == scrubbed
+        assert scrub("a" * 100) != scrub("b" * 100)
+
+
+class TestRecorder:
+    def test_records_redacted_responses(self, tmp_path: Path) -> None:
+        path = tmp_path / "traffic.jsonl.gz"
+        _record(path)
+        entries = list(read_recording(path))
+
+        assert [e["since"] for e in entries] == [None, entries[0]["body"]["version"]]
+        assert all(e["status"] == 200 and e["method"] == "POST" for e in entries)
+        assert entries[0]["body"]["flags"]["b"] == 1
+        assert entries[0]["body"]["flags"]["a"] == scrub("blue")
+        assert entries[1]["body"]["flags"] == {"a": scrub("green")}
+        assert entries[1]["t"] >= entries[0]["t"] >= 0
+        assert "u1" not in gzip.decompress(path.read_bytes()).decode()
+
+    def test_writes_compressed_json_lines(self, tmp_path: Path) -> None:
+        path = tmp_path / "traffic.jsonl.gz"
+        _record(path)
+        lines = gzip.decompress(path.read_bytes()).decode().splitlines()
+
+        assert json.loads(lines[0])["redacted"] is True
+        assert len(lines) == 3
+
+    def test_rejects_other_files(self, tmp_path: Path) -> None:
+        path = tmp_path / "other.gz"
+        path.write_bytes(gzip.compress(b'{"format":"other"}\n'))
+
+        with pytest.raises(ValueError):
+            list(read_recording(path))
+
+
+class TestReplayTransport:
+    def test_replays_through_sync_fetcher(self, tmp_path: Path) -> None:
+        path = tmp_path / "traffic.jsonl.gz"
+        recorded = _record(path, redact=False)
+        transport = ReplayTransport(path, speed=None)
+        fetcher = SyncFetcher("http://replay", "tok", transport=transport)
+
+        first = fetcher.fetch_all({})
+        second = fetcher.fetch_all({}, since=first["version"])
+
+        assert [first, second] == recorded
+        with pytest.raises(httpx.ConnectError):
+            fetcher.fetch_all({}, since=second["version"])
+        assert transport.exhausted and transport.served == 2
+
+    async def test_replays_through_async_fetcher(self, tmp_path: Path) -> None:
+        path = tmp_path / "traffic.jsonl.gz"
+        recorded = _record(path, redact=False)
+        fetcher = AsyncFetcher("http://replay", "tok", transport=ReplayTransport(path, speed=None))
+
+        first = await fetcher.fetch_all({})
+
+        assert first == recorded[0]
+        await fetcher.close()
+
+    def test_keeps_recorded_pace(self, tmp_path: Path) -> None:
+        path = tmp_path / "paced.jsonl.gz"
+        now = [0.0]
+        body = {"flags": {}, "configs": {}, "version": 1}
+        response = httpx.Response(200, json=body)
+        with Recorder(path, clock=lambda: now[0]) as recorder:
+            for t in (0.0, 0.2, 0.4):
+                now[0] = t + 0.02
+                recorder.record("POST", None, response, 0.02)
+        fetcher = SyncFetcher("http://replay", "tok", transport=ReplayTransport(path, speed=2))
+
+        started = time.monotonic()
+        for _ in range(3):
+            fetcher.fetch_all({})
+
+        assert 0.2 <= time.monotonic() - started < 0.5
+
+    def test_drives_client_change_events(self, tmp_path: Path) -> None:
+        path = tmp_path / "traffic.jsonl.gz"
+        _record(path)
+        client = EdgeFlagsSync(
+            "tok",
+            "http://replay",
+            polling_interval=3600,
+            http_transport=ReplayTransport(path, speed=None),
+        )
+        changes: list[object] = []
+        client.on("change", changes.append)
+        client.init()
+        client.refresh()
+
+        assert client.flag("a") == scrub("green")
+        assert len(changes) == 1
+        client.destroy()
+
+    async def test_async_client_accepts_transport(self, tmp_path: Path) -> None:
+        path = tmp_path / "traffic.jsonl.gz"
+        _record(path)
+        client = EdgeFlags(
+            "tok",
+            "http://replay",
+            polling_interval=3600,
+            http_transport=ReplayTransport(path, speed=None),
+        )
+        await client.init()
+
+        assert client.flag("b") == 1
+        await client.aclose()
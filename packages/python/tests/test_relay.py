@@ -0,0 +1,158 @@
+import json
+import tempfile
+import threading
+import time
+from collections.abc import Iterator
+from pathlib import Path
+
+import pytest
+
+from edgeflags.client import EdgeFlagsSync
+from edgeflags.fetcher import SyncFetcher
+from edgeflags.relay import Relay, context_key
+from edgeflags.testing import StandInServer
+
+
+@pytest.fixture
+def upstream() -> Iterator[StandInServer]:
+    with StandInServer(flags={"a": True, "p.x": 1}, configs={"c": {"v": 1}}) as server:
+        yield server
+
+
+@pytest.fixture
+def relay(upstream: StandInServer) -> Iterator[Relay]:
+    with Relay(upstream.url, "ff_relay", polling_interval=3600) as relay:
+        yield relay
+
+
+class TestRelay:
+    def test_serves_sdks_from_one_upstream_fetch(
+        self, upstream: StandInServer, relay: Relay
+    ) -> None:
+        clients = [EdgeFlagsSync("tok", relay.url, context={"user_id": "u1"}) for _ in range(3)]
+        for client in clients:
+            client.init()
+
+        assert all(client.flag("a") is True for client in clients)
+        assert relay.upstream_requests == 1
+        assert len(upstream.requests) == 1
+        for client in clients:
+            client.destroy()
+
+    def test_caches_per_context(self, relay: Relay) -> None:
+        for user in ("u1", "u2", "u1"):
+            client = EdgeFlagsSync("tok", relay.url, context={"user_id": user})
+            client.init()
+            client.destroy()
+
+        assert relay.contexts == 2
+        assert relay.upstream_requests == 2
+
+    def test_conditional_poll_gets_not_modified(self, relay: Relay) -> None:
+        client = EdgeFlagsSync("tok", relay.url)
+        client.init()
+        changes: list[object] = []
+        client.on("change", changes.append)
+
+        client.refresh()
+
+        assert changes == []
+        assert client.flag("a") is True
+        client.destroy()
+
+    def test_not_modified_response(self, relay: Relay) -> None:
+        status, etag, data = relay.evaluate({"context": {}})
+        assert status == 200
+        assert etag is not None
+
+        assert relay.evaluate({"context": {}}, etag) == (304, etag, b"")
+
+    def test_poll_picks_up_upstream_changes(self, upstream: StandInServer, relay: Relay) -> None:
+        client = EdgeFlagsSync("tok", relay.url)
+        client.init()
+        upstream.publish(flags={"a": False})
+
+        relay.poll()
+        client.refresh()
+
+        assert client.flag("a") is False
+        # The relay refreshed with a delta against the version it held.
+        assert upstream.requests[-1]["body"]["since"] == 0
+        client.destroy()
+
+    def test_serves_last_snapshot_while_upstream_is_slow(
+        self, upstream: StandInServer, relay: Relay
+    ) -> None:
+        relay.evaluate({"context": {}})
+        upstream.publish(flags={"a": False})
+        upstream.latency = 1.0
+        poll = threading.Thread(target=relay.poll)
+        poll.start()
+        time.sleep(0.1)
+
+        durations: list[float] = []
+        answers: list[bytes] = []
+
+        def read() -> None:
+            started = time.monotonic()
+            answers.append(relay.evaluate({"context": {}})[2])
+            durations.append(time.monotonic() - started)
+
+        readers = [threading.Thread(target=read) for _ in range(8)]
+        for reader in readers:
+            reader.start()
+        for reader in readers:
+            reader.join()
+        assert max(durations) < 0.5
+        assert all(json.loads(answer)["flags"]["a"] is True for answer in answers)
+
+        poll.join()
+        assert json.loads(relay.evaluate({"context": {}})[2])["flags"]["a"] is False
+
+    def test_scoped_requests(self, relay: Relay) -> None:
+        client = EdgeFlagsSync("tok", relay.url, prefixes=["p."])
+        client.init()
+
+        assert dict(client.all_flags()) == {"p.x": 1}
+        assert relay.upstream_requests == 1
+        client.destroy()
+
+    def test_upstream_error_on_first_fetch(self, upstream: StandInServer, relay: Relay) -> None:
+        upstream.fail_next(1, 503)
+        fetcher = SyncFetcher(relay.url, "tok")
+
+        with pytest.raises(Exception, match="503"):
+            fetcher.fetch_all({})
+        assert fetcher.fetch_all({})["flags"]["a"] is True
+        fetcher.close()
+
+    def test_evicts_least_recently_used_contexts(self, upstream: StandInServer) -> None:
+        with Relay(upstream.url, "ff_relay", polling_interval=3600, max_contexts=2) as relay:
+            for user in ("u1", "u2", "u3"):
+                relay.evaluate({"context": {"user_id": user}})
+            assert relay.contexts == 2
+
+    def test_unix_domain_socket(self, upstream: StandInServer) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = str(Path(tmp) / "relay.sock")
+            with Relay(upstream.url, "ff_relay", polling_interval=3600, uds=path) as relay:
+                client = EdgeFlagsSync("tok", relay.url, uds=path)
+                client.init()
+
+                assert client.config("c") == {"v": 1}
+                client.destroy()
+            assert not Path(path).exists()
+
+    def test_get_requests(self, relay: Relay) -> None:
+        client = EdgeFlagsSync("tok", relay.url, context={"user_id": "u1"}, http_method="GET")
+        client.init()
+        client.refresh()
+
+        assert client.flag("a") is True
+        assert relay.contexts == 1
+        client.destroy()
+
+    def test_context_key_is_canonical(self) -> None:
+        assert context_key({"user_id": "u", "plan": "pro"}) == context_key(
+            {"plan": "pro", "user_id": "u"}
+        )
@@ -0,0 +1,24 @@
+from edgeflags.scope import Scope, make_scope
+
+
+class TestScope:
+    def test_keys_and_prefixes(self) -> None:
+        scope = Scope(keys=["dark_mode"], prefixes=["payments."])
+        assert "dark_mode" in scope
+        assert "payments.fee" in scope
+        assert "checkout" not in scope
+        assert "payments" not in scope
+
+    def test_filter(self) -> None:
+        scope = Scope(keys=["a"], prefixes=["p."])
+        assert scope.filter({"a": 1, "b": 2, "p.x": 3}) == {"a": 1, "p.x": 3}
+
+    def test_to_body(self) -> None:
+        assert Scope(keys=["b", "a"]).to_body() == {"keys": ["a", "b"]}
+        assert Scope(prefixes=["p."]).to_body() == {"prefixes": ["p."]}
+
+    def test_make_scope(self) -> None:
+        assert make_scope(None, None) is None
+        scope = make_scope(["a"], None)
+        assert scope is not None
+        assert "a" in scope
@@ -0,0 +1,117 @@
+from pathlib import Path
+
+import pytest
+
+from edgeflags.client import EdgeFlagsSync
+from edgeflags.context import EncodedContext
+from edgeflags.errors import SnapshotFormatError
+from edgeflags.frozen import FrozenDict, freeze
+from edgeflags.snapshot_file import encode_snapshot, load_snapshot, write_snapshot
+
+FLAGS = {"dark_mode": True, "beta": True, "variant": "b", "payments.v2": False}
+CONFIGS = {"theme": {"color": "blue", "sizes": [1, 2]}, "payments.limits": {"max": 5}}
+
+
+@pytest.fixture
+def path(tmp_path: Path) -> Path:
+    path = tmp_path / "flags.efsnap"
+    write_snapshot(path, FLAGS, CONFIGS, version=7)
+    return path
+
+
+class TestSnapshotFile:
+    def test_round_trip(self, path: Path) -> None:
+        with load_snapshot(path, verify=True) as snapshot:
+            assert snapshot.version == 7
+            assert dict(snapshot.flags) == FLAGS
+            assert dict(snapshot.configs) == freeze(CONFIGS)
+
+    def test_decodes_lazily(self, path: Path) -> None:
+        snapshot = load_snapshot(path)
+        assert len(snapshot.configs) == 2
+        assert snapshot.configs.decoded == 0
+
+        theme = snapshot.configs["theme"]
+
+        assert snapshot.configs.decoded == 1
+        assert snapshot.configs["theme"] is theme
+        assert isinstance(theme, FrozenDict)
+        assert theme["sizes"] == (1, 2)
+
+    def test_missing_key(self, path: Path) -> None:
+        snapshot = load_snapshot(path)
+        assert "nope" not in snapshot.flags
+        assert snapshot.flags.get("nope") is None
+
+    def test_identical_values_stored_once(self) -> None:
+        many = encode_snapshot({f"flag_{i}": True for i in range(100)}, {})
+        few = encode_snapshot({"flag_0": True}, {})
+        # Each additional flag only costs an index entry.
+        assert len(many) - len(few) < 100 * 24
+
+    def test_records_origin(self, tmp_path: Path) -> None:
+        path = tmp_path / "flags.efsnap"
+        write_snapshot(path, FLAGS, CONFIGS, context={"user_id": "u1"}, keys=["beta"])
+
+        with load_snapshot(path, verify=True) as snapshot:
+            assert snapshot.context == EncodedContext({"user_id": "u1"}).digest
+            assert snapshot.scope == {"keys": ["beta"]}
+            assert dict(snapshot.flags) == FLAGS
+
+    def test_unknown_origin(self, path: Path) -> None:
+        with load_snapshot(path) as snapshot:
+            assert snapshot.context is None
+            assert snapshot.scope is None
+
+    def test_no_version(self, tmp_path: Path) -> None:
+        path = tmp_path / "flags.efsnap"
+        write_snapshot(path, {}, {})
+        assert load_snapshot(path).version is None
+
+    def test_rejects_other_files(self, tmp_path: Path) -> None:
+        path = tmp_path / "flags.json"
+        path.write_text('{"flags": {}, "configs": {}, "padding": "................"}')
+        with pytest.raises(SnapshotFormatError):
+            load_snapshot(path)
+
+    def test_rejects_empty_file(self, tmp_path: Path) -> None:
+        path = tmp_path / "empty.efsnap"
+        path.write_bytes(b"")
+        with pytest.raises(SnapshotFormatError):
+            load_snapshot(path)
+
+    def test_verify_detects_corruption(self, path: Path) -> None:
+        data = bytearray(path.read_bytes())
+        data[-2] ^= 0xFF
+        path.write_bytes(bytes(data))
+
+        with pytest.raises(SnapshotFormatError, match="checksum"):
+            load_snapshot(path, verify=True)
+
+
+class TestSnapshotFileBootstrap:
+    def test_client_bootstraps_from_path(self, path: Path) -> None:
+        ef = EdgeFlagsSync("ff_test", "https://edgeflags.net", bootstrap=str(path))
+
+        assert ef.flag("dark_mode") is True
+        assert ef.config("theme")["color"] == "blue"
+        ef.destroy()
+
+    def test_client_reads_decode_lazily(self, path: Path) -> None:
+        snapshot = load_snapshot(path)
+        ef = EdgeFlagsSync("ff_test", "https://edgeflags.net", bootstrap=snapshot)
+
+        ef.flag("beta")
+
+        assert snapshot.flags.decoded == 1
+        assert snapshot.configs.decoded == 0
+        ef.destroy()
+
+    def test_client_scope_applies(self, path: Path) -> None:
+        ef = EdgeFlagsSync(
+            "ff_test", "https://edgeflags.net", bootstrap=path, prefixes=["payments."]
+        )
+
+        assert set(ef.all_flags()) == {"payments.v2"}
+        assert set(ef.all_configs()) == {"payments.limits"}
+        ef.destroy()
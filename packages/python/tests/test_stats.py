@@ -0,0 +1,88 @@
+import threading
+
+import pytest
+
+from edgeflags.client import EdgeFlagsSync
+from edgeflags.errors import EdgeFlagsError
+from edgeflags.stats import ReadStats
+
+
+class TestReadStats:
+    def test_counts_reads_and_defaults(self) -> None:
+        stats = ReadStats()
+        stats.record_flag("a", True)
+        stats.record_flag("a", False)
+        stats.record_config("c", True)
+
+        report = stats.report(["a", "b"], ["c", "d"])
+
+        assert report["flags"] == {"a": {"reads": 2, "defaults": 1}}
+        assert report["configs"] == {"c": {"reads": 1, "defaults": 0}}
+        assert report["unused_flags"] == ["b"]
+        assert report["unused_configs"] == ["d"]
+
+    def test_sums_across_threads(self) -> None:
+        stats = ReadStats()
+
+        def read() -> None:
+            for _ in range(1000):
+                stats.record_flag("a", True)
+
+        threads = [threading.Thread(target=read) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert stats.report(["a"], [])["flags"]["a"]["reads"] == 8000
+
+    def test_compact_folds_exited_threads(self) -> None:
+        stats = ReadStats()
+        thread = threading.Thread(target=stats.record_flag, args=("a", False))
+        thread.start()
+        thread.join()
+        stats.record_flag("a", True)
+
+        stats.compact()
+
+        assert len(stats._shards) == 1
+        assert stats.report([], [])["flags"]["a"] == {"reads": 2, "defaults": 1}
+
+    def test_reset(self) -> None:
+        stats = ReadStats()
+        stats.record_flag("a", True)
+        stats.reset()
+        stats.record_flag("b", True)
+
+        assert stats.report([], [])["flags"] == {"b": {"reads": 1, "defaults": 0}}
+
+
+class TestClientReadStats:
+    def test_read_stats(self) -> None:
+        ef = EdgeFlagsSync(
+            "ff_test",
+            "https://edgeflags.net",
+            track_reads=True,
+            _mock={"flags": {"on": True, "idle": False}, "configs": {"theme": {"x": 1}}},
+        )
+        ef.flag("on")
+        ef.flag("missing", False)
+        ef.flags(["on"])
+        ef.config("theme")
+
+        report = ef.read_stats()
+
+        assert report["flags"] == {
+            "on": {"reads": 2, "defaults": 0},
+            "missing": {"reads": 1, "defaults": 1},
+        }
+        assert report["configs"] == {"theme": {"reads": 1, "defaults": 0}}
+        assert report["unused_flags"] == ["idle"]
+        assert report["unused_configs"] == []
+
+    def test_disabled_by_default(self) -> None:
+        ef = EdgeFlagsSync("ff_test", "https://edgeflags.net", _mock={"flags": {}})
+        ef.flag("on")
+
+        with pytest.raises(EdgeFlagsError):
+            ef.read_stats()
@@ -0,0 +1,125 @@
+import json
+
+import pytest
+
+from edgeflags.client import EdgeFlags, EdgeFlagsSync
+from edgeflags.errors import EdgeFlagsError
+from edgeflags.testing import StandInServer, generate_configs, generate_flags
+
+
+@pytest.fixture
+def server():  # type: ignore[no-untyped-def]
+    with StandInServer(flags={"a": True, "b": True}, configs={"theme": "blue"}) as srv:
+        yield srv
+
+
+class TestGenerators:
+    def test_generate_flags(self) -> None:
+        flags = generate_flags(100, seed=1)
+        assert len(flags) == 100
+        assert flags == generate_flags(100, seed=1)
+        assert {type(v) for v in flags.values()} == {bool, str, int}
+
+    def test_generate_configs_size(self) -> None:
+        configs = generate_configs(10, size=1024)
+        assert len(configs) == 10
+        size = len(json.dumps(configs["config_0"]))
+        assert 512 < size < 2048
+
+
+class TestStandInServer:
+    def test_serves_full_then_deltas(self, server: StandInServer) -> None:
+        client = EdgeFlagsSync("tok", server.url)
+        client.init()
+        assert dict(client.all_flags()) == {"a": True, "b": True}
+
+        server.publish({"c": False}, deleted_flags=["b"])
+        client.refresh()
+
+        assert dict(client.all_flags()) == {"a": True, "c": False}
+        assert [r["body"].get("since") for r in server.requests] == [None, 0]
+        assert all(r["status"] == 200 for r in server.requests)
+        client.destroy()
+
+    def test_version_gap_resyncs(self, server: StandInServer) -> None:
+        client = EdgeFlagsSync("tok", server.url)
+        client.init()
+
+        server.publish({"a": False})
+        server.gap_next()
+        client.refresh()
+
+        assert [r["body"].get("since") for r in server.requests] == [None, 0, None]
+        assert client.flag("a") is False
+        client.destroy()
+
+    def test_lost_history_answers_full(self, server: StandInServer) -> None:
+        client = EdgeFlagsSync("tok", server.url)
+        client.init()
+
+        server.publish(deleted_flags=["a"])
+        server.forget_history()
+        client.refresh()
+
+        assert dict(client.all_flags()) == {"b": True}
+        client.destroy()
+
+    def test_injected_failures(self, server: StandInServer) -> None:
+        client = EdgeFlagsSync("tok", server.url)
+        client.init()
+        server.fail_next(2, status=502)
+
+        for _ in range(2):
+            with pytest.raises(EdgeFlagsError) as exc_info:
+                client.refresh()
+            assert exc_info.value.status_code == 502
+        client.refresh()
+
+        assert [r["status"] for r in server.requests] == [200, 502, 502, 200]
+        client.destroy()
+
+    def test_error_rate(self) -> None:
+        with StandInServer(error_rate=1.0, error_status=503) as server:
+            client = EdgeFlagsSync("tok", server.url)
+            with pytest.raises(EdgeFlagsError):
+                client.init()
+            client.destroy()
+
+    def test_latency(self) -> None:
+        with StandInServer(latency=0.05) as server:
+            client = EdgeFlagsSync("tok", server.url)
+            client.init()
+            assert server.requests[0]["duration"] >= 0.05
+            client.destroy()
+
+    def test_scope(self, server: StandInServer) -> None:
+        client = EdgeFlagsSync("tok", server.url, keys=["a"])
+        client.init()
+
+        assert server.requests[0]["body"]["keys"] == ["a"]
+        assert server.requests[0]["bytes_sent"] < 60
+        assert dict(client.all_flags()) == {"a": True}
+        client.destroy()
+
+    def test_script(self, server: StandInServer) -> None:
+        server.script([{"flags": {"a": False}}, {"deleted_flags": ["a"]}], every=2)
+        client = EdgeFlagsSync("tok", server.url)
+        client.init()
+
+        client.refresh()
+        client.refresh()
+        assert client.flag("a") is False
+        client.refresh()
+        client.refresh()
+        assert client.flag("a") is None
+        assert server.version == 2
+        client.destroy()
+
+    async def test_async_client(self, server: StandInServer) -> None:
+        client = EdgeFlags("tok", server.url)
+        await client.init()
+        server.publish(configs={"theme": "red"})
+        await client.refresh()
+
+        assert client.config("theme") == "red"
+        await client.aclose()
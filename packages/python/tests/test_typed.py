@@ -0,0 +1,32 @@
+from dataclasses import dataclass
+from typing import Any
+
+from edgeflags.typed import decoder_for
+
+
+@dataclass
+class Pricing:
+    currency: str
+    amount: int
+
+
+class Validated:
+    def __init__(self, data: Any) -> None:
+        self.data = data
+
+    @classmethod
+    def model_validate(cls, data: Any) -> "Validated":
+        return cls(dict(data))
+
+
+class TestDecoderFor:
+    def test_dataclass(self) -> None:
+        assert decoder_for(Pricing)({"currency": "EUR", "amount": 5}) == Pricing("EUR", 5)
+
+    def test_model_validate(self) -> None:
+        value = decoder_for(Validated)({"a": 1})
+        assert isinstance(value, Validated)
+        assert value.data == {"a": 1}
+
+    def test_plain_callable(self) -> None:
+        assert decoder_for(int)("42") == 42
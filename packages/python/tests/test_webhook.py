@@ -0,0 +1,214 @@
+import asyncio
+import io
+import json
+import time
+from collections.abc import Iterator
+from typing import Any
+
+import pytest
+
+from edgeflags.client import EdgeFlags, EdgeFlagsSync
+from edgeflags.testing import StandInServer
+from edgeflags.webhook import (
+    EdgeFlagsASGIWebhook,
+    EdgeFlagsWSGIWebhook,
+    sign_payload,
+    verify_signature,
+)
+
+SECRET = "whsec_test"
+
+
+@pytest.fixture
+def server() -> Iterator[StandInServer]:
+    with StandInServer(flags={"a": True, "b": 1}, configs={"c": {"v": 1}}) as server:
+        yield server
+
+
+def _wsgi(app: EdgeFlagsWSGIWebhook, body: bytes, signature: str | None = None) -> int:
+    environ: dict[str, Any] = {
+        "REQUEST_METHOD": "POST",
+        "CONTENT_LENGTH": str(len(body)),
+        "wsgi.input": io.BytesIO(body),
+    }
+    if signature is not None:
+        environ["HTTP_X_EDGEFLAGS_SIGNATURE"] = signature
+    statuses: list[str] = []
+    b"".join(app(environ, lambda status, headers: statuses.append(status)))
+    return int(statuses[0].split()[0])
+
+
+async def _asgi(app: EdgeFlagsASGIWebhook, body: bytes, signature: str) -> int:
+    messages: list[dict[str, Any]] = []
+
+    async def receive() -> dict[str, Any]:
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    async def send(message: Any) -> None:
+        messages.append(message)
+
+    scope = {
+        "type": "http",
+        "method": "POST",
+        "headers": [(b"x-edgeflags-signature", signature.encode())],
+    }
+    await app(scope, receive, send)  # type: ignore[arg-type]
+    return int(messages[0]["status"])
+
+
+def _wait_for(condition: Any, timeout: float = 2.0) -> None:
+    end = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < end, "timed out"
+        time.sleep(0.01)
+
+
+class TestSignature:
+    def test_round_trip(self) -> None:
+        body = b'{"keys":["a"]}'
+        header = sign_payload(SECRET, body)
+
+        assert verify_signature(SECRET, body, header)
+        assert not verify_signature("other", body, header)
+        assert not verify_signature(SECRET, body + b" ", header)
+
+    def test_rotated_secrets(self) -> None:
+        header = sign_payload("old", b"{}")
+
+        assert verify_signature(["new", "old"], b"{}", header)
+
+    def test_rejects_stale_and_malformed_headers(self) -> None:
+        header = sign_payload(SECRET, b"{}", timestamp=1_000)
+
+        assert not verify_signature(SECRET, b"{}", header)
+        assert verify_signature(SECRET, b"{}", header, now=1_100)
+        assert not verify_signature(SECRET, b"{}", None)
+        assert not verify_signature(SECRET, b"{}", "v1=abc")
+
+
+class TestWSGIWebhook:
+    def test_push_refreshes_listed_keys(self, server: StandInServer) -> None:
+        client = EdgeFlagsSync("tok", server.url, polling_interval=3600)
+        client.init()
+        app = EdgeFlagsWSGIWebhook(client, SECRET)
+        server.publish(flags={"a": False, "b": 2})
+        server.reset_requests()
+
+        body = json.dumps({"keys": ["a"]}).encode()
+        assert _wsgi(app, body, sign_payload(SECRET, body)) == 202
+        _wait_for(lambda: client.flag("a") is False)
+
+        assert server.requests[0]["body"]["keys"] == ["a"]
+        assert client.flag("b") == 1
+        client.destroy()
+
+    def test_push_without_keys_refreshes_everything(self, server: StandInServer) -> None:
+        client = EdgeFlagsSync("tok", server.url, polling_interval=3600)
+        client.init()
+        app = EdgeFlagsWSGIWebhook([client], SECRET)
+        version = server.publish(flags={"b": 2})
+
+        body = json.dumps({"version": version}).encode()
+        assert _wsgi(app, body, sign_payload(SECRET, body)) == 202
+        _wait_for(lambda: client.flag("b") == 2)
+        client.destroy()
+
+    def test_known_version_is_ignored(self, server: StandInServer) -> None:
+        client = EdgeFlagsSync("tok", server.url, polling_interval=3600)
+        client.init()
+        app = EdgeFlagsWSGIWebhook(client, SECRET)
+        server.reset_requests()
+
+        body = json.dumps({"version": server.version}).encode()
+        assert _wsgi(app, body, sign_payload(SECRET, body)) == 202
+        time.sleep(0.05)
+
+        assert server.requests == []
+        client.destroy()
+
+    def test_pushes_coalesce_while_refreshing(self) -> None:
+        with StandInServer(flags={"a": True, "b": 1}, latency=0.1) as server:
+            client = EdgeFlagsSync("tok", server.url, polling_interval=3600)
+            client.init()
+            app = EdgeFlagsWSGIWebhook(client, SECRET)
+            server.reset_requests()
+
+            for keys in (["a"], ["a"], ["b"], ["a", "b"]):
+                body = json.dumps({"keys": keys}).encode()
+                assert _wsgi(app, body, sign_payload(SECRET, body)) == 202
+            _wait_for(lambda: len(server.requests) == 2)
+            time.sleep(0.2)
+
+            assert [r["body"]["keys"] for r in server.requests] == [["a"], ["a", "b"]]
+            client.destroy()
+
+    def test_rejects_bad_requests(self, server: StandInServer) -> None:
+        client = EdgeFlagsSync("tok", server.url, polling_interval=3600)
+        app = EdgeFlagsWSGIWebhook(client, SECRET)
+
+        assert _wsgi(app, b"{}") == 401
+        assert _wsgi(app, b"{}", sign_payload("wrong", b"{}")) == 401
+        assert _wsgi(app, b"[1]", sign_payload(SECRET, b"[1]")) == 400
+        bad = b'{"keys":"a"}'
+        assert _wsgi(app, bad, sign_payload(SECRET, bad)) == 400
+        huge = b" " * (65 * 1024)
+        assert _wsgi(app, huge, sign_payload(SECRET, huge)) == 413
+        client.destroy()
+
+    def test_failed_refresh_emits_error(self, server: StandInServer) -> None:
+        client = EdgeFlagsSync("tok", server.url, polling_interval=3600)
+        client.init()
+        errors: list[Exception] = []
+        client.on("error", errors.append)
+        app = EdgeFlagsWSGIWebhook(client, SECRET)
+        server.fail_next(1, status=503)
+
+        body = json.dumps({"keys": ["a"]}).encode()
+        assert _wsgi(app, body, sign_payload(SECRET, body)) == 202
+        _wait_for(lambda: errors)
+
+        assert "503" in str(errors[0])
+        client.destroy()
+
+
+class TestASGIWebhook:
+    async def test_push_refreshes_async_client(self, server: StandInServer) -> None:
+        client = EdgeFlags("tok", server.url, polling_interval=3600)
+        await client.init()
+        app = EdgeFlagsASGIWebhook(client, SECRET)
+        server.publish(flags={"a": False})
+
+        body = json.dumps({"keys": ["a"]}).encode()
+        assert await _asgi(app, body, sign_payload(SECRET, body)) == 202
+        for _ in range(200):
+            if client.flag("a") is False:
+                break
+            await asyncio.sleep(0.01)
+
+        assert client.flag("a") is False
+        await client.aclose()
+
+    async def test_failed_refresh_emits_error(self, server: StandInServer) -> None:
+        client = EdgeFlags("tok", server.url, polling_interval=3600)
+        await client.init()
+        errors: list[Exception] = []
+        client.on("error", errors.append)
+        app = EdgeFlagsASGIWebhook(client, SECRET)
+        server.fail_next(1, status=503)
+
+        body = json.dumps({"keys": ["a"]}).encode()
+        assert await _asgi(app, body, sign_payload(SECRET, body)) == 202
+        for _ in range(200):
+            if errors:
+                break
+            await asyncio.sleep(0.01)
+
+        assert "503" in str(errors[0])
+        await client.aclose()
+
+    async def test_rejects_invalid_signature(self, server: StandInServer) -> None:
+        client = EdgeFlags("tok", server.url)
+        app = EdgeFlagsASGIWebhook(client, SECRET)
+
+        assert await _asgi(app, b"{}", "t=1,v1=00") == 401
+        await client.aclose()